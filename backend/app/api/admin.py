@@ -0,0 +1,21 @@
+from typing import Optional
+from fastapi import HTTPException, Request
+import hmac
+import os
+
+# Admin-only options (profiling) are refused unless this is set and sent
+ADMIN_TOKEN = os.environ.get("GRAPHSOLVE_ADMIN_TOKEN")
+ADMIN_HEADER = "X-Admin-Token"
+
+
+def is_admin(request: Optional[Request]) -> bool:
+    token = request.headers.get(ADMIN_HEADER) if request is not None else None
+    # As bytes, since compare_digest refuses non-ASCII str: the header's raw
+    # bytes (Starlette decodes them as latin-1) against the UTF-8 token
+    return (bool(ADMIN_TOKEN) and token is not None and
+            hmac.compare_digest(token.encode("latin-1"), ADMIN_TOKEN.encode()))
+
+
+def require_admin(request: Optional[Request], feature: str):
+    if not is_admin(request):
+        raise HTTPException(status_code=403, detail=f"{feature} requires the {ADMIN_HEADER} header")
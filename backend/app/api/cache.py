@@ -0,0 +1,57 @@
+from collections import OrderedDict
+from typing import Any, Optional
+import hashlib
+import json
+import os
+import time
+
+CACHE_SIZE = int(os.environ.get("GRAPHSOLVE_CACHE_SIZE", 1024))
+CACHE_TTL_SECONDS = float(os.environ.get("GRAPHSOLVE_CACHE_TTL", 600))
+
+
+def cache_key(*parts: Any) -> str:
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, separators=(",", ":"),
+                                     default=str).encode()).hexdigest()
+
+
+class ResultCache:
+    """LRU cache whose entries also expire ttl seconds after they were stored"""
+
+    def __init__(self, max_entries: int = CACHE_SIZE, ttl: float = CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self.entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self.entries[key]
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key: str, value: Any):
+        if self.max_entries <= 0:
+            return
+        self.entries[key] = (time.monotonic() + self.ttl, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+
+
+_cache: Optional[ResultCache] = None
+
+
+def get_result_cache() -> ResultCache:
+    global _cache
+    if _cache is None:
+        _cache = ResultCache()
+    return _cache
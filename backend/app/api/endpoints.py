@@ -1,14 +1,28 @@
-from fastapi import APIRouter, HTTPException
+from array import array
+from contextlib import nullcontext
+from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 from app.models.schemas import (
-    PuzzleRequest, PuzzleResponse, PresetPuzzle,
+    PuzzleRequest, PuzzleResponse, PresetPuzzle, SolutionStep, SpanTiming, Statistics,
     SudokuInput, NQueensInput, MazeInput, KnightInput
 )
 from app.solvers.sudoku import SudokuSolver
 from app.solvers.nqueens import NQueensSolver
 from app.solvers.maze import MazeSolver
-from app.solvers.knight import KnightSolver
+from app.solvers.knight import KnightSolver, MAX_DISTANCE_SIZE, MAX_DISTANCE_SOURCES
+from app.storage.traces import get_trace_store
+from app.utils.helpers import recording, span
+from app.utils.profiling import peak_memory, profile_call
+from app.solvers.canonical import CANONICALIZERS, Canonical, canonical_exact
+from app.api.cache import cache_key, get_result_cache
+from app.api.singleflight import ClientDisconnected, get_single_flight
+from app.api.serialization import negotiate
+from app.api.metrics import observe_cache, observe_solve
+from app.api.admin import require_admin
+from app.api.executor import (
+    ExecutorSaturated, ExecutorUnavailable, SolveTimeout, get_executor, report_progress
+)
 
 router = APIRouter()
 
@@ -18,6 +32,11 @@ class MazeGenerateRequest(BaseModel):
     difficulty: str = "medium"
 
 
+class KnightDistanceRequest(BaseModel):
+    n: Optional[int] = None  # None for the unbounded board
+    queries: List[tuple[tuple[int, int], tuple[int, int]]]
+
+
 PUZZLE_PRESETS = {
     "sudoku": [
         {
@@ -157,120 +176,300 @@ PUZZLE_PRESETS = {
 }
 
 
-@router.post("/sudoku/solve", response_model=PuzzleResponse)
-async def solve_sudoku(request: PuzzleRequest):
-    try:
-        solver = SudokuSolver()
-        solution = solver.solve(request.input, request.options.model_dump())
-
-        if solution:
-            return PuzzleResponse(
-                success=True,
-                solution=solution,
-                steps=solver.steps if request.options.return_steps else [],
-                statistics=solver.get_statistics()
-            )
+SOLVERS = {
+    "sudoku": SudokuSolver,
+    "nqueens": NQueensSolver,
+    "maze": MazeSolver,
+    "knight": KnightSolver,
+}
+
+
+def build_response(puzzle_type: str, request: PuzzleRequest, solver, solution,
+                   include_steps: bool = True) -> PuzzleResponse:
+    """PuzzleResponse for a finished solve, shared by the plain and streaming endpoints"""
+    include_steps = include_steps and request.options.return_steps
+    trace_id = None
+    if include_steps and request.options.store_trace:
+        # Failed and exhausted searches, usually the longest traces, are stored too
+        trace_id = get_trace_store().save(puzzle_type, solver.trace)
+        include_steps = False
+    # Steps are only inlined with a solution
+    steps = solver.steps if include_steps and solution else []
+
+    if puzzle_type == "knight":
+        return _knight_response(request, solver, solution, steps, trace_id)
+
+    if solution:
+        # Built from already-validated parts; skip re-validating every step
+        return PuzzleResponse.model_construct(
+            success=True,
+            solution=solution,
+            steps=steps,
+            statistics=solver.get_statistics(),
+            checkpoint=solver.checkpoint,
+            trace_id=trace_id
+        )
+    else:
+        not_found = "No path found" if puzzle_type == "maze" else "No solution found"
+        return PuzzleResponse(
+            success=False,
+            error="Search budget exhausted" if solver.budget.exhausted else not_found,
+            statistics=solver.get_statistics(),
+            checkpoint=solver.checkpoint,
+            trace_id=trace_id
+        )
+
+
+def _knight_response(request: PuzzleRequest, solver: KnightSolver, solution,
+                     steps: List[SolutionStep], trace_id: Optional[str] = None) -> PuzzleResponse:
+    n = request.input['n']
+    if solution:
+        # Check if it's a complete or partial solution
+        total_squares = n * n
+        path_length = len(solution)
+
+        message = None
+        if path_length == total_squares:
+            message = "Complete tour found"
+        elif path_length > total_squares * 0.8:
+            message = f"Partial tour found: {path_length}/{total_squares} squares"
+
+        # Constructive tours come back as flat squares (row * n + col)
+        if isinstance(solution, array):
+            solution = solution.tolist()
+
+        return PuzzleResponse.model_construct(
+            success=True,
+            solution=solution,
+            steps=steps,
+            statistics=solver.get_statistics(),
+            message=message,
+            checkpoint=solver.checkpoint,
+            trace_id=trace_id
+        )
+    else:
+        if n < 5:
+            error_msg = f"No knight's tour exists for {n}×{n} board"
+        elif solver.checkpoint:
+            error_msg = "Search budget exhausted; resume it with the returned checkpoint"
+        elif solver.budget.exhausted:
+            error_msg = "Search budget exhausted"
         else:
-            return PuzzleResponse(
+            error_msg = "No tour found from this position"
+
+        return PuzzleResponse(
+            success=False,
+            error=error_msg,
+            statistics=solver.get_statistics(),
+            checkpoint=solver.checkpoint,
+            trace_id=trace_id
+        )
+
+
+def solve_request(puzzle_type: str, request: PuzzleRequest) -> PuzzleResponse:
+    """Run one solve to a response; executed in a solver worker process"""
+    solver = SOLVERS[puzzle_type]()
+    report_progress(lambda: solver.get_statistics().model_dump())
+    options = request.options
+    profile = None
+    memory = peak_memory() if options.detailed_stats else nullcontext([None])
+    with recording() as spans, memory as peak:
+        try:
+            with span("search"):
+                if options.profile:
+                    solution, profile = profile_call(
+                        lambda: solver.solve(request.input, options.model_dump()), options.profile)
+                else:
+                    solution = solver.solve(request.input, options.model_dump())
+        except TimeoutError:
+            if puzzle_type != "knight":
+                raise
+            response = PuzzleResponse(
                 success=False,
-                error="No solution found",
+                error="Solution search timed out. Try Warnsdorff's Heuristic for faster results.",
                 statistics=solver.get_statistics()
             )
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+        else:
+            # Building the response model (and saving a stored trace); the
+            # JSON or packed encoding happens later, in the API process
+            with span("build_response"):
+                response = build_response(puzzle_type, request, solver, solution)
+
+    if response.statistics is not None:
+        response.statistics.spans = [SpanTiming(**timing) for timing in spans.summary()]
+        if options.detailed_stats:
+            response.statistics.details = solver.get_details(peak[0])
+    response.profile = profile
+    return response
+
+
+def _canonical(puzzle_type: str, request: PuzzleRequest) -> Optional[Canonical]:
+    """Canonical form of a cacheable request. Steps follow the exact input, so
+    a request for them is only matched exactly; resumed searches, stored
+    traces, profiles and detailed statistics are not cached"""
+    options = request.options
+    if (options.resume is not None or options.profile or options.detailed_stats or
+            (options.return_steps and options.store_trace)):
+        return None
+    try:
+        if options.return_steps:
+            return canonical_exact(request.input)
+        return CANONICALIZERS[puzzle_type](request.input)
+    except (KeyError, TypeError, ValueError, IndexError):
+        return None  # malformed input; let the solver report it
+
+
+def _cached_response(cached: PuzzleResponse, canonical: Canonical) -> PuzzleResponse:
+    """A copy of a cached response with the solution in the caller's orientation"""
+    response = cached.model_copy(deep=True)
+    response.solution = canonical.restore(cached.solution)
+    response.statistics.cache_hit = True
+    response.statistics.queue_wait_ms = None
+    return response
+
+
+def check_request(puzzle_type: str, request: PuzzleRequest):
+    """Reject inputs the solver would refuse, before they take a worker (422)"""
+    if puzzle_type == "knight":
+        n = request.input.get('n')
+        algorithm = request.options.algorithm
+        limit = KnightSolver.max_board_size(algorithm)
+        if isinstance(n, int) and n > limit:
+            raise HTTPException(status_code=422,
+                                detail=f"Board size {n} is over {limit}, the limit for {algorithm}")
+
+
+async def run_solve(puzzle_type: str, request: PuzzleRequest,
+                    http_request: Optional[Request] = None) -> PuzzleResponse:
+    """Answer from the cache, or join an identical solve already running, or start one"""
+    check_request(puzzle_type, request)
+    if request.options.profile:
+        require_admin(http_request, "Profiling")
+    canonical = _canonical(puzzle_type, request)
+    key = None
+    if canonical is not None:
+        options = request.options
+        key = cache_key(puzzle_type, canonical.key, options.algorithm, options.max_solutions,
+                        options.seed, options.trace.model_dump() if options.return_steps else None)
+        cached = get_result_cache().get(key)
+        observe_cache(puzzle_type, cached is not None)
+        if cached is not None:
+            return _cached_response(cached, canonical)
+
+    try:
+        return await get_single_flight().do(
+            cache_key(puzzle_type, request.model_dump(mode="json")),
+            lambda: _execute(puzzle_type, request, canonical, key),
+            http_request.is_disconnected if http_request is not None else None)
+    except ClientDisconnected:
+        raise HTTPException(status_code=499, detail="Client closed request")
 
 
-@router.post("/nqueens/solve", response_model=PuzzleResponse)
-async def solve_nqueens(request: PuzzleRequest):
+async def _execute(puzzle_type: str, request: PuzzleRequest, canonical: Optional[Canonical],
+                   key: Optional[str]) -> PuzzleResponse:
     try:
-        solver = NQueensSolver()
-        solution = solver.solve(request.input, request.options.model_dump())
-
-        if solution:
-            return PuzzleResponse(
-                success=True,
-                solution=solution,
-                steps=solver.steps if request.options.return_steps else [],
-                statistics=solver.get_statistics()
-            )
-        else:
-            return PuzzleResponse(
-                success=False,
-                error="No solution found",
-                statistics=solver.get_statistics()
-            )
+        response, queue_wait_ms = await get_executor().run(solve_request, puzzle_type, request,
+                                                           deadline=request.options.timeout)
+    except SolveTimeout as e:
+        response = timeout_response(request, e)
+        observe_solve(puzzle_type, response, timed_out=True)
+        return response
+    except ExecutorSaturated as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "1"})
+    except ExecutorUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+    if response.statistics is not None:
+        response.statistics.queue_wait_ms = queue_wait_ms
+    observe_solve(puzzle_type, response)
+    if (canonical is not None and response.success and response.checkpoint is None and
+            not response.statistics.budget_exhausted):
+        # Stored in the canonical orientation so symmetric inputs can share it
+        get_result_cache().put(key, response.model_copy(
+            update={"solution": canonical.reduce(response.solution)}, deep=True))
+    return response
+
+
+def timeout_response(request: PuzzleRequest, timeout: SolveTimeout) -> PuzzleResponse:
+    """Response for a solve that was killed, from the worker's last heartbeat"""
+    if timeout.progress:
+        statistics = Statistics(**dict(timeout.progress, budget_exhausted=True))
+    else:
+        statistics = Statistics(time_ms=request.options.timeout * 1000, nodes_explored=0,
+                                algorithm_used=request.options.algorithm or "", budget_exhausted=True)
+    return PuzzleResponse(success=False, error=str(timeout), statistics=statistics)
+
+
+@router.post("/sudoku/solve", response_model=PuzzleResponse)
+async def solve_sudoku(request: PuzzleRequest, http_request: Request):
+    return negotiate(http_request, await run_solve("sudoku", request, http_request))
+
+
+@router.post("/nqueens/solve", response_model=PuzzleResponse)
+async def solve_nqueens(request: PuzzleRequest, http_request: Request):
+    return negotiate(http_request, await run_solve("nqueens", request, http_request))
+
 
 @router.post("/maze/solve", response_model=PuzzleResponse)
-async def solve_maze(request: PuzzleRequest):
-    try:
-        solver = MazeSolver()
-        solution = solver.solve(request.input, request.options.model_dump())
-
-        if solution:
-            return PuzzleResponse(
-                success=True,
-                solution=solution,
-                steps=solver.steps if request.options.return_steps else [],
-                statistics=solver.get_statistics()
-            )
-        else:
-            return PuzzleResponse(
-                success=False,
-                error="No path found",
-                statistics=solver.get_statistics()
-            )
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+async def solve_maze(request: PuzzleRequest, http_request: Request):
+    return negotiate(http_request, await run_solve("maze", request, http_request))
 
 
 @router.post("/knight/solve", response_model=PuzzleResponse)
-async def solve_knight(request: PuzzleRequest):
-    try:
-        solver = KnightSolver()
-        solution = solver.solve(request.input, request.options.model_dump())
-
-        if solution:
-            # Check if it's a complete or partial solution
-            n = request.input['n']
-            total_squares = n * n
-            path_length = len(solution)
-
-            message = None
-            if path_length == total_squares:
-                message = "Complete tour found"
-            elif path_length > total_squares * 0.8:
-                message = f"Partial tour found: {path_length}/{total_squares} squares"
-
-            return PuzzleResponse(
-                success=True,
-                solution=solution,
-                steps=solver.steps if request.options.return_steps else [],
-                statistics=solver.get_statistics(),
-                message=message
-            )
-        else:
-            n = request.input['n']
-            if n < 5:
-                error_msg = f"No knight's tour exists for {n}×{n} board"
-            else:
-                error_msg = "No tour found from this position"
+async def solve_knight(request: PuzzleRequest, http_request: Request):
+    return negotiate(http_request, await run_solve("knight", request, http_request))
 
-            return PuzzleResponse(
-                success=False,
-                error=error_msg,
-                statistics=solver.get_statistics()
-            )
-    except TimeoutError:
-        return PuzzleResponse(
-            success=False,
-            error="Solution search timed out. Try Warnsdorff's Heuristic for faster results.",
-            statistics=solver.get_statistics() if 'solver' in locals() else None
-        )
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+
+# Hard deadline for a distance batch; MAX_DISTANCE_SOURCES rows take a few seconds
+DISTANCE_DEADLINE = 30
+
+
+def knight_distances(n: Optional[int], queries: List[tuple]) -> Dict[str, Any]:
+    """Answer a distance batch; executed in a solver worker process for bounded boards"""
+    solver = KnightSolver()
+    solver.start_timer()
+    solver.algorithm_used = "closed_form" if n is None else "bfs_table"
+    distances = solver.distances(n, queries)
+    return {
+        "distances": distances,
+        "statistics": solver.get_statistics()
+    }
+
+
+@router.post("/knight/distance")
+async def knight_distance(request: KnightDistanceRequest):
+    n = request.n
+    if n is not None and (n < 1 or n > MAX_DISTANCE_SIZE):
+        raise HTTPException(status_code=400,
+                            detail=f"Board size must be between 1 and {MAX_DISTANCE_SIZE}")
+    if len(request.queries) > 10000:
+        raise HTTPException(status_code=400, detail="At most 10000 queries per request")
+
+    if n is not None:
+        for source, target in request.queries:
+            for x, y in (source, target):
+                if not (0 <= x < n and 0 <= y < n):
+                    raise HTTPException(status_code=400,
+                                        detail=f"Square {(x, y)} is off the {n}x{n} board")
+        if KnightSolver().distance_sources(n, request.queries) > MAX_DISTANCE_SOURCES:
+            raise HTTPException(status_code=400, detail=f"At most {MAX_DISTANCE_SOURCES} distinct "
+                                                        f"source squares per request (up to symmetry)")
+
+    if n is None:
+        # The closed form is O(1) per query; not worth a trip to the pool
+        return knight_distances(None, request.queries)
+    try:
+        result, _ = await get_executor().run(knight_distances, n, request.queries,
+                                             deadline=DISTANCE_DEADLINE)
+    except SolveTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except ExecutorSaturated as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "1"})
+    except ExecutorUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return result
 
 
 @router.get("/puzzles/presets/{puzzle_type}")
@@ -284,10 +483,10 @@ async def get_presets(puzzle_type: str):
 @router.get("/puzzles/algorithms/{puzzle_type}")
 async def get_algorithms(puzzle_type: str):
     algorithms = {
-        "sudoku": ["backtracking", "constraint_propagation"],
-        "nqueens": ["backtracking"],
+        "sudoku": ["backtracking", "constraint_propagation", "csp", "sat"],
+        "nqueens": ["backtracking", "csp", "sat"],
         "maze": ["bfs", "dfs", "astar"],
-        "knight": ["warnsdorff", "backtracking"]
+        "knight": ["warnsdorff", "backtracking", "constructive"]
     }
 
     if puzzle_type not in algorithms:
@@ -0,0 +1,305 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+from app.models.schemas import MAX_SOLVE_TIMEOUT
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+SOLVE_WORKERS = int(os.environ.get("GRAPHSOLVE_SOLVE_WORKERS", os.cpu_count() or 1))
+# Solves allowed to wait for a worker before new ones are turned away
+SOLVE_QUEUE_DEPTH = int(os.environ.get("GRAPHSOLVE_SOLVE_QUEUE", 2 * SOLVE_WORKERS))
+# Address space ceiling per worker (RLIMIT_AS); 0 disables it
+WORKER_MEMORY_MB = int(os.environ.get("GRAPHSOLVE_WORKER_MEMORY_MB", 2048))
+HEARTBEAT_INTERVAL = 0.5  # seconds between progress reports from a busy worker
+# Past the solve's own timeout, how long the cooperative budget gets before the kill
+DEADLINE_GRACE = 2.0
+
+_progress: Optional[Callable[[], Dict[str, Any]]] = None
+_send: Optional[Callable[[Tuple[str, Any]], None]] = None
+
+
+class ExecutorSaturated(Exception):
+    """Every worker is busy and the queue is full; the client should retry (429)"""
+
+
+class ExecutorUnavailable(Exception):
+    """The pool is shut down or a worker died mid-solve (503)"""
+
+
+class SolveTimeout(Exception):
+    """The solve overran its hard deadline and its worker was killed"""
+
+    def __init__(self, deadline: float, progress: Optional[Dict[str, Any]]):
+        super().__init__(f"Solve exceeded its {deadline:g}s deadline and was stopped")
+        self.progress = progress
+
+
+def report_progress(source: Optional[Callable[[], Dict[str, Any]]]):
+    """Register what a busy worker reports in its heartbeats (call from the solve)"""
+    global _progress
+    _progress = source
+
+
+def emit(payload: Any):
+    """Send payload to the parent's on_event mid-solve (call from the solve).
+
+    Blocks while the parent is not reading, which pauses the solve."""
+    if _send is None:
+        raise RuntimeError("emit() is only available inside a solver worker")
+    _send(("event", payload))
+
+
+def _warm():
+    # Importing the solvers is the slow part of a worker's first solve
+    import app.api.endpoints  # noqa: F401
+
+
+def _worker_main(conn, memory_limit_mb: int):
+    if resource is not None and memory_limit_mb > 0:
+        limit = memory_limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    _warm()
+
+    global _send
+    lock = threading.Lock()
+
+    def send(message: Tuple[str, Any]):
+        with lock:
+            conn.send(message)
+
+    _send = send
+
+    def heartbeat():
+        while True:
+            time.sleep(HEARTBEAT_INTERVAL)
+            source = _progress
+            if source is not None:
+                try:
+                    send(("heartbeat", source()))
+                except Exception:
+                    pass
+
+    threading.Thread(target=heartbeat, daemon=True).start()
+    send(("ready", os.getpid()))
+
+    while True:
+        try:
+            fn, args = conn.recv()
+        except EOFError:
+            return
+        try:
+            message = ("result", fn(*args))
+        except MemoryError:
+            message = ("error", MemoryError(
+                f"Solve exceeded the {memory_limit_mb} MB worker memory limit"))
+        except Exception as e:
+            message = ("error", e)
+        finally:
+            report_progress(None)
+        try:
+            send(message)
+        except Exception as e:
+            # The result or exception could not be pickled
+            send(("error", RuntimeError(str(e))))
+
+
+class _Worker:
+    """One solver process and the parent's end of its pipe"""
+
+    def __init__(self, context, memory_limit_mb: int):
+        self.conn, child = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child, memory_limit_mb),
+                                       daemon=True)
+        self.process.start()
+        child.close()
+        self.ready = False
+        self.progress: Optional[Dict[str, Any]] = None
+        self.on_progress: Optional[Callable[[Dict[str, Any]], None]] = None
+        self.on_event: Optional[Callable[[Any], None]] = None
+
+    def receive(self, until_ready: bool = False) -> Tuple[str, Any]:
+        """Block until the next result or error, keeping heartbeats (runs in a thread)"""
+        while True:
+            try:
+                kind, payload = self.conn.recv()
+            except (EOFError, OSError):
+                return "died", None
+            if kind == "heartbeat":
+                self.progress = payload
+                if self.on_progress is not None:
+                    self.on_progress(payload)
+            elif kind == "event":
+                if self.on_event is not None:
+                    self.on_event(payload)
+            elif kind == "ready":
+                self.ready = True
+                if until_ready:
+                    return kind, payload
+            else:
+                return kind, payload
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+class SolveExecutor:
+    """Runs CPU-bound solves in worker processes so they never block the event loop.
+
+    At most workers + queue_depth solves are admitted at once; beyond that
+    run() raises ExecutorSaturated instead of letting the backlog grow.
+    Each solve has a hard deadline: a worker that overruns it is killed
+    and replaced, and the last heartbeat it sent is returned as partial
+    progress. Workers are spawned (not forked, as the server has threads
+    running), capped at memory_limit_mb of address space, and started
+    ahead of the first request by start().
+    """
+
+    def __init__(self, workers: int = SOLVE_WORKERS, queue_depth: int = SOLVE_QUEUE_DEPTH,
+                 memory_limit_mb: int = WORKER_MEMORY_MB):
+        self.workers = max(1, workers)
+        self.queue_depth = max(0, queue_depth)
+        self.memory_limit_mb = memory_limit_mb
+        self.context = multiprocessing.get_context("spawn")
+        self.idle: List[_Worker] = []
+        self.waiters: Deque[asyncio.Future] = deque()
+        self.spawned = 0
+        # One thread per worker waits on its pipe
+        self.readers = ThreadPoolExecutor(self.workers, thread_name_prefix="solve-reader")
+        self.in_flight = 0
+        self.restarts = 0
+        self.closed = False
+
+    def _spawn(self) -> _Worker:
+        self.spawned += 1
+        return _Worker(self.context, self.memory_limit_mb)
+
+    async def start(self):
+        """Start every worker now and wait until each has imported the solvers"""
+        self.closed = False
+        while self.spawned < self.workers:
+            self.idle.append(self._spawn())
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self.readers, worker.receive, True)
+                               for worker in self.idle if not worker.ready))
+
+    def shutdown(self):
+        self.closed = True
+        for worker in self.idle:
+            worker.kill()
+        self.spawned -= len(self.idle)
+        self.idle.clear()
+        while self.waiters:
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                waiter.set_exception(ExecutorUnavailable("Solver pool is shut down"))
+
+    @property
+    def saturated(self) -> bool:
+        return self.in_flight >= self.workers + self.queue_depth
+
+    async def _acquire(self) -> _Worker:
+        if self.idle:
+            return self.idle.pop()
+        if self.spawned < self.workers:
+            return self._spawn()
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiters.append(waiter)
+        try:
+            return await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled() and waiter.exception() is None:
+                self._release(waiter.result())
+            raise
+
+    def _release(self, worker: _Worker):
+        if self.closed:
+            worker.kill()
+            return
+        while self.waiters:
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(worker)
+                return
+        self.idle.append(worker)
+
+    def _replace(self, worker: _Worker):
+        """Kill a worker mid-solve and put a fresh one in its place"""
+        worker.kill()
+        self.spawned -= 1
+        self.restarts += 1
+        if not self.closed:
+            self._release(self._spawn())
+
+    async def run(self, fn: Callable, *args, deadline: float = MAX_SOLVE_TIMEOUT,
+                  on_progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+                  on_event: Optional[Callable[[Any], None]] = None) -> Tuple[Any, float]:
+        """fn(*args) in a worker; returns (result, milliseconds spent queued).
+
+        Raises SolveTimeout if it runs past deadline seconds (never more than
+        MAX_SOLVE_TIMEOUT) plus DEADLINE_GRACE, and re-raises whatever fn
+        raised. on_progress is called on the event loop with each heartbeat.
+        on_event is called in the pipe's reader thread with whatever the solve
+        passes to emit(); while it blocks the worker's sends block too.
+        """
+        deadline = min(deadline, MAX_SOLVE_TIMEOUT)
+        if self.closed:
+            raise ExecutorUnavailable("Solver pool is shut down")
+        if self.saturated:
+            raise ExecutorSaturated(f"All {self.workers} solver workers are busy")
+
+        loop = asyncio.get_running_loop()
+        self.in_flight += 1
+        submitted = time.monotonic()
+        try:
+            worker = await self._acquire()
+            queue_wait_ms = (time.monotonic() - submitted) * 1000
+            worker.progress = None
+            if on_progress is not None:
+                worker.on_progress = lambda progress: loop.call_soon_threadsafe(on_progress, progress)
+            worker.on_event = on_event
+            try:
+                worker.conn.send((fn, args))
+                reply = loop.run_in_executor(self.readers, worker.receive)
+                kind, payload = await asyncio.wait_for(asyncio.shield(reply),
+                                                       deadline + DEADLINE_GRACE)
+            except asyncio.TimeoutError:
+                progress = worker.progress
+                self._replace(worker)
+                raise SolveTimeout(deadline, progress)
+            except (asyncio.CancelledError, BrokenPipeError, OSError):
+                # Nobody wants the result (or the worker is gone); stop the solve
+                self._replace(worker)
+                raise
+            finally:
+                worker.on_progress = None
+                worker.on_event = None
+        finally:
+            self.in_flight -= 1
+
+        if kind == "died":
+            self._replace(worker)
+            raise ExecutorUnavailable("Solver worker died mid-solve")
+        self._release(worker)
+        if kind == "error":
+            raise payload
+        return payload, queue_wait_ms
+
+
+_executor: Optional[SolveExecutor] = None
+
+
+def get_executor() -> SolveExecutor:
+    global _executor
+    if _executor is None:
+        _executor = SolveExecutor()
+    return _executor
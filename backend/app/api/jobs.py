@@ -0,0 +1,218 @@
+from typing import Any, Dict, List, Optional
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from app.models.schemas import PuzzleRequest
+from app.api.endpoints import check_request, solve_request, timeout_response
+from app.api.serialization import dumps, json_response
+from app.api.metrics import observe_solve
+from app.api.admin import require_admin
+from app.api.executor import (
+    SOLVE_WORKERS, ExecutorSaturated, SolveTimeout, get_executor
+)
+from app.storage.jobs import (
+    CANCELLED, DONE, FAILED, FINISHED, QUEUED, JobNotFound, get_job_store
+)
+import asyncio
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+JOB_QUEUE_LIMIT = int(os.environ.get("GRAPHSOLVE_JOB_QUEUE", 100))
+# Jobs solved at once; the rest of the pool stays free for synchronous solves
+JOB_CONCURRENCY = int(os.environ.get("GRAPHSOLVE_JOB_CONCURRENCY", max(1, SOLVE_WORKERS // 2)))
+JOB_POLL_INTERVAL = 1.0  # seconds between dispatcher passes when nothing wakes it
+JOB_EVENT_INTERVAL = 0.5  # seconds between progress events on a job stream
+
+
+class JobRunner:
+    """Feeds queued jobs from the JobStore to the solver pool.
+
+    Up to concurrency jobs run at once. A job that finds the pool
+    saturated goes back to the queue. Jobs left running by a previous
+    process are requeued on start, and a job cancelled through the store
+    (from any process) is stopped on the next dispatcher pass. Store
+    calls go through the threadpool so SQLite never blocks the event loop.
+    """
+
+    def __init__(self, concurrency: int = JOB_CONCURRENCY):
+        self.concurrency = max(1, concurrency)
+        self.running: Dict[str, asyncio.Task] = {}
+        self.dispatcher: Optional[asyncio.Task] = None
+        self.wakeup: Optional[asyncio.Event] = None
+
+    async def start(self):
+        await run_in_threadpool(get_job_store().requeue_running)
+        self.wakeup = asyncio.Event()
+        self.dispatcher = asyncio.create_task(self._dispatch())
+
+    async def stop(self):
+        tasks = list(self.running.values())
+        if self.dispatcher is not None:
+            tasks.append(self.dispatcher)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.dispatcher = None
+
+    def notify(self):
+        if self.wakeup is not None:
+            self.wakeup.set()
+
+    def cancel(self, job_id: str):
+        task = self.running.get(job_id)
+        if task is not None:
+            task.cancel()
+
+    async def _dispatch(self):
+        store = get_job_store()
+        while True:
+            self.wakeup.clear()
+            try:
+                await self._dispatch_pass(store)
+            except Exception:
+                # e.g. "database is locked"; the next pass tries again
+                logger.exception("Job dispatcher pass failed")
+            # Not wait_for: on 3.11 it can swallow a cancel that lands as it times out
+            waiter = asyncio.ensure_future(self.wakeup.wait())
+            try:
+                await asyncio.wait({waiter}, timeout=JOB_POLL_INTERVAL)
+            finally:
+                waiter.cancel()
+
+    async def _dispatch_pass(self, store):
+        for job_id in list(self.running):
+            if (await run_in_threadpool(store.get, job_id))["status"] == CANCELLED:
+                self.cancel(job_id)
+        while len(self.running) < self.concurrency and not get_executor().saturated:
+            job = await run_in_threadpool(store.claim)
+            if job is None:
+                break
+            self.running[job["id"]] = asyncio.create_task(self._run(job))
+
+    async def _run(self, job: Dict[str, Any]):
+        store = get_job_store()
+        job_id = job["id"]
+        loop = asyncio.get_running_loop()
+        try:
+            request = PuzzleRequest.model_validate(job["request"])
+            try:
+                response, queue_wait_ms = await get_executor().run(
+                    solve_request, job["puzzle_type"], request,
+                    deadline=request.options.timeout,
+                    on_progress=lambda progress: loop.run_in_executor(
+                        None, store.set_progress, job_id, progress))
+                response.statistics.queue_wait_ms = queue_wait_ms
+                observe_solve(job["puzzle_type"], response)
+            except SolveTimeout as e:
+                response = timeout_response(request, e)
+                observe_solve(job["puzzle_type"], response, timed_out=True)
+            except ExecutorSaturated:
+                # Try again on a later pass, without waking the dispatcher
+                await run_in_threadpool(store.requeue, job_id)
+                return
+            await run_in_threadpool(store.finish, job_id, DONE,
+                                    result=response.model_dump(mode="json"))
+        except asyncio.CancelledError:
+            # Cancelled by the client (already recorded) or by shutdown (run it again later)
+            await run_in_threadpool(store.requeue, job_id)
+            raise
+        except Exception as e:
+            try:
+                await run_in_threadpool(store.finish, job_id, FAILED, error=str(e))
+            except Exception:
+                logger.exception("Could not record job %s as failed", job_id)
+        finally:
+            # A requeued job may already have been claimed again by a newer task
+            if self.running.get(job_id) is asyncio.current_task():
+                del self.running[job_id]
+        self.notify()
+
+
+_runner: Optional[JobRunner] = None
+
+
+def get_job_runner() -> JobRunner:
+    global _runner
+    if _runner is None:
+        _runner = JobRunner()
+    return _runner
+
+
+def _job(job_id: str, with_result: bool = False) -> Dict[str, Any]:
+    try:
+        return get_job_store().get(job_id, with_result)
+    except JobNotFound:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+
+
+@router.post("/jobs", status_code=202)
+async def submit_job(request: PuzzleRequest, http_request: Request) -> Dict[str, Any]:
+    """Queue a solve. Poll /jobs/{job_id} or stream /jobs/{job_id}/events,
+    then fetch /jobs/{job_id}/result."""
+    check_request(request.puzzle_type.value, request)
+    if request.options.profile:
+        require_admin(http_request, "Profiling")
+    store = get_job_store()
+    if await run_in_threadpool(store.count, QUEUED) >= JOB_QUEUE_LIMIT:
+        raise HTTPException(status_code=429, detail="Job queue is full",
+                            headers={"Retry-After": "5"})
+
+    job_id = await run_in_threadpool(store.submit, request.puzzle_type.value,
+                                     request.model_dump(mode="json"))
+    get_job_runner().notify()
+    return {"job_id": job_id, "status": QUEUED}
+
+
+@router.get("/jobs")
+def list_jobs(http_request: Request, limit: int = 50) -> List[Dict[str, Any]]:
+    """Recent jobs of every client; admin only, since a job ID is all it takes
+    to read or cancel a job"""
+    require_admin(http_request, "Listing jobs")
+    return get_job_store().recent(min(max(limit, 1), 500))
+
+
+@router.get("/jobs/{job_id}")
+def get_job(job_id: str) -> Dict[str, Any]:
+    return _job(job_id)
+
+
+@router.get("/jobs/{job_id}/result")
+def get_job_result(job_id: str):
+    job = _job(job_id, with_result=True)
+    if job["status"] == DONE:
+        return json_response(job["result"])
+    if job["status"] == FAILED:
+        raise HTTPException(status_code=400, detail=job["error"])
+    raise HTTPException(status_code=409, detail=f"Job is {job['status']}")
+
+
+@router.post("/jobs/{job_id}/cancel")
+async def cancel_job(job_id: str) -> Dict[str, Any]:
+    await run_in_threadpool(_job, job_id)
+    await run_in_threadpool(get_job_store().finish, job_id, CANCELLED)
+    get_job_runner().cancel(job_id)
+    return await run_in_threadpool(_job, job_id)
+
+
+@router.get("/jobs/{job_id}/events")
+async def job_events(job_id: str):
+    """Server-Sent Events: `progress` with the solver's latest statistics, then one final `status`"""
+    await run_in_threadpool(_job, job_id)
+
+    async def events():
+        progress = None
+        while True:
+            job = await run_in_threadpool(_job, job_id)
+            if job["progress"] is not None and job["progress"] != progress:
+                progress = job["progress"]
+                yield f"event: progress\ndata: {dumps(progress).decode()}\n\n"
+            if job["status"] in FINISHED:
+                yield f"event: status\ndata: {dumps(job).decode()}\n\n"
+                return
+            await asyncio.sleep(JOB_EVENT_INTERVAL)
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
@@ -0,0 +1,256 @@
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Iterable, List, Tuple
+from bisect import bisect_left
+from fastapi import APIRouter
+from fastapi.responses import Response
+from app.models.schemas import PuzzleResponse
+from app.api.cache import get_result_cache
+from app.api.executor import get_executor
+from app.api.singleflight import get_single_flight
+from app.storage.jobs import QUEUED, RUNNING, get_job_store
+import threading
+import time
+
+router = APIRouter()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+SECONDS_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+                   30.0, 60.0)
+COUNT_BUCKETS = (0, 1, 10, 30, 100, 300, 1000, 3000, 10000, 30000, 100000, 300000, 1000000,
+                 3000000, 10000000)
+
+
+def _labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric(ABC):
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: Iterable[str] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        # Held only for the few increments of one update; scrapes copy under it
+        self.lock = threading.Lock()
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+    @abstractmethod
+    def render(self) -> List[str]:
+        pass
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Iterable[str] = ()):
+        super().__init__(name, help, labels)
+        self.values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1):
+        with self.lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        with self.lock:
+            values = list(self.values.items())
+        return self.header() + [f"{self.name}{_labels(self.labels, key)} {_number(value)}"
+                                for key, value in values]
+
+
+class Collected(_Metric):
+    """A gauge or counter kept elsewhere, read when scraped from a callback
+    returning {label values: value}"""
+
+    def __init__(self, name: str, help: str, read: Callable[[], Dict[Tuple[str, ...], float]],
+                 labels: Iterable[str] = (), kind: str = "gauge"):
+        super().__init__(name, help, labels)
+        self.read = read
+        self.kind = kind
+
+    def render(self) -> List[str]:
+        return self.header() + [f"{self.name}{_labels(self.labels, key)} {_number(value)}"
+                                for key, value in self.read().items()]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, buckets: Tuple[float, ...], labels: Iterable[str] = ()):
+        super().__init__(name, help, labels)
+        self.buckets = buckets
+        # Per label set: a count per bucket (not cumulative), then sum
+        self.series: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, *labels: str):
+        index = bisect_left(self.buckets, value)
+        with self.lock:
+            series = self.series.get(labels)
+            if series is None:
+                series = self.series[labels] = [0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    def render(self) -> List[str]:
+        with self.lock:
+            series = [(key, list(values)) for key, values in self.series.items()]
+        lines = self.header()
+        for key, values in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), values):
+                cumulative += count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labels, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labels, key)} {_number(values[-1])}")
+            lines.append(f"{self.name}_count{_labels(self.labels, key)} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: List[_Metric] = []
+
+    def add(self, metric: _Metric) -> _Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+HTTP_REQUESTS = REGISTRY.add(Counter(
+    "graphsolve_http_requests_total", "HTTP requests by route template and status",
+    ("method", "route", "status")))
+HTTP_DURATION = REGISTRY.add(Histogram(
+    "graphsolve_http_request_duration_seconds",
+    "Time to the response headers (streams keep running after)", SECONDS_BUCKETS, ("route",)))
+SOLVES = REGISTRY.add(Counter(
+    "graphsolve_solves_total", "Finished solves; outcome is solved, unsolved, exhausted (hit "
+    "its time or node budget) or timeout (killed at the hard deadline)",
+    ("puzzle_type", "algorithm", "outcome")))
+SOLVE_DURATION = REGISTRY.add(Histogram(
+    "graphsolve_solve_duration_seconds", "Solver time per solve, excluding the queue",
+    SECONDS_BUCKETS, ("puzzle_type", "algorithm")))
+NODES_EXPLORED = REGISTRY.add(Histogram(
+    "graphsolve_nodes_explored", "Search nodes explored per solve",
+    COUNT_BUCKETS, ("puzzle_type", "algorithm")))
+BACKTRACKS = REGISTRY.add(Histogram(
+    "graphsolve_backtracks", "Backtracks per solve", COUNT_BUCKETS, ("puzzle_type", "algorithm")))
+SPAN_DURATION = REGISTRY.add(Histogram(
+    "graphsolve_solve_span_seconds", "Self time per solve phase (validate, propagate, search, "
+    "build_response)", SECONDS_BUCKETS, ("puzzle_type", "span")))
+QUEUE_WAIT = REGISTRY.add(Histogram(
+    "graphsolve_queue_wait_seconds", "Time spent waiting for a solver worker",
+    SECONDS_BUCKETS, ("puzzle_type",)))
+CACHE_LOOKUPS = REGISTRY.add(Counter(
+    "graphsolve_cache_lookups_total", "Result cache lookups; result is hit or miss",
+    ("puzzle_type", "result")))
+
+
+def observe_solve(puzzle_type: str, response: PuzzleResponse, timed_out: bool = False):
+    """Record one finished solve from the statistics its worker sent back"""
+    statistics = response.statistics
+    if statistics is None or statistics.cache_hit:
+        return
+    algorithm = statistics.algorithm_used or "default"
+    if timed_out:
+        outcome = "timeout"
+    elif statistics.budget_exhausted:
+        outcome = "exhausted"
+    else:
+        outcome = "solved" if response.success else "unsolved"
+    SOLVES.inc(puzzle_type, algorithm, outcome)
+    SOLVE_DURATION.observe(statistics.time_ms / 1000, puzzle_type, algorithm)
+    NODES_EXPLORED.observe(statistics.nodes_explored, puzzle_type, algorithm)
+    BACKTRACKS.observe(statistics.backtrack_count or 0, puzzle_type, algorithm)
+    for timing in statistics.spans or ():
+        SPAN_DURATION.observe(timing.self_ms / 1000, puzzle_type, timing.name)
+    if statistics.queue_wait_ms is not None:
+        QUEUE_WAIT.observe(statistics.queue_wait_ms / 1000, puzzle_type)
+
+
+def observe_cache(puzzle_type: str, hit: bool):
+    CACHE_LOOKUPS.inc(puzzle_type, "hit" if hit else "miss")
+
+
+def _pool() -> Dict[Tuple[str, ...], float]:
+    executor = get_executor()
+    queued = len(executor.waiters)
+    return {("workers",): executor.workers, ("busy",): executor.in_flight - queued,
+            ("queued",): queued, ("idle",): len(executor.idle)}
+
+
+def _jobs() -> Dict[Tuple[str, ...], float]:
+    store = get_job_store()
+    return {(status,): store.count(status) for status in (QUEUED, RUNNING)}
+
+
+REGISTRY.add(Collected(
+    "graphsolve_pool_workers", "Solver pool by state; queued counts admitted solves waiting "
+    "for a worker", _pool, ("state",)))
+REGISTRY.add(Collected(
+    "graphsolve_pool_worker_restarts_total", "Workers killed and replaced after a timeout, "
+    "cancellation or crash", lambda: {(): get_executor().restarts}, kind="counter"))
+REGISTRY.add(Collected(
+    "graphsolve_coalesced_requests_total", "Requests that joined an identical in-flight solve",
+    lambda: {(): get_single_flight().coalesced}, kind="counter"))
+REGISTRY.add(Collected(
+    "graphsolve_cache_entries", "Responses held in the result cache",
+    lambda: {(): len(get_result_cache().entries)}))
+REGISTRY.add(Collected("graphsolve_jobs", "Jobs by status", _jobs, ("status",)))
+
+
+class MetricsMiddleware:
+    """Counts and times every HTTP request under its route template, not its raw path"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = [500]
+
+        async def send_status(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+                # Routing has filled in the matched route by now
+                HTTP_DURATION.observe(time.perf_counter() - start, _route(scope))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_status)
+        finally:
+            HTTP_REQUESTS.inc(scope["method"], _route(scope), str(status[0]))
+
+
+def _route(scope) -> str:
+    return getattr(scope.get("route"), "path", None) or "unmatched"
+
+
+@router.get("/metrics")
+def metrics():
+    """Prometheus text exposition of this process's registry"""
+    return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
@@ -0,0 +1,129 @@
+from typing import Any, Dict, List, Optional, Tuple
+from fastapi import Request
+from fastapi.responses import Response
+from pydantic import BaseModel
+import json
+import struct
+
+try:
+    import orjson
+except ImportError:  # optional; the standard library encoder is the fallback
+    orjson = None
+
+PACKED_MEDIA_TYPE = "application/x-graphsolve-packed"
+PACKED_MAGIC = b"GSP1"
+NO_VALUE = -2 ** 31  # int32 column entry whose value is in the header instead
+INT32_MIN, INT32_MAX = NO_VALUE + 1, 2 ** 31 - 1
+
+
+def dumps(data: Any) -> bytes:
+    """JSON bytes for plain data, with orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, separators=(",", ":"), default=list).encode()
+
+
+def json_response(data: Any, status_code: int = 200) -> Response:
+    """A JSON response that skips FastAPI's response_model validation and
+    jsonable_encoder; pydantic models serialize in pydantic-core."""
+    if isinstance(data, BaseModel):
+        body = data.model_dump_json().encode()
+    else:
+        body = dumps(data)
+    return Response(body, status_code=status_code, media_type="application/json")
+
+
+def _is_int(value: Any) -> bool:
+    return type(value) is int and INT32_MIN <= value <= INT32_MAX
+
+
+def _is_pair(value: Any) -> bool:
+    return isinstance(value, (list, tuple)) and len(value) == 2 and all(map(_is_int, value))
+
+
+class _Packer:
+    """Collects int32 sections; the header refers to them by offset (in ints)"""
+
+    def __init__(self):
+        self.ints: List[int] = []
+
+    def add(self, values: List[int]) -> int:
+        offset = len(self.ints)
+        self.ints.extend(values)
+        return offset
+
+    def solution(self, solution: Any) -> Any:
+        """Grids, paths, flat squares and lists of queen placements become
+        int32 sections; anything else stays inline"""
+        if not isinstance(solution, list) or not solution:
+            return solution
+        if all(map(_is_int, solution)):
+            return {"$packed": "ints", "offset": self.add(solution), "length": len(solution)}
+        if all(map(_is_pair, solution)):
+            return {"$packed": "pairs", "offset": self.add([v for pair in solution for v in pair]),
+                    "length": len(solution)}
+        if (all(isinstance(row, list) and all(map(_is_int, row)) for row in solution) and
+                len({len(row) for row in solution}) == 1):
+            return {"$packed": "grid", "offset": self.add([v for row in solution for v in row]),
+                    "rows": len(solution), "cols": len(solution[0])}
+        if all(isinstance(queens, list) and all(map(_is_pair, queens)) for queens in solution):
+            # The list lengths first, then every pair in order
+            offset = self.add([len(queens) for queens in solution])
+            self.add([v for queens in solution for pair in queens for v in pair])
+            return {"$packed": "pair_lists", "offset": offset, "length": len(solution)}
+        return solution
+
+    def steps(self, steps: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Steps as six int32 columns: action, row, col, value, index and
+        description, the last two as indices into string tables"""
+        actions: Dict[str, int] = {}
+        descriptions: Dict[str, int] = {}
+        objects: Dict[int, Any] = {}
+        columns: Tuple[List[int], ...] = ([], [], [], [], [], [])
+        for i, step in enumerate(steps):
+            position = step.get("position")
+            value = step.get("value")
+            index = step.get("index")
+            columns[0].append(actions.setdefault(step["action"], len(actions)))
+            columns[1].append(position[0] if position else -1)
+            columns[2].append(position[1] if position else -1)
+            if value is not None and _is_int(value):
+                columns[3].append(value)
+            else:
+                columns[3].append(NO_VALUE)
+                if value is not None:
+                    objects[i] = value
+            columns[4].append(index if index is not None else -1)
+            columns[5].append(descriptions.setdefault(step.get("description") or "", len(descriptions)))
+
+        offset = len(self.ints)
+        for column in columns:
+            self.add(column)
+        return {"$packed": "steps", "offset": offset, "length": len(steps),
+                "actions": list(actions), "descriptions": list(descriptions), "values": objects}
+
+
+def pack_response(data: Dict[str, Any]) -> bytes:
+    """The packed layout: b"GSP1", the header length as a little-endian
+    uint32, the JSON header padded to a multiple of 4 bytes, then one
+    little-endian int32 array that the header's "$packed" entries index."""
+    packer = _Packer()
+    header = dict(data)
+    if data.get("solution"):
+        header["solution"] = packer.solution(data["solution"])
+    if data.get("steps"):
+        header["steps"] = packer.steps(data["steps"])
+
+    encoded = dumps(header)
+    encoded += b" " * (-len(encoded) % 4)
+    body = struct.pack(f"<{len(packer.ints)}i", *packer.ints)
+    return PACKED_MAGIC + struct.pack("<I", len(encoded)) + encoded + body
+
+
+def negotiate(request: Optional[Request], response: BaseModel) -> Response:
+    """Encode a response model in the format the client's Accept header asks for"""
+    accept = request.headers.get("accept", "") if request is not None else ""
+    if PACKED_MEDIA_TYPE in accept:
+        return Response(pack_response(response.model_dump(mode="json")),
+                        media_type=PACKED_MEDIA_TYPE)
+    return json_response(response)
@@ -0,0 +1,65 @@
+from typing import Any, Awaitable, Callable, Dict, Optional
+import asyncio
+
+DISCONNECT_POLL_INTERVAL = 0.25  # seconds between checks that a waiter is still connected
+
+
+class ClientDisconnected(Exception):
+    pass
+
+
+class _Call:
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Runs one call per key at a time; concurrent callers with the same key share it.
+
+    The shared task keeps running while any caller still waits for it. A
+    caller that is cancelled, or whose client disconnects, stops waiting;
+    when the last one leaves, the task itself is cancelled.
+    """
+
+    def __init__(self):
+        self.calls: Dict[str, _Call] = {}
+        self.coalesced = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]],
+                 disconnected: Optional[Callable[[], Awaitable[bool]]] = None) -> Any:
+        call = self.calls.get(key)
+        if call is None:
+            call = self.calls[key] = _Call(asyncio.ensure_future(fn()))
+            call.task.add_done_callback(lambda _: self._forget(key, call))
+        else:
+            self.coalesced += 1
+
+        call.waiters += 1
+        try:
+            while True:
+                done, _ = await asyncio.wait(
+                    {call.task}, timeout=DISCONNECT_POLL_INTERVAL if disconnected else None)
+                if done:
+                    return call.task.result()
+                if await disconnected():
+                    raise ClientDisconnected()
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                call.task.cancel()
+                self._forget(key, call)
+
+    def _forget(self, key: str, call: _Call):
+        if self.calls.get(key) is call:
+            del self.calls[key]
+
+
+_flights: Optional[SingleFlight] = None
+
+
+def get_single_flight() -> SingleFlight:
+    global _flights
+    if _flights is None:
+        _flights = SingleFlight()
+    return _flights
@@ -0,0 +1,216 @@
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from app.models.schemas import PuzzleRequest, PuzzleResponse
+from app.solvers.trace import TraceBuffer
+from app.api.endpoints import SOLVERS, build_response, check_request, timeout_response
+from app.api.executor import SolveTimeout, emit, get_executor, report_progress
+from app.api.serialization import dumps
+from app.api.metrics import observe_solve
+import asyncio
+import threading
+import time
+
+router = APIRouter()
+
+STREAM_BATCH_SIZE = 200
+STREAM_FLUSH_INTERVAL = 0.05  # seconds; bounds the latency of a partial batch
+STREAM_MAX_PENDING = 8  # batches in flight before the solver is paused
+
+
+class StepStream(TraceBuffer):
+    """Trace that sends steps to the API process in batches instead of keeping them.
+
+    Runs in a solver worker. A batch is emitted when it is full or
+    STREAM_FLUSH_INTERVAL has passed, and the arrays are emptied, so the
+    worker never holds more than one batch. Emitting blocks while the API
+    process is not reading, which pauses the solver until the client
+    catches up.
+    """
+
+    def __init__(self, descriptions: Dict[str, str], batch_size: int = STREAM_BATCH_SIZE):
+        super().__init__(descriptions)
+        self.batch_size = batch_size
+        self.offset = 0
+        self.last_flush = time.monotonic()
+
+    def append(self, action: str, position: Optional[Tuple[int, int]] = None,
+               value: Any = None, description: str = ""):
+        super().append(action, position, value, description)
+        if (len(self) >= self.batch_size or
+                time.monotonic() - self.last_flush >= STREAM_FLUSH_INTERVAL):
+            self.flush()
+
+    def _make_room(self) -> bool:
+        # Sent steps cannot be thinned, so max_steps is a hard cap on the stream
+        return self.max_steps is None or self.offset + len(self) < self.max_steps
+
+    def flush(self):
+        if len(self):
+            emit({"offset": self.offset, "steps": [self.as_dict(i) for i in range(len(self))]})
+            self.offset += len(self)
+            self.clear()
+        # Time spent blocked does not count towards the next batch
+        self.last_flush = time.monotonic()
+
+
+def stream_solve_request(puzzle_type: str, request: PuzzleRequest) -> PuzzleResponse:
+    """Run one solve, emitting its steps as it goes; executed in a solver worker process"""
+    solver = SOLVERS[puzzle_type]()
+    report_progress(lambda: solver.get_statistics().model_dump())
+    stream = StepStream(solver.step_descriptions)
+    solver.trace = stream
+    options = request.options.model_dump()
+    options['return_steps'] = True
+    solution = solver.solve(request.input, options)
+    stream.flush()
+    return build_response(puzzle_type, request, solver, solution, include_steps=False)
+
+
+class StepRelay:
+    """The API process's end of a stream: batches wait here for the client.
+
+    deliver() runs in the executor's reader thread and blocks once
+    max_pending batches are waiting; the worker's pipe then fills and the
+    solver pauses. close() releases it when the client has gone.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, max_pending: int = STREAM_MAX_PENDING):
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.slots = threading.Semaphore(max_pending)
+        self.closed = False
+
+    def deliver(self, batch: Dict[str, Any]):
+        # Wait for room, giving up once the consumer has gone
+        while not self.slots.acquire(timeout=0.1):
+            if self.closed:
+                return
+        if not self.closed:
+            self.loop.call_soon_threadsafe(self.queue.put_nowait, ("steps", batch))
+
+    def finish(self, _task: asyncio.Future):
+        self.queue.put_nowait(("done", None))
+
+    async def get(self) -> Tuple[str, Any]:
+        event, payload = await self.queue.get()
+        if event == "steps":
+            self.slots.release()
+        return event, payload
+
+    def close(self):
+        self.closed = True
+
+
+async def solve_events(puzzle_type: str, request: PuzzleRequest) -> AsyncIterator[Tuple[str, Any]]:
+    """Run a solve in the solver pool, yielding ("steps", batch) events then ("result", response).
+
+    Streams share the pool's admission limit, hard deadline and memory cap
+    with every other solve; leaving early kills the worker's solve.
+    """
+    relay = StepRelay(asyncio.get_running_loop())
+    task = asyncio.ensure_future(get_executor().run(
+        stream_solve_request, puzzle_type, request, deadline=request.options.timeout,
+        on_event=relay.deliver))
+    task.add_done_callback(relay.finish)
+    try:
+        while True:
+            event, payload = await relay.get()
+            if event == "done":
+                break
+            yield event, payload
+
+        try:
+            response, _ = task.result()
+        except SolveTimeout as e:
+            response = timeout_response(request, e)
+            observe_solve(puzzle_type, response, timed_out=True)
+            yield "result", response.model_dump(mode="json")
+            return
+        except Exception as e:
+            yield "error", {"detail": str(e)}
+            return
+        observe_solve(puzzle_type, response)
+        yield "result", response.model_dump(mode="json")
+    finally:
+        # Reached on client disconnect too: unblock the relay and stop the solve
+        relay.close()
+        if not task.done():
+            task.cancel()
+
+
+def _check_puzzle_type(puzzle_type: str):
+    if puzzle_type not in SOLVERS:
+        raise HTTPException(status_code=404, detail="Puzzle type not found")
+
+
+def _check_capacity():
+    """Refuse a stream up front, while a status code can still be sent"""
+    executor = get_executor()
+    if executor.closed:
+        raise HTTPException(status_code=503, detail="Solver pool is shut down")
+    if executor.saturated:
+        raise HTTPException(status_code=429, detail=f"All {executor.workers} solver workers are busy",
+                            headers={"Retry-After": "1"})
+
+
+# Emitting step batches would dominate a profile of the solve
+PROFILE_UNSUPPORTED = "Profiling is available on /{puzzle_type}/solve and /jobs, not on streams"
+
+
+@router.post("/{puzzle_type}/solve/stream")
+async def stream_solve(puzzle_type: str, request: PuzzleRequest):
+    """Server-Sent Events: `steps` events carry {offset, steps}, then one `result` or `error`"""
+    _check_puzzle_type(puzzle_type)
+    check_request(puzzle_type, request)
+    if request.options.profile:
+        raise HTTPException(status_code=400, detail=PROFILE_UNSUPPORTED)
+    _check_capacity()
+
+    async def events():
+        async for event, payload in solve_events(puzzle_type, request):
+            yield f"event: {event}\ndata: {dumps(payload).decode()}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@router.websocket("/{puzzle_type}/solve/ws")
+async def websocket_solve(websocket: WebSocket, puzzle_type: str):
+    """Send a PuzzleRequest as JSON; receive {event, data} messages like the SSE stream"""
+    await websocket.accept()
+    if puzzle_type not in SOLVERS:
+        await websocket.close(code=4404, reason="Puzzle type not found")
+        return
+
+    try:
+        request = PuzzleRequest.model_validate(await websocket.receive_json())
+    except (ValidationError, ValueError) as e:
+        await websocket.send_json({"event": "error", "data": {"detail": str(e)}})
+        await websocket.close(code=4400)
+        return
+    try:
+        check_request(puzzle_type, request)
+    except HTTPException as e:
+        await websocket.send_json({"event": "error", "data": {"detail": e.detail}})
+        await websocket.close(code=4400)
+        return
+    if request.options.profile:
+        await websocket.send_json({"event": "error", "data": {"detail": PROFILE_UNSUPPORTED}})
+        await websocket.close(code=4400)
+        return
+    try:
+        _check_capacity()
+    except HTTPException as e:
+        await websocket.send_json({"event": "error", "data": {"detail": e.detail}})
+        # 1013: try again later
+        await websocket.close(code=1013 if e.status_code == 429 else 1011)
+        return
+
+    try:
+        async for event, payload in solve_events(puzzle_type, request):
+            await websocket.send_json({"event": event, "data": payload})
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
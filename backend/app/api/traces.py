@@ -0,0 +1,41 @@
+from typing import Any, Dict, Optional
+from fastapi import APIRouter, HTTPException, Query, Request
+from app.models.schemas import TraceWindow
+from app.storage.traces import TraceNotFound, get_trace_store
+from app.api.serialization import negotiate
+
+router = APIRouter()
+
+MAX_TRACE_WINDOW = 5000
+
+
+@router.get("/traces/{trace_id}")
+def get_trace_info(trace_id: str) -> Dict[str, Any]:
+    try:
+        return get_trace_store().info(trace_id)
+    except TraceNotFound:
+        raise HTTPException(status_code=404, detail="Trace not found or expired")
+
+
+@router.get("/traces/{trace_id}/steps", response_model=TraceWindow)
+def get_trace_steps(trace_id: str, http_request: Request, offset: int = Query(0, ge=0),
+                    limit: int = Query(1000, ge=1, le=MAX_TRACE_WINDOW),
+                    seek: Optional[int] = Query(None, ge=0)):
+    """A window of stored steps. With seek, the window starts at the last
+    keyframe at or before that step index (the `index` field of a step)."""
+    store = get_trace_store()
+    try:
+        info = store.info(trace_id)
+        if seek is not None:
+            offset = store.keyframe_before(trace_id, seek)
+        steps = store.read(trace_id, offset, limit)
+    except TraceNotFound:
+        raise HTTPException(status_code=404, detail="Trace not found or expired")
+
+    return negotiate(http_request, TraceWindow.model_construct(
+        trace_id=trace_id,
+        offset=offset,
+        length=info["length"],
+        steps_total=info["steps_total"],
+        steps=steps
+    ))
@@ -1,6 +1,8 @@
-from typing import List, Set, Dict, Optional, Tuple, Any
+from typing import List, Set, Dict, Optional, Tuple, Any, Iterable, Sequence
 from collections import defaultdict, deque
+from array import array
 import heapq
+from app.graph import traversal
 
 
 class Graph:
@@ -23,120 +25,337 @@ class Graph:
         return self.adj_list[v]
 
     def bfs(self, start, target=None):
-        visited = set()
-        queue = deque([(start, [start])])
-        visited.add(start)
-        paths = []
+        """The path to target, or without one the finished Traversal: call
+        path_to(v) for just the paths needed instead of building them all"""
+        search = traversal.bfs(self, start)
+        if target is not None:
+            return search.until(target).path_to(target)
+        return search.run()
 
-        while queue:
-            node, path = queue.popleft()
-
-            if target and node == target:
-                return path
-
-            for neighbor, _ in self.adj_list[node]:
-                if neighbor not in visited:
-                    visited.add(neighbor)
-                    new_path = path + [neighbor]
-                    queue.append((neighbor, new_path))
-                    paths.append(new_path)
+    def dfs(self, start, target=None):
+        """The path to target, or without one the finished Traversal: call
+        path_to(v) for just the paths needed instead of building them all"""
+        search = traversal.dfs(self, start)
+        if target is not None:
+            return search.until(target).path_to(target)
+        return search.run()
 
-        return paths if not target else None
+    def astar(self, start, goal, heuristic):
+        return traversal.astar(self, start, goal, heuristic).until(goal).path_to(goal)
+
+    def dijkstra(self, start, goal):
+        return traversal.dijkstra(self, start).until(goal).path_to(goal)
+
+    def bidirectional_search(self, start, goal):
+        return traversal.bidirectional(self, start, goal).run().path()
+
+    def to_csr(self) -> Tuple['CSRGraph', List]:
+        """Compact copy of this graph plus the vertex for each integer ID"""
+        labels = list(self.vertices)
+        index = {v: i for i, v in enumerate(labels)}
+        edges = [(index[u], index[v], w) for u in labels for v, w in self.adj_list[u]]
+        return CSRGraph.from_edges(len(labels), edges, directed=True), labels
+
+
+class CSRGraph:
+    """Graph on vertices 0..n-1 in compressed sparse row form.
+
+    The neighbours of v are targets[offsets[v]:offsets[v + 1]], with the
+    matching weights alongside. Everything lives in flat typed arrays, so
+    an edge costs 4 bytes (12 with weights) instead of a tuple in a list.
+    Build it in bulk with from_edges() or from_grid(); it is immutable
+    afterwards.
+    """
+
+    def __init__(self, offsets: array, targets: array, weights: Optional[array] = None,
+                 directed: bool = False):
+        self.offsets = offsets
+        self.targets = targets
+        # None means every edge has weight 1
+        self.weights = weights
+        self.directed = directed
+        self.num_vertices = len(offsets) - 1
+
+    @classmethod
+    def from_edges(cls, num_vertices: int, edges: Iterable[Sequence], directed: bool = False) -> 'CSRGraph':
+        """Build from (u, v) or (u, v, weight) tuples with a two-pass counting sort"""
+        sources, dests = array('i'), array('i')
+        weights = array('d')
+        weighted = False
+        for edge in edges:
+            u, v = edge[0], edge[1]
+            if not (0 <= u < num_vertices and 0 <= v < num_vertices):
+                raise ValueError(f"Edge ({u}, {v}) is outside 0..{num_vertices - 1}")
+            sources.append(u)
+            dests.append(v)
+            weight = edge[2] if len(edge) > 2 else 1.0
+            weighted = weighted or weight != 1.0
+            weights.append(weight)
+
+        if not directed:
+            sources, dests = sources + dests, dests + sources
+            weights = weights + weights
+
+        offsets = array('i', [0]) * (num_vertices + 1)
+        for u in sources:
+            offsets[u + 1] += 1
+        for v in range(num_vertices):
+            offsets[v + 1] += offsets[v]
+
+        fill = offsets[:-1]
+        targets = array('i', [0]) * len(sources)
+        edge_weights = array('d', [0.0]) * len(sources) if weighted else None
+        for i in range(len(sources)):
+            u = sources[i]
+            slot = fill[u]
+            targets[slot] = dests[i]
+            if weighted:
+                edge_weights[slot] = weights[i]
+            fill[u] = slot + 1
+
+        return cls(offsets, targets, edge_weights, directed)
+
+    @classmethod
+    def from_grid(cls, grid: List[List[int]], diagonal: bool = False) -> 'CSRGraph':
+        """Open cells (0) of a grid, vertex row * cols + col, linked to open neighbours.
+
+        Neighbours are listed right, down, left, up like MazeSolver, then the
+        diagonals when requested. Walls keep their IDs but have no edges.
+        """
+        rows, cols = len(grid), len(grid[0]) if grid else 0
+        directions = [(0, 1), (1, 0), (0, -1), (-1, 0)]
+        if diagonal:
+            directions += [(1, 1), (1, -1), (-1, -1), (-1, 1)]
+
+        offsets = array('i', [0]) * (rows * cols + 1)
+        targets = array('i')
+        for row in range(rows):
+            for col in range(cols):
+                if grid[row][col] == 0:
+                    for dr, dc in directions:
+                        r, c = row + dr, col + dc
+                        if 0 <= r < rows and 0 <= c < cols and grid[r][c] == 0:
+                            targets.append(r * cols + c)
+                offsets[row * cols + col + 1] = len(targets)
+
+        return cls(offsets, targets)
+
+    @property
+    def num_edges(self) -> int:
+        return len(self.targets) if self.directed else len(self.targets) // 2
+
+    @property
+    def nbytes(self) -> int:
+        size = self.offsets.itemsize * len(self.offsets) + self.targets.itemsize * len(self.targets)
+        if self.weights is not None:
+            size += self.weights.itemsize * len(self.weights)
+        return size
+
+    def degree(self, v: int) -> int:
+        return self.offsets[v + 1] - self.offsets[v]
+
+    def neighbors(self, v: int) -> array:
+        return self.targets[self.offsets[v]:self.offsets[v + 1]]
+
+    def get_neighbors(self, v: int) -> List[Tuple[int, float]]:
+        """Same shape as Graph.get_neighbors"""
+        lo, hi = self.offsets[v], self.offsets[v + 1]
+        if self.weights is None:
+            return [(self.targets[i], 1.0) for i in range(lo, hi)]
+        return [(self.targets[i], self.weights[i]) for i in range(lo, hi)]
+
+    def _path(self, parent: array, v: int) -> List[int]:
+        path = [v]
+        while parent[v] != v:
+            v = parent[v]
+            path.append(v)
+        path.reverse()
+        return path
+
+    def _traversal(self, start: int, order: List[int], parent: array) -> traversal.Traversal:
+        """Finished Traversal from a parent array; order lists the vertices
+        reached after start, each after its parent"""
+        result = traversal.Traversal(start)
+        dist, pred = result.dist, result.pred
+        for v in order:
+            u = parent[v]
+            pred[v] = u
+            dist[v] = dist[u] + 1
+        return result
+
+    def bfs(self, start: int, target: Optional[int] = None):
+        """Same contract as Graph.bfs, tracking parents in an array instead of copying paths"""
+        offsets, targets = self.offsets, self.targets
+        parent = array('i', [-1]) * self.num_vertices
+        parent[start] = start
+        queue = deque([start])
+        order = []
 
-    def dfs(self, start, target=None):
-        visited = set()
-        stack = [(start, [start])]
-        paths = []
+        while queue:
+            node = queue.popleft()
+
+            if target is not None and node == target:
+                return self._path(parent, node)
+
+            for i in range(offsets[node], offsets[node + 1]):
+                neighbor = targets[i]
+                if parent[neighbor] < 0:
+                    parent[neighbor] = node
+                    queue.append(neighbor)
+                    order.append(neighbor)
+
+        if target is not None:
+            return None
+        return self._traversal(start, order, parent)
+
+    def dfs(self, start: int, target: Optional[int] = None):
+        """Same contract as Graph.dfs, tracking parents in an array instead of copying paths"""
+        offsets, targets = self.offsets, self.targets
+        parent = array('i', [-1]) * self.num_vertices
+        visited = bytearray(self.num_vertices)
+        # Parallel stacks of (vertex, vertex it was pushed from)
+        stack, pushed_from = [start], [start]
+        order = []
 
         while stack:
-            node, path = stack.pop()
+            node = stack.pop()
+            came_from = pushed_from.pop()
 
-            if node in visited:
+            if visited[node]:
                 continue
 
-            visited.add(node)
-
-            if target and node == target:
-                return path
-
-            for neighbor, _ in self.adj_list[node]:
-                if neighbor not in visited:
-                    new_path = path + [neighbor]
-                    stack.append((neighbor, new_path))
-                    paths.append(new_path)
-
-        return paths if not target else None
-
-    def astar(self, start, goal, heuristic):
-        open_set = [(0, start, [start])]
-        closed_set = set()
-        g_score = {start: 0}
+            visited[node] = 1
+            parent[node] = came_from
+            if node != start:
+                order.append(node)
+
+            if target is not None and node == target:
+                return self._path(parent, node)
+
+            for i in range(offsets[node], offsets[node + 1]):
+                neighbor = targets[i]
+                if not visited[neighbor]:
+                    stack.append(neighbor)
+                    pushed_from.append(node)
+
+        if target is not None:
+            return None
+        return self._traversal(start, order, parent)
+
+    def astar(self, start: int, goal: int, heuristic):
+        """Same contract as Graph.astar; heuristic(v, goal) receives vertex IDs"""
+        offsets, targets, weights = self.offsets, self.targets, self.weights
+        g_score = array('d', [float('inf')]) * self.num_vertices
+        parent = array('i', [-1]) * self.num_vertices
+        closed = bytearray(self.num_vertices)
+        g_score[start] = 0
+        parent[start] = start
+        open_set = [(heuristic(start, goal), start)]
 
         while open_set:
-            _, current, path = heapq.heappop(open_set)
+            _, current = heapq.heappop(open_set)
 
             if current == goal:
-                return path
+                return self._path(parent, current)
 
-            if current in closed_set:
+            if closed[current]:
                 continue
 
-            closed_set.add(current)
+            closed[current] = 1
 
-            for neighbor, weight in self.adj_list[current]:
-                if neighbor in closed_set:
+            for i in range(offsets[current], offsets[current + 1]):
+                neighbor = targets[i]
+                if closed[neighbor]:
                     continue
 
-                tentative_g = g_score[current] + weight
+                tentative_g = g_score[current] + (weights[i] if weights is not None else 1.0)
 
-                if neighbor not in g_score or tentative_g < g_score[neighbor]:
+                if tentative_g < g_score[neighbor]:
                     g_score[neighbor] = tentative_g
-                    f_score = tentative_g + heuristic(neighbor, goal)
-                    heapq.heappush(open_set, (f_score, neighbor, path + [neighbor]))
+                    parent[neighbor] = current
+                    heapq.heappush(open_set, (tentative_g + heuristic(neighbor, goal), neighbor))
 
         return None
 
+    def dijkstra(self, start: int, goal: int) -> Optional[List[int]]:
+        return traversal.dijkstra(self, start).until(goal).path_to(goal)
+
+    def bidirectional_search(self, start: int, goal: int) -> Optional[List[int]]:
+        return traversal.bidirectional(self, start, goal).run().path()
+
 
 class SudokuGraph:
     def __init__(self):
         self.size = 9
-        self.graph = Graph()
-        self._build_graph()
+        self.graph = self._build_graph()
 
-    def _build_graph(self):
+    def _build_graph(self) -> CSRGraph:
+        edges = []
         for i in range(81):
             row, col = i // 9, i % 9
 
-            for j in range(81):
-                if i == j:
-                    continue
-
+            for j in range(i + 1, 81):
                 other_row, other_col = j // 9, j % 9
 
                 if row == other_row or col == other_col:
-                    self.graph.add_edge(i, j)
+                    edges.append((i, j))
                 elif (row // 3 == other_row // 3) and (col // 3 == other_col // 3):
-                    self.graph.add_edge(i, j)
+                    edges.append((i, j))
+
+        return CSRGraph.from_edges(81, edges)
 
     def get_conflicts(self, cell_index: int) -> Set[int]:
-        return {neighbor for neighbor, _ in self.graph.get_neighbors(cell_index)}
+        return set(self.graph.neighbors(cell_index))
 
 
 class ConstraintGraph:
+    """Variables, domains and constraints of a CSP.
+
+    A constraint is a dict with 'variables' and a 'predicate' taking an
+    assignment dict. Constraints are indexed by variable, so assigning one
+    variable only re-checks the constraints it appears in. Domains are
+    copied and pruned in place; every removal goes on a trail, so a search
+    can mark() a point and undo() back to it instead of copying domains.
+    """
+
     def __init__(self, variables: List, domains: Dict[Any, List], constraints: List):
         self.variables = variables
-        self.domains = domains
+        self.domains = {var: list(domains[var]) for var in variables}
         self.constraints = constraints
         self.graph = Graph()
-
+        self.constraints_by_var: Dict[Any, List[Dict]] = {var: [] for var in variables}
+        # Binary constraints as arcs: var -> [(other, constraint)]
+        self.arcs: Dict[Any, List[Tuple[Any, Dict]]] = {var: [] for var in variables}
+        # (var, value, index) for every value pruned, in pruning order
+        self.trail: List[Tuple[Any, Any, int]] = []
+        # Last value found to support (var, value) across a constraint
+        self._residues: Dict[Tuple[int, Any, Any], Any] = {}
+        self.checks = 0
+        self.prunes = 0
+
+        edges = set()
+        for var in variables:
+            self.graph.add_vertex(var)
         for constraint in constraints:
-            for var1 in constraint['variables']:
-                for var2 in constraint['variables']:
-                    if var1 != var2:
+            scope = constraint['variables']
+            for var in scope:
+                self.constraints_by_var[var].append(constraint)
+            for i, var1 in enumerate(scope):
+                for var2 in scope[i + 1:]:
+                    if var1 != var2 and (var1, var2) not in edges and (var2, var1) not in edges:
+                        edges.add((var1, var2))
                         self.graph.add_edge(var1, var2)
+            if len(scope) == 2 and scope[0] != scope[1]:
+                self.arcs[scope[0]].append((scope[1], constraint))
+                self.arcs[scope[1]].append((scope[0], constraint))
 
-    def is_consistent(self, assignment: Dict) -> bool:
-        for constraint in self.constraints:
+    def neighbors(self, var) -> List:
+        return [other for other, _ in self.graph.get_neighbors(var)]
+
+    def is_consistent(self, assignment: Dict, var=None) -> bool:
+        """Check every constraint, or only those on var when it was the last one assigned"""
+        constraints = self.constraints if var is None else self.constraints_by_var[var]
+        for constraint in constraints:
             if not self._check_constraint(constraint, assignment):
                 return False
         return True
@@ -144,5 +363,85 @@ class ConstraintGraph:
     def _check_constraint(self, constraint, assignment):
         variables = constraint['variables']
         if all(var in assignment for var in variables):
+            self.checks += 1
             return constraint['predicate'](assignment)
-        return True
\ No newline at end of file
+        return True
+
+    def mark(self) -> int:
+        return len(self.trail)
+
+    def undo(self, mark: int):
+        """Restore every value pruned since mark, in their original positions"""
+        trail, domains = self.trail, self.domains
+        while len(trail) > mark:
+            var, value, index = trail.pop()
+            domains[var].insert(index, value)
+
+    def prune(self, var, value):
+        domain = self.domains[var]
+        index = domain.index(value)
+        del domain[index]
+        self.trail.append((var, value, index))
+        self.prunes += 1
+
+    def assign(self, var, value):
+        """Reduce the domain of var to value, on the trail"""
+        for other in reversed(self.domains[var]):
+            if other != value:
+                self.prune(var, other)
+
+    def revise(self, var, other, constraint) -> bool:
+        """Prune the values of var with no support in other's domain; True if any went"""
+        key = id(constraint)
+        other_domain = self.domains[other]
+        pair = {}
+        revised = False
+
+        for value in reversed(self.domains[var]):
+            residue = self._residues.get((key, var, value))
+            if residue is not None and residue in other_domain:
+                continue
+
+            pair[var] = value
+            for candidate in other_domain:
+                pair[other] = candidate
+                self.checks += 1
+                if constraint['predicate'](pair):
+                    self._residues[(key, var, value)] = candidate
+                    break
+            else:
+                self.prune(var, value)
+                revised = True
+
+        return revised
+
+    def ac3(self, changed=None) -> bool:
+        """Make every binary constraint arc consistent.
+
+        AC-3 with residual supports: the last support found for a value is
+        tried first, which keeps re-propagation during search cheap. With
+        changed, only arcs into that variable start in the queue. Returns
+        False as soon as a domain is wiped out.
+        """
+        if changed is None:
+            queue = deque((var, other, c) for var in self.variables for other, c in self.arcs[var])
+        else:
+            queue = deque((other, changed, c) for other, c in self.arcs[changed])
+        queued = {(var, other, id(c)) for var, other, c in queue}
+
+        while queue:
+            var, other, constraint = queue.popleft()
+            queued.discard((var, other, id(constraint)))
+
+            if self.revise(var, other, constraint):
+                if not self.domains[var]:
+                    return False
+                for neighbor, c in self.arcs[var]:
+                    # Only the arc just revised is skipped: another constraint
+                    # between the same pair may have lost its supports
+                    if c is constraint or (neighbor, var, id(c)) in queued:
+                        continue
+                    queued.add((neighbor, var, id(c)))
+                    queue.append((neighbor, var, c))
+
+        return True
@@ -0,0 +1,229 @@
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from collections import deque
+from itertools import count
+import heapq
+
+# Traversals work on anything with get_neighbors(v) -> [(neighbor, weight)],
+# i.e. both Graph and CSRGraph
+
+
+class Traversal:
+    """Lazy search from one source.
+
+    Iterating yields vertices in the order the search settles them, so a
+    caller can stop as soon as it has what it needs. dist and pred grow as
+    the search advances: every vertex discovered so far has an entry, and
+    a path is only rebuilt from pred when path_to() asks for it.
+    """
+
+    def __init__(self, source):
+        self.source = source
+        self.dist: Dict[Any, float] = {source: 0}
+        self.pred: Dict[Any, Any] = {source: None}
+        self._steps: Iterator = iter(())
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._steps)
+
+    def until(self, target) -> 'Traversal':
+        """Advance until target is settled or the search runs out"""
+        for v in self:
+            if v == target:
+                break
+        return self
+
+    def run(self) -> 'Traversal':
+        for _ in self:
+            pass
+        return self
+
+    def reached(self, v) -> bool:
+        return v in self.pred
+
+    def path_to(self, v) -> Optional[List]:
+        if v not in self.pred:
+            return None
+        path = []
+        while v is not None:
+            path.append(v)
+            v = self.pred[v]
+        path.reverse()
+        return path
+
+
+def bfs(graph, start) -> Traversal:
+    """Breadth-first order; dist counts edges"""
+    result = Traversal(start)
+    result._steps = _bfs(graph, result)
+    return result
+
+
+def _bfs(graph, result: Traversal):
+    dist, pred = result.dist, result.pred
+    queue = deque([result.source])
+
+    while queue:
+        node = queue.popleft()
+        yield node
+
+        for neighbor, _ in graph.get_neighbors(node):
+            if neighbor not in pred:
+                pred[neighbor] = node
+                dist[neighbor] = dist[node] + 1
+                queue.append(neighbor)
+
+
+def dfs(graph, start) -> Traversal:
+    """Depth-first order; dist is the depth in the DFS tree"""
+    result = Traversal(start)
+    result._steps = _dfs(graph, result)
+    return result
+
+
+def _dfs(graph, result: Traversal):
+    dist, pred = result.dist, result.pred
+    # A vertex may be pushed more than once; the first pop wins
+    stack = [(result.source, None)]
+    visited = set()
+
+    while stack:
+        node, came_from = stack.pop()
+
+        if node in visited:
+            continue
+
+        visited.add(node)
+        if came_from is not None:
+            pred[node] = came_from
+            dist[node] = dist[came_from] + 1
+        yield node
+
+        for neighbor, _ in graph.get_neighbors(node):
+            if neighbor not in visited:
+                stack.append((neighbor, node))
+
+
+def dijkstra(graph, start) -> Traversal:
+    """Vertices in order of shortest distance; weights must be non-negative"""
+    return astar(graph, start, None, None)
+
+
+def astar(graph, start, goal, heuristic: Optional[Callable[[Any, Any], float]]) -> Traversal:
+    """Dijkstra guided by heuristic(v, goal), which must not overestimate"""
+    result = Traversal(start)
+    result._steps = _best_first(graph, result, goal, heuristic)
+    return result
+
+
+def _best_first(graph, result: Traversal, goal, heuristic):
+    dist, pred = result.dist, result.pred
+    # The counter breaks ties so vertices never have to be comparable
+    tie = count()
+    open_set = [(0, next(tie), result.source)]
+    closed = set()
+
+    while open_set:
+        _, _, current = heapq.heappop(open_set)
+
+        if current in closed:
+            continue
+
+        closed.add(current)
+        yield current
+
+        for neighbor, weight in graph.get_neighbors(current):
+            if neighbor in closed:
+                continue
+
+            tentative_g = dist[current] + weight
+
+            if neighbor not in dist or tentative_g < dist[neighbor]:
+                dist[neighbor] = tentative_g
+                pred[neighbor] = current
+                f_score = tentative_g + (heuristic(neighbor, goal) if heuristic else 0)
+                heapq.heappush(open_set, (f_score, next(tie), neighbor))
+
+
+class BidirectionalTraversal(Traversal):
+    """Two Dijkstra searches, from start and backwards from goal, that stop once they meet.
+
+    Iteration yields the vertices settled by either side. When it ends,
+    meeting is the vertex joining the two halves of a shortest path (None
+    if goal is unreachable) and length is that path's length.
+    """
+
+    def __init__(self, source, goal):
+        super().__init__(source)
+        self.goal = goal
+        self.forward = Traversal(source)
+        self.backward = Traversal(goal)
+        # Share the forward maps so the inherited accessors see them
+        self.dist, self.pred = self.forward.dist, self.forward.pred
+        self.meeting = None
+        self.length = float('inf')
+
+    def path(self) -> Optional[List]:
+        if self.meeting is None:
+            return None
+        head = self.forward.path_to(self.meeting)
+        tail = self.backward.path_to(self.meeting)
+        tail.reverse()
+        return head + tail[1:]
+
+
+def bidirectional(graph, start, goal) -> BidirectionalTraversal:
+    result = BidirectionalTraversal(start, goal)
+    result._steps = _bidirectional(graph, result, _reverse_neighbors(graph))
+    return result
+
+
+def _reverse_neighbors(graph) -> Callable:
+    if not graph.directed:
+        return graph.get_neighbors
+
+    incoming: Dict[Any, List] = {}
+    vertices = graph.vertices if hasattr(graph, 'vertices') else range(graph.num_vertices)
+    for u in vertices:
+        for v, weight in graph.get_neighbors(u):
+            incoming.setdefault(v, []).append((u, weight))
+    return lambda v: incoming.get(v, [])
+
+
+def _bidirectional(graph, result: BidirectionalTraversal, reverse_neighbors: Callable):
+    tie = count()
+    sides = (
+        (result.forward, result.backward, graph.get_neighbors, [(0, next(tie), result.source)], set()),
+        (result.backward, result.forward, reverse_neighbors, [(0, next(tie), result.goal)], set()),
+    )
+    if result.source == result.goal:
+        result.meeting, result.length = result.source, 0
+
+    while sides[0][3] and sides[1][3]:
+        forward_min, backward_min = sides[0][3][0][0], sides[1][3][0][0]
+        # Nothing left on either frontier can beat the best path found
+        if forward_min + backward_min >= result.length:
+            break
+
+        this, other, neighbors, heap, closed = sides[0] if forward_min <= backward_min else sides[1]
+        d, _, current = heapq.heappop(heap)
+
+        if current in closed:
+            continue
+
+        closed.add(current)
+        yield current
+
+        for neighbor, weight in neighbors(current):
+            tentative_g = d + weight
+
+            if neighbor not in this.dist or tentative_g < this.dist[neighbor]:
+                this.dist[neighbor] = tentative_g
+                this.pred[neighbor] = current
+                heapq.heappush(heap, (tentative_g, next(tie), neighbor))
+
+            if neighbor in other.dist and this.dist[neighbor] + other.dist[neighbor] < result.length:
+                result.length = this.dist[neighbor] + other.dist[neighbor]
+                result.meeting = neighbor
@@ -1,13 +1,33 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.endpoints import router
+from app.api.streaming import router as streaming_router
+from app.api.traces import router as traces_router
+from app.api.jobs import router as jobs_router, get_job_runner
+from app.api.executor import get_executor
+from app.api.metrics import router as metrics_router, MetricsMiddleware
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    executor = get_executor()
+    await executor.start()
+    runner = get_job_runner()
+    await runner.start()
+    yield
+    await runner.stop()
+    executor.shutdown()
+
 
 app = FastAPI(
     title="GraphPuzzle API",
     description="Graph-Based Puzzle Solving Platform",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+app.add_middleware(MetricsMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -17,6 +37,10 @@ app.add_middleware(
 )
 
 app.include_router(router, prefix="/api")
+app.include_router(streaming_router, prefix="/api")
+app.include_router(traces_router, prefix="/api")
+app.include_router(jobs_router, prefix="/api")
+app.include_router(metrics_router)
 
 @app.get("/")
 async def root():
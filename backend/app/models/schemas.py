@@ -1,6 +1,10 @@
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any, Literal
 from enum import Enum
+import os
+
+# Longest solve a client may ask for, in seconds; also the hard cap on every solve
+MAX_SOLVE_TIMEOUT = int(os.environ.get("GRAPHSOLVE_MAX_SOLVE_TIMEOUT", 300))
 
 class AlgorithmType(str, Enum):
     BACKTRACKING = "backtracking"
@@ -9,6 +13,9 @@ class AlgorithmType(str, Enum):
     ASTAR = "astar"
     CONSTRAINT_PROPAGATION = "constraint_propagation"
     WARNSDORFF = "warnsdorff"
+    CONSTRUCTIVE = "constructive"
+    CSP = "csp"
+    SAT = "sat"
 
 class PuzzleType(str, Enum):
     SUDOKU = "sudoku"
@@ -16,11 +23,24 @@ class PuzzleType(str, Enum):
     MAZE = "maze"
     KNIGHT = "knight"
 
+class TracePolicy(BaseModel):
+    max_steps: Optional[int] = Field(10000, ge=1, description="Most steps kept; None keeps all")
+    sampling: Literal["stride", "head"] = "stride"
+    keyframe_interval: Optional[int] = Field(None, ge=1,
+                                             description="Full-state snapshot every this many steps")
+
 class SolveOptions(BaseModel):
     algorithm: Optional[str] = "backtracking"
     return_steps: bool = True
     max_solutions: int = 1
-    timeout: int = 30
+    timeout: int = Field(30, gt=0, le=MAX_SOLVE_TIMEOUT)
+    max_nodes: Optional[int] = None
+    seed: Optional[int] = None
+    resume: Optional[Dict[str, Any]] = None  # checkpoint from a paused solve
+    trace: TracePolicy = TracePolicy()
+    store_trace: bool = False  # persist steps and return a trace_id instead of inlining them
+    profile: Optional[Literal["sampling", "deterministic"]] = None  # admin only
+    detailed_stats: bool = False  # fill Statistics.details; tracemalloc slows the solve
 
 class SudokuInput(BaseModel):
     grid: List[List[int]] = Field(..., description="9x9 grid with 0 for empty cells")
@@ -35,7 +55,9 @@ class MazeInput(BaseModel):
     end: tuple[int, int] = Field(..., description="Ending position (row, col)")
 
 class KnightInput(BaseModel):
-    n: int = Field(..., ge=5, le=8, description="Board size")
+    n: int = Field(..., ge=5, le=1000,
+                   description="Board size (backtracking up to 8, warnsdorff up to 100, "
+                               "constructive up to 1000)")
     start: tuple[int, int] = Field(..., description="Starting position (row, col)")
     closed_tour: bool = False
 
@@ -49,12 +71,49 @@ class SolutionStep(BaseModel):
     position: Optional[tuple[int, int]] = None
     value: Optional[Any] = None
     description: str
+    index: Optional[int] = None  # position among all steps, before sampling
+
+class SpanTiming(BaseModel):
+    name: str  # validate, propagate, search or build_response
+    count: int
+    total_ms: float
+    self_ms: float  # excluding spans nested inside it
+
+class DetailedStatistics(BaseModel):
+    candidate_evaluations: int  # candidate choices (or constraint checks) generated
+    propagations: int  # values fixed or pruned by propagation rather than search
+    max_depth: int  # deepest search level, or longest path expanded
+    peak_frontier: int  # largest open list, for the maze searches
+    peak_memory_bytes: Optional[int] = None  # tracemalloc peak over the solve
+    trace_bytes: int  # memory held by the stored steps
 
 class Statistics(BaseModel):
     time_ms: float
     nodes_explored: int
     algorithm_used: str
     backtrack_count: Optional[int] = 0
+    budget_exhausted: bool = False
+    steps_total: Optional[int] = None  # steps produced, before the trace policy
+    queue_wait_ms: Optional[float] = None  # waiting for a solver worker, not in time_ms
+    cache_hit: bool = False  # served from the result cache; the rest describes the original solve
+    conflicts: Optional[int] = None
+    decisions: Optional[int] = None
+    propagations_per_second: Optional[float] = None
+    spans: Optional[List[SpanTiming]] = None
+    details: Optional[DetailedStatistics] = None  # with options.detailed_stats
+
+class ProfileFunction(BaseModel):
+    function: str  # "name (file:line)"
+    calls: Optional[int] = None  # deterministic profiles only
+    self_ms: float
+    total_ms: float
+
+class ProfileReport(BaseModel):
+    mode: str
+    duration_ms: float
+    samples: int  # stacks captured by the sampler
+    functions: List[ProfileFunction]  # hottest first, by self time
+    collapsed: str  # "outer;inner;leaf count" lines, for flamegraph.pl or speedscope
 
 class PuzzleResponse(BaseModel):
     success: bool
@@ -63,6 +122,16 @@ class PuzzleResponse(BaseModel):
     statistics: Optional[Statistics] = None
     error: Optional[str] = None
     message: Optional[str] = None
+    checkpoint: Optional[Dict[str, Any]] = None
+    trace_id: Optional[str] = None  # read the steps from /traces/{trace_id}
+    profile: Optional[ProfileReport] = None
+
+class TraceWindow(BaseModel):
+    trace_id: str
+    offset: int
+    length: int  # steps stored
+    steps_total: int  # steps produced, before the trace policy
+    steps: List[SolutionStep]
 
 class PresetPuzzle(BaseModel):
     id: str
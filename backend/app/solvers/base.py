@@ -1,41 +1,145 @@
 from abc import ABC, abstractmethod
 from typing import Any, List, Optional, Dict
-from app.models.schemas import SolutionStep, Statistics
+from app.models.schemas import MAX_SOLVE_TIMEOUT, DetailedStatistics, SolutionStep, Statistics
+from app.solvers.search import ExplicitStackSearch, SearchProblem, PAUSED, SOLVED
+from app.solvers.trace import TraceBuffer
+import threading
 import time
 
 
+class SolveBudget:
+    """Cooperative limits shared by every search loop.
+
+    Loops call check() once per node. The node cap is exact, while the
+    monotonic clock and the cancellation flag are only read every
+    check_interval nodes to keep the check cheap. Once exhausted the
+    budget stays exhausted and solvers return their best partial result.
+    """
+
+    def __init__(self, timeout: Optional[float] = None, max_nodes: Optional[int] = None,
+                 check_interval: int = 256):
+        self.check_interval = check_interval
+        self.cancelled = threading.Event()
+        self.start(timeout, max_nodes)
+
+    def start(self, timeout: Optional[float] = None, max_nodes: Optional[int] = None):
+        self.deadline = time.monotonic() + timeout if timeout is not None else None
+        self.max_nodes = max_nodes
+        self.nodes = 0
+        self.exhausted = False
+        self._countdown = self.check_interval
+
+    def cancel(self):
+        """Safe to call from another thread"""
+        self.cancelled.set()
+
+    def check(self) -> bool:
+        """Count one node; True means the search must stop"""
+        if self.exhausted:
+            return True
+
+        self.nodes += 1
+        if self.max_nodes is not None and self.nodes > self.max_nodes:
+            self.exhausted = True
+            return True
+
+        self._countdown -= 1
+        if self._countdown <= 0:
+            self._countdown = self.check_interval
+            if self.cancelled.is_set() or (self.deadline is not None and
+                                           time.monotonic() >= self.deadline):
+                self.exhausted = True
+        return self.exhausted
+
+
 class BaseSolver(ABC):
+    # Description template per step action, rendered only when steps are read
+    step_descriptions: Dict[str, str] = {}
+
     def __init__(self):
-        self.steps: List[SolutionStep] = []
+        self.trace = TraceBuffer(self.step_descriptions)
         self.nodes_explored = 0
         self.backtrack_count = 0
         self.start_time = None
         self.algorithm_used = "unknown"
+        self.checkpoint: Optional[Dict[str, Any]] = None
+        self.budget = SolveBudget()
+        # Optional Statistics fields filled in by specific engines
+        self.extra_statistics: Dict[str, Any] = {}
+        # Hot-path counters, reported as Statistics.details on request
+        self.candidate_evaluations = 0
+        self.propagations = 0
+        self.max_depth = 0
+        self.peak_frontier = 0
 
     def start_timer(self):
-        self.start_time = time.time()
+        self.start_time = time.perf_counter()
+
+    def start_budget(self, options: Dict[str, Any]):
+        timeout = options.get('timeout')
+        self.budget.start(MAX_SOLVE_TIMEOUT if timeout is None else min(timeout, MAX_SOLVE_TIMEOUT),
+                          options.get('max_nodes'))
+
+    def apply_trace_policy(self, options: Dict[str, Any]):
+        policy = options.get('trace')
+        if policy:
+            self.trace.configure(**policy)
 
     def get_elapsed_time(self) -> float:
         if self.start_time:
-            return (time.time() - self.start_time) * 1000
+            return (time.perf_counter() - self.start_time) * 1000
         return 0
 
     def add_step(self, action: str, position: Optional[tuple] = None,
                  value: Optional[Any] = None, description: str = ""):
-        step = SolutionStep(
-            action=action,
-            position=position,
-            value=value,
-            description=description
+        """Record a step; description overrides the action's template"""
+        self.trace.append(action, position, value, description)
+
+    @property
+    def steps(self) -> List[SolutionStep]:
+        return self.trace.to_steps()
+
+    def run_search(self, problem: SearchProblem, resume: Optional[Dict[str, Any]] = None) -> bool:
+        """Run a backtracking search under the budget, keeping a checkpoint if it runs out"""
+        engine = ExplicitStackSearch(problem, self)
+        if resume:
+            engine.restore(resume)
+        status = engine.run(self.budget.check)
+        self.checkpoint = engine.checkpoint() if status == PAUSED else None
+        return status == SOLVED
+
+    def record_sat_statistics(self, sat):
+        """Report a SATSolver run: decisions as nodes, conflicts as backtracks"""
+        stats = sat.statistics()
+        self.nodes_explored += stats['decisions']
+        self.backtrack_count += stats['conflicts']
+        self.propagations += stats['propagations']
+        self.max_depth = max(self.max_depth, stats['max_level'])
+        self.extra_statistics.update(
+            conflicts=stats['conflicts'],
+            decisions=stats['decisions'],
+            propagations_per_second=stats['propagations_per_second'],
         )
-        self.steps.append(step)
 
     def get_statistics(self) -> Statistics:
         return Statistics(
             time_ms=self.get_elapsed_time(),
             nodes_explored=self.nodes_explored,
             algorithm_used=self.algorithm_used,
-            backtrack_count=self.backtrack_count
+            backtrack_count=self.backtrack_count,
+            budget_exhausted=self.budget.exhausted,
+            steps_total=self.trace.total,
+            **self.extra_statistics
+        )
+
+    def get_details(self, peak_memory_bytes: Optional[int] = None) -> DetailedStatistics:
+        return DetailedStatistics(
+            candidate_evaluations=self.candidate_evaluations,
+            propagations=self.propagations,
+            max_depth=self.max_depth,
+            peak_frontier=self.peak_frontier,
+            peak_memory_bytes=peak_memory_bytes,
+            trace_bytes=self.trace.nbytes
         )
 
     @abstractmethod
@@ -0,0 +1,168 @@
+from itertools import permutations
+from typing import Any, Callable, Dict, List, Tuple
+import json
+
+# Band (or stack) orders of a Sudoku grid: the three 3-row blocks in any order
+_BLOCK_ORDERS = list(permutations(range(3)))
+
+
+def dihedral(k: int, n: int, row: int, col: int) -> Tuple[int, int]:
+    """Symmetry k (0-7) of the n x n square: bit 2 transposes, then bit 0
+    mirrors rows and bit 1 mirrors columns"""
+    if k & 4:
+        row, col = col, row
+    if k & 1:
+        row = n - 1 - row
+    if k & 2:
+        col = n - 1 - col
+    return row, col
+
+
+def dihedral_inverse(k: int, n: int, row: int, col: int) -> Tuple[int, int]:
+    if k & 2:
+        col = n - 1 - col
+    if k & 1:
+        row = n - 1 - row
+    if k & 4:
+        row, col = col, row
+    return row, col
+
+
+class Canonical:
+    """Where an input sits in its symmetry class.
+
+    Equivalent inputs share key, the class representative. reduce() maps a
+    solution of the input to the representative's orientation (and digit
+    labels) and restore() maps one back, so a solution found for any
+    member serves them all.
+    """
+
+    def __init__(self, key: str, reduce: Callable[[Any], Any], restore: Callable[[Any], Any]):
+        self.key = key
+        self.reduce = reduce
+        self.restore = restore
+
+
+def _sudoku_transforms() -> List[List[int]]:
+    """Target cell of each cell under every dihedral symmetry and band/stack order"""
+    transforms = []
+    for k in range(8):
+        for bands in _BLOCK_ORDERS:
+            for stacks in _BLOCK_ORDERS:
+                target = []
+                for cell in range(81):
+                    row, col = dihedral(k, 9, cell // 9, cell % 9)
+                    row = bands[row // 3] * 3 + row % 3
+                    col = stacks[col // 3] * 3 + col % 3
+                    target.append(row * 9 + col)
+                transforms.append(target)
+    return transforms
+
+
+_SUDOKU_TRANSFORMS = _sudoku_transforms()
+
+
+def _relabel(cells: List[int]) -> Tuple[int, ...]:
+    """Digits renamed 1, 2, ... in order of first appearance"""
+    labels = {0: 0}
+    return tuple(labels.setdefault(v, len(labels)) for v in cells)
+
+
+def canonical_sudoku(input_data: Dict[str, Any]) -> Canonical:
+    flat = [v for row in input_data['grid'] for v in row]
+    if len(flat) != 81 or any(type(v) is not int or not 0 <= v <= 9 for v in flat):
+        raise ValueError("Sudoku grid must be 9x9 with digits 0-9")
+
+    best, best_target = None, None
+    for target in _SUDOKU_TRANSFORMS:
+        moved = [0] * 81
+        for cell, v in enumerate(flat):
+            moved[target[cell]] = v
+        labelled = _relabel(moved)
+        if best is None or labelled < best:
+            best, best_target = labelled, target
+
+    # Original digit for each canonical label; digits absent from the
+    # puzzle take the remaining labels in increasing order
+    originals = [0] * 10
+    for cell, v in enumerate(flat):
+        if v:
+            originals[best[best_target[cell]]] = v
+    unused = iter(sorted(set(range(1, 10)) - set(originals)))
+    originals = [v or (next(unused) if label else 0) for label, v in enumerate(originals)]
+
+    labels = [0] * 10
+    for label, v in enumerate(originals):
+        labels[v] = label
+
+    def reduce(solution: List[List[int]]) -> List[List[int]]:
+        cells = [0] * 81
+        for cell, target in enumerate(best_target):
+            cells[target] = labels[solution[cell // 9][cell % 9]]
+        return [cells[r * 9:r * 9 + 9] for r in range(9)]
+
+    def restore(solution: List[List[int]]) -> List[List[int]]:
+        cells = [v for row in solution for v in row]
+        return [[originals[cells[best_target[r * 9 + c]]] for c in range(9)] for r in range(9)]
+
+    return Canonical("".join(map(str, best)), reduce, restore)
+
+
+def canonical_nqueens(input_data: Dict[str, Any]) -> Canonical:
+    n = int(input_data['n'])
+    preset = [tuple(q) for q in input_data.get('preset_queens') or []]
+    best, best_k = None, 0
+    for k in range(8):
+        moved = sorted(dihedral(k, n, r, c) for r, c in preset)
+        if best is None or moved < best:
+            best, best_k = moved, k
+
+    def mapper(transform: Callable) -> Callable[[Any], Any]:
+        def apply(solution: Any) -> Any:
+            # One solution is a list of queens, several are a list of those
+            if solution and isinstance(solution[0][0], (list, tuple)):
+                return [sorted(transform(best_k, n, r, c) for r, c in queens) for queens in solution]
+            return sorted(transform(best_k, n, r, c) for r, c in solution)
+        return apply
+
+    return Canonical(f"{n}:{best}", mapper(dihedral), mapper(dihedral_inverse))
+
+
+def canonical_knight(input_data: Dict[str, Any]) -> Canonical:
+    n = int(input_data['n'])
+    start = tuple(input_data['start'])
+    best_k = min(range(8), key=lambda k: dihedral(k, n, *start))
+    closed_tour = bool(input_data.get('closed_tour', False))
+
+    def mapper(transform: Callable) -> Callable[[Any], Any]:
+        def apply(solution: List[Any]) -> List[Any]:
+            # Constructive tours are flat squares (row * n + col)
+            if solution and isinstance(solution[0], int):
+                return [r * n + c for r, c in (transform(best_k, n, *divmod(sq, n))
+                                               for sq in solution)]
+            return [transform(best_k, n, r, c) for r, c in solution]
+        return apply
+
+    return Canonical(f"{n}:{dihedral(best_k, n, *start)}:{int(closed_tour)}",
+                     mapper(dihedral), mapper(dihedral_inverse))
+
+
+def canonical_maze(input_data: Dict[str, Any]) -> Canonical:
+    # Paths depend on the search order, so mazes are only matched exactly
+    key = json.dumps([input_data['grid'], input_data['start'], input_data['end']],
+                     separators=(",", ":"))
+    return Canonical(key, lambda solution: solution, lambda solution: solution)
+
+
+def canonical_exact(input_data: Dict[str, Any]) -> Canonical:
+    """The input as its own class, for responses (like steps) that only fit it"""
+    key = json.dumps(input_data, sort_keys=True, separators=(",", ":"), default=str)
+    return Canonical(key, lambda solution: solution, lambda solution: solution)
+
+
+CANONICALIZERS = {
+    "sudoku": canonical_sudoku,
+    "nqueens": canonical_nqueens,
+    "maze": canonical_maze,
+    "knight": canonical_knight,
+}
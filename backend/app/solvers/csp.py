@@ -0,0 +1,232 @@
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from app.graph.structures import ConstraintGraph
+from app.utils.helpers import span
+
+
+class CSPFrame:
+    """One level of the search: a variable and the values still to try"""
+
+    def __init__(self, var, values: List[Any]):
+        self.var = var
+        self.values = values
+        self.assigned = False
+        self.mark = 0
+        # (future variable, entries added to its past_fc) for every
+        # variable this assignment pruned, in pruning order
+        self.pruned: List[Tuple[Any, int]] = []
+
+
+class CSPSearch:
+    """Generic search over a ConstraintGraph.
+
+    Forward checking (FC-CBJ, Prosser 1993) on an explicit stack:
+    - after each assignment, the values of unassigned variables that
+      conflict with it are pruned on the graph's trail;
+    - the next variable is the one with the fewest values left, ties going
+      to the one constraining the most unassigned variables (MRV + degree);
+    - values are tried least constraining first;
+    - on a dead end the search jumps straight back to the deepest variable
+      in its conflict set instead of the previous one.
+
+    Any puzzle expressible as variables, domains and constraints (graph
+    colouring, Kakuro, ...) can be solved by building a ConstraintGraph
+    and calling run(). The solver, when given, receives node and
+    backtrack counts and supplies the budget.
+    """
+
+    def __init__(self, csp: ConstraintGraph, solver=None, lcv: bool = True,
+                 on_assign: Optional[Callable[[Any, Any], None]] = None,
+                 on_unassign: Optional[Callable[[Any, Any], None]] = None):
+        self.csp = csp
+        self.solver = solver
+        self.lcv = lcv
+        self.on_assign = on_assign
+        self.on_unassign = on_unassign
+        self.assignment: Dict[Any, Any] = {}
+        self.unassigned: Set[Any] = set(csp.variables)
+        self.conf_set: Dict[Any, Set[Any]] = {var: set() for var in csp.variables}
+        # Assigned variables to blame for the values pruned from each variable:
+        # the assignment that forward checked, plus the rest of the constraint's
+        # scope when it is not binary
+        self.past_fc: Dict[Any, List[Any]] = {var: [] for var in csp.variables}
+
+    def run(self, max_solutions: int = 1) -> List[Dict[Any, Any]]:
+        csp = self.csp
+        try:
+            return self._run(max_solutions)
+        finally:
+            if self.solver is not None:
+                # Constraint checks evaluate candidate values; prunes are propagation
+                self.solver.candidate_evaluations += csp.checks
+                self.solver.propagations += csp.prunes
+
+    def _run(self, max_solutions: int) -> List[Dict[Any, Any]]:
+        csp = self.csp
+        solutions: List[Dict[Any, Any]] = []
+
+        with span("propagate"):
+            consistent = self._node_consistency() and csp.ac3()
+        if not consistent:
+            return solutions
+
+        if not self.unassigned:
+            return [{}]
+
+        stack = [self._frame()]
+        while stack:
+            frame = stack[-1]
+            self._retract(frame)
+
+            if self.solver is not None and self.solver.budget.check():
+                break
+
+            if not frame.values:
+                if not self._backjump(stack):
+                    break
+                continue
+
+            if not self._assign(frame, frame.values.pop(0)):
+                continue
+
+            if not self.unassigned:
+                solutions.append(dict(self.assignment))
+                if len(solutions) >= max_solutions:
+                    break
+                # Look for the next solution chronologically
+                self.conf_set[frame.var] |= {f.var for f in stack[:-1]}
+                continue
+
+            stack.append(self._frame())
+            if self.solver is not None and len(stack) > self.solver.max_depth:
+                self.solver.max_depth = len(stack)
+
+        return solutions
+
+    def _node_consistency(self) -> bool:
+        csp = self.csp
+        for constraint in csp.constraints:
+            scope = set(constraint['variables'])
+            if len(scope) != 1:
+                continue
+            var = scope.pop()
+            for value in reversed(csp.domains[var]):
+                csp.checks += 1
+                if not constraint['predicate']({var: value}):
+                    csp.prune(var, value)
+            if not csp.domains[var]:
+                return False
+        return True
+
+    def _frame(self) -> CSPFrame:
+        var = self._select_variable()
+        self.unassigned.discard(var)
+        return CSPFrame(var, self._order_values(var))
+
+    def _select_variable(self):
+        domains = self.csp.domains
+        best_size = min(len(domains[var]) for var in self.unassigned)
+        tied = [var for var in self.unassigned if len(domains[var]) == best_size]
+        if len(tied) == 1:
+            return tied[0]
+        return max(tied, key=self._future_degree)
+
+    def _future_degree(self, var) -> int:
+        return sum(1 for other in self.csp.neighbors(var) if other in self.unassigned)
+
+    def _order_values(self, var) -> List[Any]:
+        values = list(self.csp.domains[var])
+        if not self.lcv or len(values) < 2:
+            return values
+
+        csp = self.csp
+        futures = [(other, c) for other, c in csp.arcs[var] if other in self.unassigned]
+
+        def ruled_out(value) -> int:
+            count = 0
+            pair = {var: value}
+            for other, constraint in futures:
+                for candidate in csp.domains[other]:
+                    pair[other] = candidate
+                    csp.checks += 1
+                    if not constraint['predicate'](pair):
+                        count += 1
+                del pair[other]
+            return count
+
+        return sorted(values, key=ruled_out)
+
+    def _assign(self, frame: CSPFrame, value) -> bool:
+        """Assign and forward check; False when some future domain is wiped out"""
+        csp, var = self.csp, frame.var
+        assignment = self.assignment
+
+        frame.mark = csp.mark()
+        frame.assigned = True
+        assignment[var] = value
+        if self.solver is not None:
+            self.solver.nodes_explored += 1
+        if self.on_assign:
+            self.on_assign(var, value)
+
+        for constraint in csp.constraints_by_var[var]:
+            future = [v for v in constraint['variables'] if v not in assignment]
+            if len(future) != 1:
+                continue
+
+            other = future[0]
+            domain = csp.domains[other]
+            pruned = False
+            for candidate in reversed(domain):
+                assignment[other] = candidate
+                csp.checks += 1
+                if not constraint['predicate'](assignment):
+                    csp.prune(other, candidate)
+                    pruned = True
+            del assignment[other]
+
+            if pruned:
+                culprits = [v for v in constraint['variables'] if v != other]
+                self.past_fc[other].extend(culprits)
+                frame.pruned.append((other, len(culprits)))
+            if not domain:
+                self.conf_set[var] |= set(self.past_fc[other])
+                self.conf_set[var].discard(var)
+                return False
+
+        return True
+
+    def _retract(self, frame: CSPFrame):
+        if not frame.assigned:
+            return
+        var = frame.var
+        value = self.assignment.pop(var)
+        self.csp.undo(frame.mark)
+        for other, count in reversed(frame.pruned):
+            del self.past_fc[other][-count:]
+        frame.pruned = []
+        frame.assigned = False
+        if self.on_unassign:
+            self.on_unassign(var, value)
+
+    def _backjump(self, stack: List[CSPFrame]) -> bool:
+        """Jump back to the deepest variable to blame for the dead end on top of stack"""
+        frame = stack.pop()
+        var = frame.var
+        blame = self.conf_set[var] | set(self.past_fc[var])
+        self.conf_set[var] = set()
+        self.unassigned.add(var)
+        if self.solver is not None:
+            self.solver.backtrack_count += 1
+
+        if not blame:
+            return False
+
+        while stack[-1].var not in blame:
+            skipped = stack.pop()
+            self._retract(skipped)
+            self.conf_set[skipped.var] = set()
+            self.unassigned.add(skipped.var)
+
+        target = stack[-1].var
+        self.conf_set[target] |= blame - {target}
+        return True
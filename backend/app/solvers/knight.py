@@ -1,9 +1,33 @@
-from typing import List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 from app.solvers.base import BaseSolver
-import time
+from app.solvers.search import SearchProblem
+from app.solvers.knight_tours import construct_closed_tour, library_closed_tour
+from app.utils.helpers import timed
+from array import array
+from collections import OrderedDict
+import os
+import random
+
+MAX_BACKTRACK_SIZE = 8
+MAX_WARNSDORFF_SIZE = 100
+MAX_CONSTRUCTIVE_SIZE = 1000
+MAX_DISTANCE_SIZE = 200
+# Distinct sources (after symmetry) one distance batch may need a BFS row for
+MAX_DISTANCE_SOURCES = 64
+# Squares of BFS rows kept per process, as 4-byte ints: 16 MB by default
+DISTANCE_CACHE_SQUARES = int(os.environ.get("GRAPHSOLVE_DISTANCE_CACHE_SQUARES", 4_000_000))
 
 
 class KnightSolver(BaseSolver):
+    step_descriptions = {
+        "move": "Knight moves to ({row}, {col}) (move #{value})",
+        "closed": "Tour closed successfully",
+        "restart": "Restarting Warnsdorff search (attempt #{value})",
+        "backtrack": "Backtracking from ({row}, {col}) ({value} backtracks)",
+        "partial": "Found partial tour of length {value}",
+        "assembled": "Closed tour assembled for {value}x{value} board",
+    }
+
     def __init__(self):
         super().__init__()
         self.algorithm_used = "warnsdorff"
@@ -11,10 +35,21 @@ class KnightSolver(BaseSolver):
             (2, 1), (1, 2), (-1, 2), (-2, 1),
             (-2, -1), (-1, -2), (1, -2), (2, -1)
         ]
-        self.timeout = 10  # 10 seconds timeout for backtracking
+        self.restarts = 20  # randomized Warnsdorff restarts before falling back
+        self.max_size = MAX_BACKTRACK_SIZE
+
+    _move_tables: Dict[int, List[List[int]]] = {}
+    # BFS distance rows keyed by (board size, source in the canonical octant),
+    # least recently used first; at most DISTANCE_CACHE_SQUARES squares in all
+    _distance_rows: "OrderedDict[Tuple[int, int], array]" = OrderedDict()
+    _distance_squares = 0
 
     def solve(self, input_data: dict, options: dict) -> Optional[List[Tuple[int, int]]]:
         self.start_timer()
+        self.start_budget(options)
+        self.apply_trace_policy(options)
+
+        self.max_size = self.max_board_size(options.get('algorithm', 'warnsdorff'))
 
         if not self.validate_input(input_data):
             return None
@@ -23,6 +58,7 @@ class KnightSolver(BaseSolver):
         start = tuple(input_data['start'])
         closed_tour = input_data.get('closed_tour', False)
         algorithm = options.get('algorithm', 'warnsdorff')
+        seed = options.get('seed')
 
         # Check if board size is too small for a tour
         if n < 5:
@@ -32,17 +68,45 @@ class KnightSolver(BaseSolver):
 
         self.algorithm_used = algorithm
 
+        # Closed tours for covered sizes are a lookup plus a rotation
+        if closed_tour and algorithm != 'constructive':
+            path = library_closed_tour(n, start, 0 if seed is None else seed)
+            if path is not None:
+                self.algorithm_used = "tour_library"
+                self.nodes_explored += len(path)
+                if options.get('return_steps', True):
+                    for i in range(1, len(path)):
+                        self.add_step("move", path[i], i)
+                    self.add_step("closed", start)
+                return path
+
         if algorithm == 'warnsdorff':
             return self._warnsdorff_tour(n, start, closed_tour,
-                                         options.get('return_steps', True))
+                                         options.get('return_steps', True),
+                                         0 if seed is None else seed,
+                                         options.get('resume'))
+        elif algorithm == 'constructive':
+            return self._constructive_tour(n, start, options.get('return_steps', True),
+                                           0 if seed is None else seed)
         else:
-            # Use optimized backtracking with timeout
+            # Use optimized backtracking within the solve budget
             return self._backtrack_tour_optimized(n, start, closed_tour,
-                                                  options.get('return_steps', True))
+                                                  options.get('return_steps', True),
+                                                  options.get('resume'))
+
+    @staticmethod
+    def max_board_size(algorithm: Optional[str]) -> int:
+        """Largest board the algorithm handles; anything else backtracks"""
+        if algorithm == 'warnsdorff':
+            return MAX_WARNSDORFF_SIZE
+        if algorithm == 'constructive':
+            return MAX_CONSTRUCTIVE_SIZE
+        return MAX_BACKTRACK_SIZE
 
+    @timed("validate")
     def validate_input(self, input_data: dict) -> bool:
         n = input_data.get('n', 0)
-        if n < 5 or n > 8:
+        if n < 5 or n > self.max_size:
             return False
 
         start = input_data.get('start')
@@ -77,189 +141,317 @@ class KnightSolver(BaseSolver):
         next_moves.sort()
         return next_moves
 
-    def _warnsdorff_tour(self, n: int, start: Tuple[int, int],
-                         closed_tour: bool, track_steps: bool) -> Optional[List[Tuple[int, int]]]:
-        board = [[-1] * n for _ in range(n)]
-        path = [start]
-        x, y = start
-        board[x][y] = 0
-
-        for i in range(1, n * n):
+    def _move_table(self, n: int) -> List[List[int]]:
+        """Knight neighbours of every square, indexed by flat position row * n + col"""
+        table = self._move_tables.get(n)
+        if table is None:
+            table = [
+                [(x + dx) * n + y + dy for dx, dy in self.moves
+                 if 0 <= x + dx < n and 0 <= y + dy < n]
+                for x in range(n) for y in range(n)
+            ]
+            self._move_tables[n] = table
+        return table
+
+    @staticmethod
+    def knight_distance(dx: int, dy: int) -> int:
+        """Minimum knight moves for a displacement on the unbounded board, in O(1)"""
+        dx, dy = abs(dx), abs(dy)
+        if dx < dy:
+            dx, dy = dy, dx
+        if dx == 1 and dy == 0:
+            return 3
+        if dx == 2 and dy == 2:
+            return 4
+        delta = dx - dy
+        if dy > delta:
+            return delta - 2 * ((delta - dy) // 3)
+        return delta - 2 * ((delta - dy) // 4)
+
+    @staticmethod
+    def orient(n: int, x: int, y: int) -> Tuple[bool, bool, bool]:
+        """Board symmetry (flip rows, flip columns, transpose) taking (x, y)
+        into the octant x <= y <= (n - 1) / 2"""
+        flip_x, flip_y = x > n - 1 - x, y > n - 1 - y
+        if flip_x:
+            x = n - 1 - x
+        if flip_y:
+            y = n - 1 - y
+        return flip_x, flip_y, x > y
+
+    @staticmethod
+    def apply_orientation(n: int, orientation: Tuple[bool, bool, bool],
+                          x: int, y: int) -> Tuple[int, int]:
+        flip_x, flip_y, transpose = orientation
+        if flip_x:
+            x = n - 1 - x
+        if flip_y:
+            y = n - 1 - y
+        return (y, x) if transpose else (x, y)
+
+    def _distance_row(self, n: int, source: int) -> array:
+        """BFS distances from source to every square of an n x n board, -1 if unreachable"""
+        rows = self._distance_rows
+        key = (n, source)
+        row = rows.get(key)
+        if row is not None:
+            rows.move_to_end(key)
+            return row
+
+        neighbours = self._move_table(n)
+        row = array('i', [-1]) * (n * n)
+        row[source] = 0
+        frontier = [source]
+        depth = 0
+        while frontier:
+            depth += 1
+            following = []
+            for square in frontier:
+                for nxt in neighbours[square]:
+                    if row[nxt] < 0:
+                        row[nxt] = depth
+                        following.append(nxt)
+            frontier = following
+
+        if n * n <= DISTANCE_CACHE_SQUARES:
+            rows[key] = row
+            KnightSolver._distance_squares += n * n
+            while KnightSolver._distance_squares > DISTANCE_CACHE_SQUARES:
+                (evicted, _), _ = rows.popitem(last=False)
+                KnightSolver._distance_squares -= evicted * evicted
+        return row
+
+    def distance_sources(self, n: int,
+                         queries: Sequence[Tuple[Tuple[int, int], Tuple[int, int]]]) -> int:
+        """Distinct BFS rows a batch needs on an n x n board"""
+        return len({self.apply_orientation(n, self.orient(n, sx, sy), sx, sy)
+                    for (sx, sy), _ in queries})
+
+    def distances(self, n: Optional[int],
+                  queries: Sequence[Tuple[Tuple[int, int], Tuple[int, int]]]) -> List[int]:
+        """Minimum knight moves for a batch of (source, target) pairs.
+
+        With n=None the board is unbounded and every query is answered by
+        the closed form. On an n x n board each query is first turned by the
+        board symmetry that puts its source in one octant, so only about
+        n * n / 8 distinct BFS rows exist per size; queries are grouped by
+        that source and each row is computed once and kept in a bounded LRU.
+        """
+        if n is None:
+            return [self.knight_distance(tx - sx, ty - sy) for (sx, sy), (tx, ty) in queries]
+
+        results = [0] * len(queries)
+        by_source: Dict[int, List[Tuple[int, int]]] = {}
+        for i, ((sx, sy), (tx, ty)) in enumerate(queries):
+            orientation = self.orient(n, sx, sy)
+            sx, sy = self.apply_orientation(n, orientation, sx, sy)
+            tx, ty = self.apply_orientation(n, orientation, tx, ty)
+            by_source.setdefault(sx * n + sy, []).append((i, tx * n + ty))
+
+        for source, targets in by_source.items():
+            row = self._distance_row(n, source)
             self.nodes_explored += 1
+            for i, target in targets:
+                results[i] = row[target]
+        return results
 
-            # Get next moves sorted by Warnsdorff's heuristic
-            next_moves = self._get_next_moves(x, y, board, n)
+    def _warnsdorff_tour(self, n: int, start: Tuple[int, int],
+                         closed_tour: bool, track_steps: bool, seed: int = 0,
+                         resume: Optional[Dict[str, Any]] = None) -> Optional[List[Tuple[int, int]]]:
+        """Warnsdorff's rule with tie-breaking, dead-end repair and seeded restarts"""
+        # Odd boards have no closed tour, and open tours there must start
+        # on the majority colour
+        if n % 2 == 1 and (closed_tour or (start[0] + start[1]) % 2 == 1):
+            return None
 
-            if not next_moves:
+        neighbours = self._move_table(n)
+        rng = random.Random(seed)
+        centre = (n - 1) / 2
+        centre_dist = [(x - centre) ** 2 + (y - centre) ** 2
+                       for x in range(n) for y in range(n)]
+        first = start[0] * n + start[1]
+
+        for attempt in range(self.restarts + 1):
+            # A closed tour can be rotated to begin on any square, so on even
+            # boards retries walk from the corner, where Warnsdorff's rule
+            # rarely dead-ends, and rotate the closed result onto the start
+            origin = first if attempt == 0 or n % 2 == 1 else 0
+            order = self._warnsdorff_attempt(n, neighbours, origin, centre_dist, rng,
+                                             centre_tiebreak=attempt == 0)
+            if order is not None and (closed_tour or origin != first):
+                order = self._close_tour(n, neighbours, order, rng)
+                if order is not None and origin != first:
+                    pivot = order.index(first)
+                    order = order[pivot:] + order[:pivot]
+
+            if order is not None:
+                path = [divmod(square, n) for square in order]
                 if track_steps:
-                    self.add_step("dead_end", (x, y), None,
-                                  f"Dead end at position {(x, y)}")
-                self.backtrack_count += 1
-
-                # Try backtracking with different choices if we hit a dead end early
-                if i < n * n - 5:  # If we're not near the end, try alternative
-                    return self._warnsdorff_with_backtrack(n, start, closed_tour, track_steps)
-                return None
-
-            # Choose the square with minimum accessibility
-            _, x, y = next_moves[0]
-            board[x][y] = i
-            path.append((x, y))
-
+                    for i in range(1, len(path)):
+                        self.add_step("move", path[i], i)
+                    if closed_tour:
+                        self.add_step("closed", start)
+                return path
+
+            if self.budget.exhausted:
+                break
             if track_steps:
-                self.add_step("move", (x, y), i,
-                              f"Knight moves to {(x, y)} (move #{i})")
-
-        # Check if it's a closed tour
-        if closed_tour:
-            for dx, dy in self.moves:
-                if (x + dx, y + dy) == start:
-                    if track_steps:
-                        self.add_step("closed", start, None,
-                                      "Tour closed successfully")
-                    return path
-            return None
+                self.add_step("restart", start, attempt + 2)
 
-        return path
+        # Exhaustive search is only viable on small boards
+        if n <= MAX_BACKTRACK_SIZE and not self.budget.exhausted:
+            return self._warnsdorff_with_backtrack(n, start, closed_tour, track_steps, resume)
+        return None
 
-    def _warnsdorff_with_backtrack(self, n: int, start: Tuple[int, int],
-                                   closed_tour: bool, track_steps: bool) -> Optional[List[Tuple[int, int]]]:
-        """Warnsdorff's with limited backtracking when stuck"""
-        board = [[-1] * n for _ in range(n)]
-        path = []
-        start_time = time.time()
+    def _constructive_tour(self, n: int, start: Tuple[int, int], track_steps: bool,
+                           seed: int = 0) -> Optional[array]:
+        """Closed tour built by divide and conquer, as flat squares (row * n + col).
 
-        def solve_util(x: int, y: int, move_count: int) -> bool:
-            # Check timeout
-            if time.time() - start_time > self.timeout:
-                return False
+        The closed tour also serves open-tour requests. Odd boards have no
+        closed tour, so they fall back to Warnsdorff where the size allows.
+        """
+        if n % 2 == 0:
+            path = construct_closed_tour(n, start)
+            self.nodes_explored += n * n
+            if track_steps:
+                self.add_step("assembled", start, n)
+            return path
 
+        if n > MAX_WARNSDORFF_SIZE:
+            return None
+        path = self._warnsdorff_tour(n, start, False, False, seed)
+        if path is None:
+            return None
+        return array('i', [x * n + y for x, y in path])
+
+    def _warnsdorff_attempt(self, n: int, neighbours: List[List[int]], first: int,
+                            centre_dist: List[float], rng: random.Random,
+                            centre_tiebreak: bool = True) -> Optional[List[int]]:
+        """Single Warnsdorff walk over flat squares.
+
+        Ties on onward degree are broken by Pohl's rule (lowest sum of the
+        candidates' onward degrees), then by distance from the centre
+        (edges first) unless centre_tiebreak is off, then randomly. Restarts
+        turn it off so that the random tie-break explores different tours.
+        A dead end is repaired with Posa rotations: if the knight can jump
+        back to path[i], reversing path[i + 1:] yields a path of the same
+        length ending at path[i + 1].
+        """
+        size = n * n
+        degree = [len(squares) for squares in neighbours]
+        visited = bytearray(size)
+        position = [0] * size
+        order = [first]
+        visited[first] = 1
+        for square in neighbours[first]:
+            degree[square] -= 1
+
+        rotations = 0
+        current = first
+        while len(order) < size:
+            if self.budget.check():
+                return None
             self.nodes_explored += 1
+            self.candidate_evaluations += len(neighbours[current])
+
+            best = -1
+            best_key = None
+            for square in neighbours[current]:
+                if visited[square]:
+                    continue
+                key = (degree[square],
+                       sum(degree[s] for s in neighbours[square] if not visited[s]),
+                       -centre_dist[square] if centre_tiebreak else 0,
+                       rng.random())
+                if best_key is None or key < best_key:
+                    best, best_key = square, key
+
+            if best < 0:
+                length = len(order)
+                pivots = [position[s] for s in neighbours[current] if position[s] < length - 2]
+                if not pivots or rotations >= size // 8:
+                    self.backtrack_count += 1
+                    self.max_depth = max(self.max_depth, length)
+                    return None
+                extendable = [i for i in pivots
+                              if any(not visited[s] for s in neighbours[order[i + 1]])]
+                self._rotate(order, position, rng.choice(extendable or pivots))
+                rotations += 1
+                self.backtrack_count += 1
+                current = order[-1]
+                continue
+
+            current = best
+            visited[current] = 1
+            position[current] = len(order)
+            order.append(current)
+            for square in neighbours[current]:
+                degree[square] -= 1
+
+        self.max_depth = max(self.max_depth, len(order))
+        return order
+
+    def _close_tour(self, n: int, neighbours: List[List[int]], order: List[int],
+                    rng: random.Random) -> Optional[List[int]]:
+        """Rotate the free end of an open tour until it is a knight's move from the start"""
+        size = n * n
+        closing = set(neighbours[order[0]])
+        sx, sy = divmod(order[0], n)
+        distance = [(x - sx) ** 2 + (y - sy) ** 2 for x in range(n) for y in range(n)]
+        position = [0] * size
+        for i, square in enumerate(order):
+            position[square] = i
+
+        for _ in range(20 * size):
+            if order[-1] in closing:
+                return order
+            if self.budget.check():
+                return None
+            self.nodes_explored += 1
+            pivots = [position[s] for s in neighbours[order[-1]] if position[s] < size - 2]
+            if not pivots:
+                return None
+            # Greedy steps pull the free end towards the start; random ones
+            # keep the walk from cycling
+            if rng.random() < 0.5:
+                pivot = min(pivots, key=lambda i: distance[order[i + 1]])
+            else:
+                pivot = rng.choice(pivots)
+            self._rotate(order, position, pivot)
 
-            if move_count == n * n:
-                path.append((x, y))
-                if not closed_tour:
-                    return True
-
-                # Check if it's a valid closed tour
-                for dx, dy in self.moves:
-                    if (x + dx, y + dy) == start:
-                        if track_steps:
-                            self.add_step("closed", start, None,
-                                          "Tour closed successfully")
-                        return True
-                path.pop()
-                return False
-
-            board[x][y] = move_count
-            path.append((x, y))
-
-            if track_steps and move_count % 10 == 0:  # Log every 10th move
-                self.add_step("move", (x, y), move_count,
-                              f"Knight at {(x, y)} (move #{move_count})")
-
-            # Get next moves sorted by Warnsdorff's heuristic
-            next_moves = self._get_next_moves(x, y, board, n)
-
-            # Try each move
-            for _, nx, ny in next_moves:
-                if solve_util(nx, ny, move_count + 1):
-                    return True
-
-            # Backtrack
-            board[x][y] = -1
-            path.pop()
-            self.backtrack_count += 1
-
-            return False
-
-        x, y = start
-        if solve_util(x, y, 0):
-            return path
         return None
 
-    def _backtrack_tour_optimized(self, n: int, start: Tuple[int, int],
-                                  closed_tour: bool, track_steps: bool) -> Optional[List[Tuple[int, int]]]:
-        """Optimized backtracking with Warnsdorff's heuristic for move ordering"""
-        board = [[-1] * n for _ in range(n)]
-        path = []
-        start_time = time.time()
-        best_path = []
-        max_length = 0
-
-        def solve_util(x: int, y: int, move_count: int) -> bool:
-            nonlocal max_length, best_path
-
-            # Check timeout
-            if time.time() - start_time > self.timeout:
-                # Return best partial solution found
-                if max_length > n * n * 0.8:  # If we found 80% of the tour
-                    path[:] = best_path[:]
-                    return True
-                return False
+    @staticmethod
+    def _rotate(order: List[int], position: List[int], pivot: int):
+        order[pivot + 1:] = order[:pivot:-1]
+        for i in range(pivot + 1, len(order)):
+            position[order[i]] = i
 
-            self.nodes_explored += 1
+    def _warnsdorff_with_backtrack(self, n: int, start: Tuple[int, int], closed_tour: bool,
+                                   track_steps: bool, resume: Optional[Dict[str, Any]] = None
+                                   ) -> Optional[List[Tuple[int, int]]]:
+        """Warnsdorff's with limited backtracking when stuck"""
+        problem = KnightTourProblem(self, n, start, closed_tour, track_steps)
 
-            # Update best path if current is longer
-            if move_count > max_length:
-                max_length = move_count
-                best_path = path[:]
-                best_path.append((x, y))
-
-            if move_count == n * n:
-                path.append((x, y))
-                if not closed_tour:
-                    return True
-
-                # Check for closed tour
-                for dx, dy in self.moves:
-                    if (x + dx, y + dy) == start:
-                        if track_steps:
-                            self.add_step("closed", start, None,
-                                          "Tour closed successfully")
-                        return True
-                path.pop()
-                return False
-
-            board[x][y] = move_count
-            path.append((x, y))
-
-            if track_steps and move_count % 10 == 0:
-                self.add_step("move", (x, y), move_count,
-                              f"Knight at {(x, y)} (move #{move_count})")
-
-            # Get next moves sorted by Warnsdorff's heuristic
-            next_moves = self._get_next_moves(x, y, board, n)
-
-            # For smaller boards or when close to completion, try all moves
-            # For larger boards, limit to top candidates to avoid timeout
-            max_candidates = len(next_moves) if n <= 6 or move_count > n * n * 0.9 else min(3, len(next_moves))
-
-            for i in range(max_candidates):
-                _, nx, ny = next_moves[i]
-                if solve_util(nx, ny, move_count + 1):
-                    return True
-
-            board[x][y] = -1
-            path.pop()
-            self.backtrack_count += 1
-
-            if track_steps and self.backtrack_count % 100 == 0:
-                self.add_step("backtrack", (x, y), None,
-                              f"Backtracking from {(x, y)} ({self.backtrack_count} backtracks)")
+        if self.run_search(problem, resume):
+            return problem.path
+        return None
 
-            return False
+    def _backtrack_tour_optimized(self, n: int, start: Tuple[int, int], closed_tour: bool,
+                                  track_steps: bool, resume: Optional[Dict[str, Any]] = None
+                                  ) -> Optional[List[Tuple[int, int]]]:
+        """Optimized backtracking with Warnsdorff's heuristic for move ordering"""
+        problem = KnightTourProblem(self, n, start, closed_tour, track_steps, prune=True)
 
-        x, y = start
-        if solve_util(x, y, 0):
-            return path
+        if self.run_search(problem, resume):
+            return problem.path
 
         # If no complete solution found but we have a good partial solution
+        max_length = len(problem.best_path) - 1
         if max_length > n * n * 0.8:
             if track_steps:
-                self.add_step("partial", None, max_length,
-                              f"Found partial tour of length {max_length}")
-            return best_path
+                self.add_step("partial", None, max_length)
+            return problem.best_path
 
         return None
 
@@ -269,4 +461,100 @@ class KnightSolver(BaseSolver):
         # except for 3x4 and 4x3 which have tours
         if n < 5:
             return False
-        return True
\ No newline at end of file
+        return True
+
+
+class KnightTourProblem(SearchProblem):
+    """Knight's tour for ExplicitStackSearch; choices are flat squares (row * n + col).
+
+    With prune set, only the three most constrained moves are tried on
+    boards above 6x6 until the last tenth of the tour, and the longest path
+    seen is kept as a fallback.
+    """
+
+    def __init__(self, solver: KnightSolver, n: int, start: Tuple[int, int],
+                 closed_tour: bool, track_steps: bool, prune: bool = False):
+        self.solver = solver
+        self.n = n
+        self.start = start
+        self.closed_tour = closed_tour
+        self.track_steps = track_steps
+        self.prune = prune
+        self.board = [[-1] * n for _ in range(n)]
+        self.board[start[0]][start[1]] = 0
+        self.path = [start]
+        self.best_path = [start]
+        solver.trace.snapshot_source = lambda: list(self.path)
+
+        if track_steps:
+            solver.add_step("move", start, 0)
+
+    def key(self) -> str:
+        return (f"knight:{self.n}:{self.start[0]},{self.start[1]}:"
+                f"{int(self.closed_tour)}:{int(self.prune)}")
+
+    def is_goal(self) -> bool:
+        n = self.n
+        if len(self.path) < n * n:
+            return False
+        if not self.closed_tour:
+            return True
+
+        x, y = self.path[-1]
+        return any((x + dx, y + dy) == self.start for dx, dy in self.solver.moves)
+
+    def on_solution(self) -> bool:
+        if self.closed_tour and self.track_steps:
+            self.solver.add_step("closed", self.start)
+        return True
+
+    def candidates(self) -> List[int]:
+        n = self.n
+        if len(self.path) == n * n:
+            return []  # complete but cannot close
+
+        x, y = self.path[-1]
+        # Get next moves sorted by Warnsdorff's heuristic
+        next_moves = self.solver._get_next_moves(x, y, self.board, n)
+
+        # For smaller boards or when close to completion, try all moves
+        # For larger boards, limit to top candidates to avoid timeout
+        if self.prune and n > 6 and len(self.path) - 1 <= n * n * 0.9:
+            next_moves = next_moves[:3]
+        return [nx * n + ny for _, nx, ny in next_moves]
+
+    def apply(self, square: int):
+        x, y = divmod(square, self.n)
+        move_count = len(self.path)
+        self.board[x][y] = move_count
+        self.path.append((x, y))
+
+        if self.prune and len(self.path) > len(self.best_path):
+            self.best_path = self.path[:]
+
+        if self.track_steps:
+            self.solver.add_step("move", (x, y), move_count)
+
+    def undo(self, square: int):
+        x, y = self.path.pop()
+        self.board[x][y] = -1
+
+        if self.prune and self.track_steps:
+            self.solver.add_step("backtrack", (x, y), self.solver.backtrack_count)
+
+    def save(self) -> Dict[str, Any]:
+        return {"best": [x * self.n + y for x, y in self.best_path]} if self.prune else {}
+
+    def load(self, state: Dict[str, Any]):
+        best = state.get("best")
+        if not self.prune or not best:
+            return
+
+        # Only accept a genuine knight path from the start square
+        n = self.n
+        path = [divmod(square, n) for square in best if isinstance(square, int) and 0 <= square < n * n]
+        valid = (len(path) == len(best) == len(set(best)) and path[0] == self.start and
+                 all(sorted((abs(a[0] - b[0]), abs(a[1] - b[1]))) == [1, 2]
+                     for a, b in zip(path, path[1:])))
+        if valid and len(path) > len(self.best_path):
+            self.best_path = path
@@ -0,0 +1,212 @@
+from array import array
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import json
+
+# Same order as KnightSolver.moves; base tours are stored as strings of
+# indices into this list
+MOVES = [
+    (2, 1), (1, 2), (-1, 2), (-2, 1),
+    (-2, -1), (-1, -2), (1, -2), (2, -1)
+]
+
+TOUR_LIBRARY_PATH = Path(__file__).resolve().parent.parent / "data" / "knight_tours.json"
+TOUR_LIBRARY_SIZES = range(6, 51, 2)
+
+# Loaded on first use from TOUR_LIBRARY_PATH
+_tour_library: Optional[Dict[int, str]] = None
+
+# Closed tours starting at (0, 0), keyed by (rows, cols). Besides the two
+# forced edges at every corner, each one contains (h-2, 0)-(h-1, 2) and
+# (1, w-1)-(0, w-3), which _join relies on when merging quadrants.
+BASE_TOURS: Dict[Tuple[int, int], str] = {
+    (6, 6): "12076527431250365701250361466341257",
+    (6, 8): "07122056366322275561367033570202347257712503456",
+    (8, 6): "03602307065417425321770563323650206161441765342",
+    (8, 8): "036070212434613656177422717563424702125256071145207565203135356",
+    (8, 10): "0360702121436145256647112774317205447230143656160745035072471212"
+             "502434725656136",
+    (10, 8): "1210707541276563422134755711067534116501214343503665707021243674"
+             "521447207635427",
+    (10, 10): "1631212741707052756563434203170324705450742277547014216025242076"
+              "47631175213527065630564242760275343",
+    (10, 12): "0707147212123454505560725200536714300056422761212146134502435036"
+              "5605461311025417246507416161306366142227064535057244572",
+    (12, 10): "0360702422764472312167067276542421214700756332567460725021214724"
+              "6142434567750022765434311114365716417727661213252434656",
+}
+
+
+def construct_closed_tour(n: int, start: Tuple[int, int]) -> Optional[array]:
+    """Closed knight's tour of an n x n board beginning at start.
+
+    Parberry's divide and conquer: the board is split into quadrants until
+    every piece has a base tour, the base tours are copied in and each group
+    of four quadrant tours is merged into one by swapping four edges around
+    the split point. Runs in time linear in the number of squares and
+    returns the tour as flat squares (row * n + col).
+    """
+    if n < 6 or n % 2 == 1:
+        return None
+
+    size = n * n
+    first = array('i', [-1]) * size
+    second = array('i', [-1]) * size
+    _build(first, second, n, 0, 0, n, n)
+    return _walk(first, second, start[0] * n + start[1], size)
+
+
+def _link(first: array, second: array, a: int, b: int):
+    if first[a] < 0:
+        first[a] = b
+    else:
+        second[a] = b
+    if first[b] < 0:
+        first[b] = a
+    else:
+        second[b] = a
+
+
+def _relink(first: array, second: array, square: int, old: int, new: int):
+    if first[square] == old:
+        first[square] = new
+    else:
+        second[square] = new
+
+
+def _place(first: array, second: array, n: int, row: int, col: int, rows: int, cols: int):
+    """Copy the base tour for a rows x cols block with top-left corner (row, col)"""
+    x, y = 0, 0
+    origin = previous = row * n + col
+    for move in BASE_TOURS[(rows, cols)]:
+        dx, dy = MOVES[int(move)]
+        x, y = x + dx, y + dy
+        square = (row + x) * n + col + y
+        _link(first, second, previous, square)
+        previous = square
+    _link(first, second, previous, origin)
+
+
+def _build(first: array, second: array, n: int, row: int, col: int, rows: int, cols: int):
+    if (rows, cols) in BASE_TOURS:
+        _place(first, second, n, row, col, rows, cols)
+        return
+
+    # Even halves that differ by at most two, so every quadrant is either a
+    # base size or can be split again
+    top = rows // 4 * 2
+    left = cols // 4 * 2
+    _build(first, second, n, row, col, top, left)
+    _build(first, second, n, row, col + left, top, cols - left)
+    _build(first, second, n, row + top, col, rows - top, left)
+    _build(first, second, n, row + top, col + left, rows - top, cols - left)
+    _join(first, second, n, row + top, col + left)
+
+
+def _join(first: array, second: array, n: int, r: int, c: int):
+    """Merge the four quadrant tours meeting at the corner between rows r-1/r and cols c-1/c"""
+    removed: List[Tuple[Tuple[int, int], Tuple[int, int]]] = [
+        ((r - 1, c - 1), (r - 3, c - 2)),  # top-left, forced corner edge
+        ((r - 2, c), (r - 1, c + 2)),      # top-right
+        ((r, c - 3), (r + 1, c - 1)),      # bottom-left
+        ((r, c), (r + 2, c + 1)),          # bottom-right, forced corner edge
+    ]
+    added = [
+        ((r - 3, c - 2), (r - 2, c)),
+        ((r - 1, c - 1), (r, c - 3)),
+        ((r - 1, c + 2), (r, c)),
+        ((r + 1, c - 1), (r + 2, c + 1)),
+    ]
+    for (ax, ay), (bx, by) in removed:
+        a, b = ax * n + ay, bx * n + by
+        _relink(first, second, a, b, -1)
+        _relink(first, second, b, a, -1)
+    for (ax, ay), (bx, by) in added:
+        a, b = ax * n + ay, bx * n + by
+        _relink(first, second, a, -1, b)
+        _relink(first, second, b, -1, a)
+
+
+def _walk(first: array, second: array, start: int, size: int) -> array:
+    path = array('i', [0]) * size
+    previous, current = -1, start
+    for i in range(size):
+        path[i] = current
+        following = first[current] if first[current] != previous else second[current]
+        previous, current = current, following
+    return path
+
+
+def _decode(moves: str, n: int) -> List[int]:
+    x, y = 0, 0
+    squares = [0]
+    for move in moves:
+        dx, dy = MOVES[int(move)]
+        x, y = x + dx, y + dy
+        squares.append(x * n + y)
+    return squares
+
+
+def _encode(squares: List[int], n: int) -> str:
+    return "".join(
+        str(MOVES.index((b // n - a // n, b % n - a % n)))
+        for a, b in zip(squares, squares[1:])
+    )
+
+
+def _symmetry(x: int, y: int, n: int, variant: int) -> Tuple[int, int]:
+    """One of the eight symmetries of the board, 0 being the identity"""
+    if variant & 4:
+        x, y = y, x
+    for _ in range(variant & 3):
+        x, y = y, n - 1 - x
+    return x, y
+
+
+def load_tour_library() -> Dict[int, str]:
+    global _tour_library
+    if _tour_library is None:
+        try:
+            with open(TOUR_LIBRARY_PATH) as f:
+                _tour_library = {int(n): moves for n, moves in json.load(f).items()}
+        except FileNotFoundError:
+            _tour_library = {}
+    return _tour_library
+
+
+def library_closed_tour(n: int, start: Tuple[int, int], variant: int = 0) -> Optional[List[Tuple[int, int]]]:
+    """Closed tour of an n x n board from the tour library, beginning at start.
+
+    A closed tour is a cycle, so the stored tour is mapped through one of
+    the board's eight symmetries and rotated to begin at start in O(n^2).
+    Returns None when the library does not cover n.
+    """
+    moves = load_tour_library().get(n)
+    if moves is None:
+        return None
+
+    path = [_symmetry(x, y, n, variant % 8) for x, y in
+            (divmod(square, n) for square in _decode(moves, n))]
+    pivot = path.index(tuple(start))
+    return path[pivot:] + path[:pivot]
+
+
+def build_tour_library(sizes=TOUR_LIBRARY_SIZES, path: Path = TOUR_LIBRARY_PATH):
+    """Search a closed tour for every size offline and write the library"""
+    from app.solvers.knight import KnightSolver
+
+    library = {}
+    for n in sizes:
+        tour = KnightSolver()._warnsdorff_tour(n, (0, 0), True, False)
+        if tour is None:
+            raise RuntimeError(f"No closed tour found for {n}x{n} board")
+        library[str(n)] = _encode([x * n + y for x, y in tour], n)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(library, f, indent=0)
+        f.write("\n")
+
+
+if __name__ == "__main__":
+    build_tour_library()
@@ -2,15 +2,26 @@ from typing import List, Optional, Tuple, Set
 from collections import deque
 import heapq
 from app.solvers.base import BaseSolver
+from app.utils.helpers import timed
 
 
 class MazeSolver(BaseSolver):
+    step_descriptions = {
+        "explore": "Exploring position ({row}, {col})",
+        "found": "Found target at ({row}, {col})",
+        "enqueue": "Adding ({row}, {col}) to queue",
+        "push": "Adding ({row}, {col}) to stack",
+        "evaluate": "Evaluating ({row}, {col}) with f-score={value}",
+    }
+
     def __init__(self):
         super().__init__()
         self.algorithm_used = "bfs"
 
     def solve(self, input_data: dict, options: dict) -> Optional[List[Tuple[int, int]]]:
         self.start_timer()
+        self.start_budget(options)
+        self.apply_trace_policy(options)
 
         if not self.validate_input(input_data):
             return None
@@ -31,6 +42,7 @@ class MazeSolver(BaseSolver):
         else:
             return self._bfs(grid, start, end, options.get('return_steps', True))
 
+    @timed("validate")
     def validate_input(self, input_data: dict) -> bool:
         grid = input_data.get('grid', [])
         if not grid or not all(len(row) == len(grid[0]) for row in grid):
@@ -54,6 +66,13 @@ class MazeSolver(BaseSolver):
 
         return True
 
+    def _record_frontier(self, frontier: int, depth: int):
+        """Called per expanded node with the open list size (including it) and its path length"""
+        if frontier > self.peak_frontier:
+            self.peak_frontier = frontier
+        if depth > self.max_depth:
+            self.max_depth = depth
+
     def _get_neighbors(self, grid: List[List[int]], pos: Tuple[int, int]) -> List[Tuple[int, int]]:
         rows, cols = len(grid), len(grid[0])
         row, col = pos
@@ -67,25 +86,29 @@ class MazeSolver(BaseSolver):
                     grid[new_row][new_col] == 0):
                 neighbors.append((new_row, new_col))
 
+        self.candidate_evaluations += len(neighbors)
         return neighbors
 
     def _bfs(self, grid: List[List[int]], start: Tuple[int, int],
              end: Tuple[int, int], track_steps: bool) -> Optional[List[Tuple[int, int]]]:
         queue = deque([(start, [start])])
         visited = {start}
+        self.trace.snapshot_source = lambda: sorted(visited)
 
         while queue:
+            if self.budget.check():
+                return None
+
             current, path = queue.popleft()
             self.nodes_explored += 1
+            self._record_frontier(len(queue) + 1, len(path))
 
             if track_steps:
-                self.add_step("explore", current, None,
-                              f"Exploring position {current}")
+                self.add_step("explore", current)
 
             if current == end:
                 if track_steps:
-                    self.add_step("found", end, None,
-                                  f"Found target at {end}")
+                    self.add_step("found", end)
                 return path
 
             for neighbor in self._get_neighbors(grid, current):
@@ -94,8 +117,7 @@ class MazeSolver(BaseSolver):
                     queue.append((neighbor, path + [neighbor]))
 
                     if track_steps:
-                        self.add_step("enqueue", neighbor, None,
-                                      f"Adding {neighbor} to queue")
+                        self.add_step("enqueue", neighbor)
 
         return None
 
@@ -103,6 +125,7 @@ class MazeSolver(BaseSolver):
              end: Tuple[int, int], track_steps: bool) -> Optional[List[Tuple[int, int]]]:
         stack = [(start, [start])]
         visited = set()
+        self.trace.snapshot_source = lambda: sorted(visited)
 
         while stack:
             current, path = stack.pop()
@@ -110,17 +133,19 @@ class MazeSolver(BaseSolver):
             if current in visited:
                 continue
 
+            if self.budget.check():
+                return None
+
             visited.add(current)
             self.nodes_explored += 1
+            self._record_frontier(len(stack) + 1, len(path))
 
             if track_steps:
-                self.add_step("explore", current, None,
-                              f"Exploring position {current}")
+                self.add_step("explore", current)
 
             if current == end:
                 if track_steps:
-                    self.add_step("found", end, None,
-                                  f"Found target at {end}")
+                    self.add_step("found", end)
                 return path
 
             for neighbor in self._get_neighbors(grid, current):
@@ -128,8 +153,7 @@ class MazeSolver(BaseSolver):
                     stack.append((neighbor, path + [neighbor]))
 
                     if track_steps:
-                        self.add_step("push", neighbor, None,
-                                      f"Adding {neighbor} to stack")
+                        self.add_step("push", neighbor)
 
         return None
 
@@ -141,6 +165,7 @@ class MazeSolver(BaseSolver):
         open_set = [(0, start, [start])]
         closed_set = set()
         g_score = {start: 0}
+        self.trace.snapshot_source = lambda: sorted(closed_set)
 
         while open_set:
             _, current, path = heapq.heappop(open_set)
@@ -148,17 +173,20 @@ class MazeSolver(BaseSolver):
             if current in closed_set:
                 continue
 
+            if self.budget.check():
+                return None
+
             closed_set.add(current)
             self.nodes_explored += 1
+            self._record_frontier(len(open_set) + 1, len(path))
 
             if track_steps:
-                self.add_step("explore", current, None,
-                              f"Exploring position {current} (h={self._manhattan_distance(current, end)})")
+                # The step's value is the heuristic to the target
+                self.add_step("explore", current, self._manhattan_distance(current, end))
 
             if current == end:
                 if track_steps:
-                    self.add_step("found", end, None,
-                                  f"Found target at {end}")
+                    self.add_step("found", end)
                 return path
 
             for neighbor in self._get_neighbors(grid, current):
@@ -173,8 +201,7 @@ class MazeSolver(BaseSolver):
                     heapq.heappush(open_set, (f_score, neighbor, path + [neighbor]))
 
                     if track_steps:
-                        self.add_step("evaluate", neighbor, f_score,
-                                      f"Evaluating {neighbor} with f-score={f_score}")
+                        self.add_step("evaluate", neighbor, f_score)
 
         return None
 
@@ -1,8 +1,18 @@
-from typing import List, Optional, Set, Tuple
+from typing import Any, Dict, List, Optional, Set, Tuple
 from app.solvers.base import BaseSolver
+from app.solvers.search import SearchProblem
+from app.solvers.csp import CSPSearch
+from app.solvers.sat import SATSolver, encode_nqueens, decode_nqueens
+from app.graph.structures import ConstraintGraph
+from app.utils.helpers import timed
 
 
 class NQueensSolver(BaseSolver):
+    step_descriptions = {
+        "place": "Placing queen at ({row}, {col})",
+        "remove": "Removing queen from ({row}, {col})",
+    }
+
     def __init__(self):
         super().__init__()
         self.algorithm_used = "backtracking_with_pruning"
@@ -10,6 +20,8 @@ class NQueensSolver(BaseSolver):
 
     def solve(self, input_data: dict, options: dict) -> Optional[List[Tuple[int, int]]]:
         self.start_timer()
+        self.start_budget(options)
+        self.apply_trace_policy(options)
 
         if not self.validate_input(input_data):
             return None
@@ -21,15 +33,24 @@ class NQueensSolver(BaseSolver):
         board = [[0] * n for _ in range(n)]
         for row, col in preset_queens:
             board[row][col] = 1
+        self.trace.snapshot_source = lambda: [(i, j) for i in range(n) for j in range(n) if board[i][j]]
 
         self.all_solutions = []
-        self._solve_nqueens(board, 0, n, preset_queens, max_solutions,
-                            options.get('return_steps', True))
+        if options.get('algorithm') == 'csp':
+            self.algorithm_used = "csp"
+            self._solve_csp(n, preset_queens, max_solutions, options.get('return_steps', True))
+        elif options.get('algorithm') == 'sat':
+            self.algorithm_used = "sat_cdcl"
+            self._solve_sat(n, preset_queens, max_solutions, options.get('return_steps', True))
+        else:
+            self._solve_nqueens(board, 0, n, preset_queens, max_solutions,
+                                options.get('return_steps', True), options.get('resume'))
 
         if self.all_solutions:
             return self.all_solutions[0] if max_solutions == 1 else self.all_solutions
         return None
 
+    @timed("validate")
     def validate_input(self, input_data: dict) -> bool:
         n = input_data.get('n', 0)
         if n < 4 or n > 12:
@@ -92,50 +113,134 @@ class NQueensSolver(BaseSolver):
 
     def _solve_nqueens(self, board: List[List[int]], row: int, n: int,
                        preset_queens: List[Tuple[int, int]], max_solutions: int,
-                       track_steps: bool) -> bool:
-        self.nodes_explored += 1
-
-        if len(self.all_solutions) >= max_solutions:
-            return True
-
-        if row >= n:
-            solution = [(i, j) for i in range(n) for j in range(n) if board[i][j] == 1]
-            if len(solution) == n:
-                self.all_solutions.append(solution)
-                if track_steps:
-                    self.add_step("solution", None, solution,
-                                  f"Found solution #{len(self.all_solutions)}")
-                return len(self.all_solutions) >= max_solutions
-            return False
+                       track_steps: bool, resume: Optional[Dict[str, Any]] = None) -> bool:
+        problem = NQueensProblem(self, board, row, n, preset_queens, max_solutions, track_steps)
+        return self.run_search(problem, resume)
+
+    def _solve_csp(self, n: int, preset_queens: List[Tuple[int, int]], max_solutions: int,
+                   track_steps: bool = True) -> bool:
+        """Solve with the generic CSP engine: one variable per row, valued by column"""
+        preset = {r: c for r, c in preset_queens}
+        rows = list(range(n))
+        domains = {row: [preset[row]] if row in preset else list(range(n)) for row in rows}
+        constraints = [
+            {'variables': [r1, r2], 'predicate': _non_attacking(r1, r2)}
+            for r1 in rows for r2 in rows[r1 + 1:]
+        ]
+
+        def on_assign(row, col):
+            self.add_step("place", (row, col), "Q")
+
+        def on_unassign(row, col):
+            self.add_step("remove", (row, col))
+
+        search = CSPSearch(ConstraintGraph(rows, domains, constraints), self,
+                           on_assign=on_assign if track_steps else None,
+                           on_unassign=on_unassign if track_steps else None)
+        self.trace.snapshot_source = lambda: sorted(search.assignment.items())
+        for solution in search.run(max_solutions):
+            self.all_solutions.append(sorted(solution.items()))
+            if track_steps:
+                self.add_step("solution", None, self.all_solutions[-1],
+                              f"Found solution #{len(self.all_solutions)}")
+        return bool(self.all_solutions)
+
+    def _solve_sat(self, n: int, preset_queens: List[Tuple[int, int]], max_solutions: int,
+                   track_steps: bool = True) -> bool:
+        """Solve with the CDCL engine, blocking each model to enumerate more"""
+        num_vars, clauses = encode_nqueens(n, preset_queens)
+        sat = SATSolver(num_vars, clauses, self.budget)
+        while len(self.all_solutions) < max_solutions and sat.solve():
+            solution = decode_nqueens(sat.model, n)
+            self.all_solutions.append(solution)
+            if track_steps:
+                self.add_step("solution", None, solution,
+                              f"Found solution #{len(self.all_solutions)}")
+            sat.add_clause([-(r * n + c + 1) for r, c in solution])
+        self.record_sat_statistics(sat)
+        return bool(self.all_solutions)
 
-        if any(r == row for r, c in preset_queens):
-            return self._solve_nqueens(board, row + 1, n, preset_queens,
-                                       max_solutions, track_steps)
+    def _get_all_solutions(self, n: int) -> List[List[Tuple[int, int]]]:
+        self.all_solutions = []
+        board = [[0] * n for _ in range(n)]
+        self._solve_nqueens(board, 0, n, [], float('inf'), False)
+        return self.all_solutions
 
-        for col in range(n):
-            if self._is_safe(board, row, col, n):
-                if track_steps:
-                    self.add_step("place", (row, col), "Q",
-                                  f"Placing queen at ({row}, {col})")
 
-                board[row][col] = 1
+def _non_attacking(r1: int, r2: int):
+    distance = r2 - r1
+    return lambda assignment: (assignment[r1] != assignment[r2] and
+                               abs(assignment[r1] - assignment[r2]) != distance)
 
-                if self._solve_nqueens(board, row + 1, n, preset_queens,
-                                       max_solutions, track_steps):
-                    if len(self.all_solutions) >= max_solutions:
-                        return True
 
-                board[row][col] = 0
-                self.backtrack_count += 1
+class NQueensProblem(SearchProblem):
+    """N-Queens for ExplicitStackSearch; a choice is the column for the next row"""
 
-                if track_steps:
-                    self.add_step("remove", (row, col), None,
-                                  f"Removing queen from ({row}, {col})")
+    def __init__(self, solver: NQueensSolver, board: List[List[int]], row: int, n: int,
+                 preset_queens: List[Tuple[int, int]], max_solutions: int, track_steps: bool):
+        self.solver = solver
+        self.board = board
+        self.first_row = row
+        self.row = row
+        self.n = n
+        self.preset = {r: c for r, c in preset_queens}
+        self.max_solutions = max_solutions
+        self.track_steps = track_steps
 
-        return False
+    def key(self) -> str:
+        preset = ",".join(f"{r}:{c}" for r, c in sorted(self.preset.items()))
+        return f"nqueens:{self.n}:{self.first_row}:{preset}:{self.max_solutions}"
 
-    def _get_all_solutions(self, n: int) -> List[List[Tuple[int, int]]]:
-        self.all_solutions = []
-        board = [[0] * n for _ in range(n)]
-        self._solve_nqueens(board, 0, n, [], float('inf'), False)
-        return self.all_solutions
\ No newline at end of file
+    def is_goal(self) -> bool:
+        return self.row >= self.n
+
+    def on_solution(self) -> bool:
+        n = self.n
+        solution = [(i, j) for i in range(n) for j in range(n) if self.board[i][j] == 1]
+        if len(solution) != n:
+            return False
+
+        self.solver.all_solutions.append(solution)
+        if self.track_steps:
+            self.solver.add_step("solution", None, solution,
+                                 f"Found solution #{len(self.solver.all_solutions)}")
+        return len(self.solver.all_solutions) >= self.max_solutions
+
+    def candidates(self) -> List[int]:
+        if self.row in self.preset:
+            return [self.preset[self.row]]
+        return [col for col in range(self.n)
+                if self.solver._is_safe(self.board, self.row, col, self.n)]
+
+    def apply(self, col: int):
+        row = self.row
+        if row not in self.preset:
+            if self.track_steps:
+                self.solver.add_step("place", (row, col), "Q")
+            self.board[row][col] = 1
+        self.row += 1
+
+    def undo(self, col: int):
+        self.row -= 1
+        row = self.row
+        if row not in self.preset:
+            self.board[row][col] = 0
+            if self.track_steps:
+                self.solver.add_step("remove", (row, col))
+        else:
+            # Skipping a preset row is not a real backtrack
+            self.solver.backtrack_count -= 1
+
+    def save(self) -> Dict[str, Any]:
+        return {"solutions": self.solver.all_solutions}
+
+    def load(self, state: Dict[str, Any]):
+        solutions = state.get("solutions") or []
+        n = self.n
+        # Keep only solutions that really are valid placements
+        for solution in solutions:
+            queens = [tuple(q) for q in solution]
+            if (len(queens) == n and len({r for r, _ in queens}) == n and
+                    len({c for _, c in queens}) == n and
+                    len({r - c for r, c in queens}) == n and len({r + c for r, c in queens}) == n):
+                self.solver.all_solutions.append(queens)
@@ -0,0 +1,446 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+import heapq
+import time
+
+# Clauses use DIMACS literals: variable v (from 1) is v, its negation -v.
+# Internally literal 2v is v and 2v + 1 is -v, so lit ^ 1 negates.
+
+RESTART_BASE = 100
+REDUCE_BASE = 2000
+REDUCE_INCREMENT = 300
+VAR_DECAY = 0.95
+CLAUSE_DECAY = 0.999
+
+
+class Clause:
+    __slots__ = ("lits", "learnt", "lbd", "activity", "deleted")
+
+    def __init__(self, lits: List[int], learnt: bool = False, lbd: int = 0):
+        self.lits = lits
+        self.learnt = learnt
+        self.lbd = lbd
+        self.activity = 0.0
+        self.deleted = False
+
+
+def luby(i: int) -> int:
+    """i-th term (from 0) of the Luby sequence 1, 1, 2, 1, 1, 2, 4, ..."""
+    size, seq = 1, 0
+    while size < i + 1:
+        seq += 1
+        size = 2 * size + 1
+    while size - 1 != i:
+        size = (size - 1) >> 1
+        seq -= 1
+        i %= size
+    return 1 << seq
+
+
+class SATSolver:
+    """Conflict-driven clause learning SAT solver in pure Python.
+
+    Two watched literals per clause for unit propagation, first-UIP
+    learning with local clause minimization, VSIDS branching with phase
+    saving, Luby restarts, and periodic deletion of learnt clauses with a
+    high literal block distance (LBD). solve() returns True, False for
+    unsatisfiable, or None when the budget ran out; it can be called again
+    after add_clause(), e.g. to block a model and enumerate solutions.
+    """
+
+    def __init__(self, num_vars: int, clauses: Iterable[Iterable[int]] = (), budget=None):
+        self.num_vars = num_vars
+        self.budget = budget
+        size = 2 * num_vars + 2
+        # Indexed by literal: 1 true, -1 false, 0 unassigned
+        self.values = [0] * size
+        self.watches: List[List[Clause]] = [[] for _ in range(size)]
+        self.level = [0] * (num_vars + 1)
+        self.reason: List[Optional[Clause]] = [None] * (num_vars + 1)
+        self.activity = [0.0] * (num_vars + 1)
+        # Saved phase per variable, as the literal's low bit; start negative
+        self.polarity = [1] * (num_vars + 1)
+        self.seen = bytearray(num_vars + 1)
+        self.heap = [(0.0, v) for v in range(1, num_vars + 1)]
+        self.trail: List[int] = []
+        self.trail_lim: List[int] = []
+        self.qhead = 0
+        self.var_inc = 1.0
+        self.clause_inc = 1.0
+        self.learnts: List[Clause] = []
+        # Kept across solve() calls so enumeration still cleans up
+        self.reduce_at = REDUCE_BASE
+        self.unsat = False
+        self.model: List[bool] = []
+
+        self.conflicts = 0
+        self.decisions = 0
+        self.max_level = 0
+        self.propagations = 0
+        self.restarts = 0
+        self.reductions = 0
+        self.deleted_clauses = 0
+        self.solve_time = 0.0
+
+        for clause in clauses:
+            self.add_clause(clause)
+
+    def add_clause(self, clause: Iterable[int]) -> bool:
+        """Add a clause at the root level; False once the formula is unsatisfiable"""
+        if self.unsat:
+            return False
+        self._cancel_until(0)
+
+        lits = []
+        for dimacs in clause:
+            lit = 2 * abs(dimacs) + (dimacs < 0)
+            value = self.values[lit]
+            if value == 1 or lit ^ 1 in lits:
+                return True
+            if value == 0 and lit not in lits:
+                lits.append(lit)
+
+        if not lits:
+            self.unsat = True
+            return False
+        if len(lits) == 1:
+            started = time.monotonic()
+            self._enqueue(lits[0], None)
+            conflict = self._propagate()
+            self.solve_time += time.monotonic() - started
+            if conflict is not None:
+                self.unsat = True
+                return False
+            return True
+
+        self._attach(Clause(lits))
+        return True
+
+    def solve(self) -> Optional[bool]:
+        if self.unsat:
+            return False
+
+        started = time.monotonic()
+        try:
+            return self._search()
+        finally:
+            self.solve_time += time.monotonic() - started
+
+    def statistics(self) -> Dict[str, float]:
+        return {
+            "conflicts": self.conflicts,
+            "decisions": self.decisions,
+            "propagations": self.propagations,
+            "propagations_per_second": self.propagations / self.solve_time if self.solve_time else 0.0,
+            "restarts": self.restarts,
+            "max_level": self.max_level,
+            "learnt_clauses": len(self.learnts),
+            "deleted_clauses": self.deleted_clauses,
+        }
+
+    def _search(self) -> Optional[bool]:
+        self._cancel_until(0)
+        if self._propagate() is not None:
+            self.unsat = True
+            return False
+
+        restart_at = self.conflicts + luby(self.restarts) * RESTART_BASE
+
+        while True:
+            if self.budget is not None and self.budget.check():
+                return None
+
+            conflict = self._propagate()
+            if conflict is not None:
+                self.conflicts += 1
+                if not self.trail_lim:
+                    self.unsat = True
+                    return False
+
+                learnt, backtrack_level, lbd = self._analyze(conflict)
+                self._cancel_until(backtrack_level)
+                if len(learnt) == 1:
+                    self._enqueue(learnt[0], None)
+                else:
+                    clause = Clause(learnt, learnt=True, lbd=lbd)
+                    self._attach(clause)
+                    self.learnts.append(clause)
+                    self._bump_clause(clause)
+                    self._enqueue(learnt[0], clause)
+                self.var_inc /= VAR_DECAY
+                self.clause_inc /= CLAUSE_DECAY
+                continue
+
+            if self.conflicts >= restart_at:
+                self.restarts += 1
+                restart_at = self.conflicts + luby(self.restarts) * RESTART_BASE
+                self._cancel_until(0)
+                continue
+
+            if self.conflicts >= self.reduce_at:
+                self.reductions += 1
+                self.reduce_at = self.conflicts + REDUCE_BASE + REDUCE_INCREMENT * self.reductions
+                self._reduce_learnts()
+
+            var = self._pick_branch_var()
+            if var == 0:
+                values = self.values
+                self.model = [False] + [values[2 * v] == 1 for v in range(1, self.num_vars + 1)]
+                return True
+
+            self.decisions += 1
+            self.trail_lim.append(len(self.trail))
+            if len(self.trail_lim) > self.max_level:
+                self.max_level = len(self.trail_lim)
+            self._enqueue(2 * var + self.polarity[var], None)
+
+    def _attach(self, clause: Clause):
+        self.watches[clause.lits[0]].append(clause)
+        self.watches[clause.lits[1]].append(clause)
+
+    def _enqueue(self, lit: int, reason: Optional[Clause]):
+        var = lit >> 1
+        self.values[lit] = 1
+        self.values[lit ^ 1] = -1
+        self.level[var] = len(self.trail_lim)
+        self.reason[var] = reason
+        self.trail.append(lit)
+
+    def _propagate(self) -> Optional[Clause]:
+        """Unit propagation over the watch lists; returns a conflicting clause or None"""
+        values, watches, trail = self.values, self.watches, self.trail
+
+        while self.qhead < len(trail):
+            false_lit = trail[self.qhead] ^ 1
+            self.qhead += 1
+            self.propagations += 1
+            watchers = watches[false_lit]
+            i = j = 0
+            end = len(watchers)
+
+            while i < end:
+                clause = watchers[i]
+                i += 1
+                if clause.deleted:
+                    continue
+
+                lits = clause.lits
+                # Keep the falsified watch in position 1
+                if lits[0] == false_lit:
+                    lits[0], lits[1] = lits[1], false_lit
+                first = lits[0]
+                if values[first] == 1:
+                    watchers[j] = clause
+                    j += 1
+                    continue
+
+                for k in range(2, len(lits)):
+                    if values[lits[k]] != -1:
+                        lits[1], lits[k] = lits[k], false_lit
+                        watches[lits[1]].append(clause)
+                        break
+                else:
+                    watchers[j] = clause
+                    j += 1
+                    if values[first] == -1:
+                        # Conflict: keep the unvisited watchers and stop
+                        while i < end:
+                            watchers[j] = watchers[i]
+                            j += 1
+                            i += 1
+                        del watchers[j:]
+                        self.qhead = len(trail)
+                        return clause
+                    self._enqueue(first, clause)
+
+            del watchers[j:]
+
+        return None
+
+    def _analyze(self, conflict: Clause) -> Tuple[List[int], int, int]:
+        """First-UIP clause for conflict, the level to jump back to and its LBD"""
+        seen, level, reason, trail = self.seen, self.level, self.reason, self.trail
+        current = len(self.trail_lim)
+        learnt = [0]
+        marked = []
+        counter = 0
+        lit = -1
+        index = len(trail) - 1
+        clause = conflict
+
+        while True:
+            if clause.learnt:
+                self._bump_clause(clause)
+            for q in (clause.lits if lit < 0 else clause.lits[1:]):
+                var = q >> 1
+                if not seen[var] and level[var] > 0:
+                    seen[var] = 1
+                    marked.append(var)
+                    self._bump_var(var)
+                    if level[var] >= current:
+                        counter += 1
+                    else:
+                        learnt.append(q)
+
+            while not seen[trail[index] >> 1]:
+                index -= 1
+            lit = trail[index]
+            index -= 1
+            clause = reason[lit >> 1]
+            counter -= 1
+            if counter == 0:
+                break
+            seen[lit >> 1] = 0
+
+        learnt[0] = lit ^ 1
+
+        # Drop literals implied by others already in the clause
+        kept = [learnt[0]]
+        for q in learnt[1:]:
+            why = reason[q >> 1]
+            if why is None or any(not seen[r >> 1] and level[r >> 1] > 0 for r in why.lits[1:]):
+                kept.append(q)
+        learnt = kept
+
+        for var in marked:
+            seen[var] = 0
+
+        backtrack_level = 0
+        if len(learnt) > 1:
+            best = max(range(1, len(learnt)), key=lambda k: level[learnt[k] >> 1])
+            learnt[1], learnt[best] = learnt[best], learnt[1]
+            backtrack_level = level[learnt[1] >> 1]
+
+        lbd = len({level[q >> 1] for q in learnt})
+        return learnt, backtrack_level, lbd
+
+    def _cancel_until(self, target: int):
+        if len(self.trail_lim) <= target:
+            return
+        values, trail = self.values, self.trail
+        stop = self.trail_lim[target]
+        for index in range(len(trail) - 1, stop - 1, -1):
+            lit = trail[index]
+            var = lit >> 1
+            values[lit] = values[lit ^ 1] = 0
+            self.reason[var] = None
+            self.polarity[var] = lit & 1
+            heapq.heappush(self.heap, (-self.activity[var], var))
+        del trail[stop:]
+        del self.trail_lim[target:]
+        self.qhead = len(trail)
+
+    def _pick_branch_var(self) -> int:
+        heap, values = self.heap, self.values
+        # The heap is lazy: a variable can appear several times or be assigned
+        if len(heap) > 8 * self.num_vars:
+            self._rebuild_heap()
+        while heap:
+            _, var = heapq.heappop(heap)
+            if values[2 * var] == 0:
+                return var
+        return 0
+
+    def _rebuild_heap(self):
+        self.heap = [(-self.activity[v], v) for v in range(1, self.num_vars + 1)
+                     if self.values[2 * v] == 0]
+        heapq.heapify(self.heap)
+
+    def _bump_var(self, var: int):
+        self.activity[var] += self.var_inc
+        if self.activity[var] > 1e100:
+            self.activity = [a * 1e-100 for a in self.activity]
+            self.var_inc *= 1e-100
+            self._rebuild_heap()
+        elif self.values[2 * var] == 0:
+            heapq.heappush(self.heap, (-self.activity[var], var))
+
+    def _bump_clause(self, clause: Clause):
+        clause.activity += self.clause_inc
+        if clause.activity > 1e20:
+            for learnt in self.learnts:
+                learnt.activity *= 1e-20
+            self.clause_inc *= 1e-20
+
+    def _reduce_learnts(self):
+        """Delete the worse half of the learnt clauses, keeping glue clauses and reasons"""
+        def locked(clause: Clause) -> bool:
+            first = clause.lits[0]
+            return self.values[first] == 1 and self.reason[first >> 1] is clause
+
+        self.learnts.sort(key=lambda c: (c.lbd, -c.activity))
+        half = len(self.learnts) // 2
+        kept = self.learnts[:half]
+        for clause in self.learnts[half:]:
+            if clause.lbd <= 2 or locked(clause):
+                kept.append(clause)
+            else:
+                clause.deleted = True
+                self.deleted_clauses += 1
+        self.learnts = kept
+
+
+def _at_most_one(lits: List[int]) -> List[List[int]]:
+    return [[-a, -b] for i, a in enumerate(lits) for b in lits[i + 1:]]
+
+
+def encode_sudoku(grid: List[List[int]]) -> Tuple[int, List[List[int]]]:
+    """CNF for a 9x9 grid; variable r * 81 + c * 9 + d is true when cell (r, c) holds d"""
+    def var(r: int, c: int, d: int) -> int:
+        return r * 81 + c * 9 + d
+
+    clauses = []
+    for r in range(9):
+        for c in range(9):
+            cell = [var(r, c, d) for d in range(1, 10)]
+            clauses.append(cell)
+            clauses.extend(_at_most_one(cell))
+            if grid[r][c]:
+                clauses.append([var(r, c, grid[r][c])])
+
+    units = [[(r, c) for c in range(9)] for r in range(9)]
+    units += [[(r, c) for r in range(9)] for c in range(9)]
+    units += [[(br + i, bc + j) for i in range(3) for j in range(3)]
+              for br in range(0, 9, 3) for bc in range(0, 9, 3)]
+    for unit in units:
+        for d in range(1, 10):
+            lits = [var(r, c, d) for r, c in unit]
+            clauses.append(lits)
+            clauses.extend(_at_most_one(lits))
+
+    return 729, clauses
+
+
+def decode_sudoku(model: List[bool]) -> List[List[int]]:
+    board = [[0] * 9 for _ in range(9)]
+    for v in range(1, 730):
+        if model[v]:
+            r, rest = divmod(v - 1, 81)
+            c, d = divmod(rest, 9)
+            board[r][c] = d + 1
+    return board
+
+
+def encode_nqueens(n: int, preset_queens: List[Tuple[int, int]] = ()) -> Tuple[int, List[List[int]]]:
+    """CNF for n queens; variable r * n + c + 1 is true when (r, c) holds a queen"""
+    def var(r: int, c: int) -> int:
+        return r * n + c + 1
+
+    clauses = []
+    for r in range(n):
+        row = [var(r, c) for c in range(n)]
+        clauses.append(row)
+        clauses.extend(_at_most_one(row))
+    for c in range(n):
+        clauses.extend(_at_most_one([var(r, c) for r in range(n)]))
+    for k in range(-(n - 1), n):
+        clauses.extend(_at_most_one([var(r, r - k) for r in range(n) if 0 <= r - k < n]))
+        clauses.extend(_at_most_one([var(r, k + n - 1 - r) for r in range(n)
+                                     if 0 <= k + n - 1 - r < n]))
+    for r, c in preset_queens:
+        clauses.append([var(r, c)])
+
+    return n * n, clauses
+
+
+def decode_nqueens(model: List[bool], n: int) -> List[Tuple[int, int]]:
+    return [divmod(v - 1, n) for v in range(1, n * n + 1) if model[v]]
@@ -0,0 +1,160 @@
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, List, Optional
+
+SOLVED = "solved"
+EXHAUSTED = "exhausted"
+PAUSED = "paused"
+
+CHECKPOINT_VERSION = 1
+
+
+class SearchProblem(ABC):
+    """Depth-first problem driven by ExplicitStackSearch.
+
+    The state may only change through apply() and undo(), so the choices
+    along the current branch are enough to rebuild it. Choices must be
+    JSON-serializable (plain ints in the built-in solvers).
+    """
+
+    # Cleared while a checkpoint is replayed so old steps are not recorded again
+    track_steps = False
+
+    @abstractmethod
+    def key(self) -> str:
+        """Identifies the instance so a checkpoint cannot be resumed on another input"""
+        pass
+
+    @abstractmethod
+    def is_goal(self) -> bool:
+        pass
+
+    @abstractmethod
+    def candidates(self) -> List[Any]:
+        """Choices to try from the current state, best first"""
+        pass
+
+    @abstractmethod
+    def apply(self, choice: Any):
+        pass
+
+    @abstractmethod
+    def undo(self, choice: Any):
+        pass
+
+    def on_solution(self) -> bool:
+        """Called at every goal; return False to keep searching for more"""
+        return True
+
+    def save(self) -> Dict[str, Any]:
+        """Extra state that cannot be replayed from the choices, e.g. solutions found"""
+        return {}
+
+    def load(self, state: Dict[str, Any]):
+        pass
+
+
+class ExplicitStackSearch:
+    """Backtracking search on an explicit stack instead of Python recursion.
+
+    Depth is bounded by memory rather than the recursion limit, and the
+    search can stop between any two nodes. checkpoint() captures the branch
+    taken so far plus the untried alternatives at each level; restore()
+    replays it onto a fresh problem so a paused search can resume in
+    another request or process.
+    """
+
+    def __init__(self, problem: SearchProblem, solver=None):
+        self.problem = problem
+        self.solver = solver
+        self.choices: List[Any] = []
+        # Untried candidates per level, stored reversed so pop() yields the best
+        self.pending: List[List[Any]] = []
+        self.started = False
+
+    def run(self, should_stop: Optional[Callable[[], bool]] = None) -> str:
+        if not self.started:
+            self.started = True
+            if self._enter():
+                return SOLVED
+
+        pending = self.pending
+        while pending:
+            level = pending[-1]
+            if not level:
+                pending.pop()
+                if self.choices:
+                    if self.solver is not None:
+                        self.solver.backtrack_count += 1
+                    self.problem.undo(self.choices.pop())
+                continue
+
+            # Checked once per new node, before any state changes
+            if should_stop is not None and should_stop():
+                return PAUSED
+
+            choice = level.pop()
+            self.problem.apply(choice)
+            self.choices.append(choice)
+            if self._enter():
+                return SOLVED
+
+        return EXHAUSTED
+
+    def _enter(self) -> bool:
+        solver = self.solver
+        if solver is not None:
+            solver.nodes_explored += 1
+            if len(self.choices) > solver.max_depth:
+                solver.max_depth = len(self.choices)
+
+        if self.problem.is_goal():
+            if self.problem.on_solution():
+                return True
+            self.pending.append([])
+            return False
+
+        candidates = self.problem.candidates()
+        if solver is not None:
+            solver.candidate_evaluations += len(candidates)
+        candidates.reverse()
+        self.pending.append(candidates)
+        return False
+
+    def checkpoint(self) -> Dict[str, Any]:
+        return {
+            "version": CHECKPOINT_VERSION,
+            "key": self.problem.key(),
+            "choices": list(self.choices),
+            "pending": [list(level) for level in self.pending],
+            "state": self.problem.save(),
+        }
+
+    def restore(self, checkpoint: Dict[str, Any]):
+        if checkpoint.get("version") != CHECKPOINT_VERSION:
+            raise ValueError("Unsupported checkpoint version")
+        if checkpoint.get("key") != self.problem.key():
+            raise ValueError("Checkpoint does not match this puzzle")
+        if len(checkpoint["pending"]) != len(checkpoint["choices"]) + 1:
+            raise ValueError("Malformed checkpoint")
+
+        # Checkpoints come back from clients, so every replayed choice and
+        # every pending alternative must be one the problem would generate
+        track_steps = self.problem.track_steps
+        self.problem.track_steps = False
+        try:
+            for depth, choice in enumerate(checkpoint["choices"] + [None]):
+                allowed = [] if self.problem.is_goal() else self.problem.candidates()
+                if any(c not in allowed for c in checkpoint["pending"][depth]):
+                    raise ValueError("Malformed checkpoint")
+                if choice is None:
+                    break
+                if choice not in allowed:
+                    raise ValueError("Malformed checkpoint")
+                self.problem.apply(choice)
+                self.choices.append(choice)
+        finally:
+            self.problem.track_steps = track_steps
+
+        self.pending = [list(level) for level in checkpoint["pending"]]
+        self.problem.load(checkpoint.get("state", {}))
+        self.started = True
@@ -1,10 +1,22 @@
-from typing import List, Optional, Set, Tuple
+from typing import Any, Dict, List, Optional, Set, Tuple
 from app.solvers.base import BaseSolver
-from app.graph.structures import SudokuGraph
+from app.solvers.search import SearchProblem
+from app.solvers.csp import CSPSearch
+from app.solvers.sat import SATSolver, encode_sudoku, decode_sudoku
+from app.graph.structures import ConstraintGraph, SudokuGraph
+from app.utils.helpers import timed
 import copy
 
 
 class SudokuSolver(BaseSolver):
+    step_descriptions = {
+        "place": "Trying {value} at cell ({row}, {col})",
+        "remove": "Removing {value} from cell ({row}, {col})",
+        "backtrack": "No valid values for cell ({row}, {col})",
+        "propagate": "Only one possible value for ({row}, {col})",
+        "sat_assign": "SAT model sets ({row}, {col}) to {value}",
+    }
+
     def __init__(self):
         super().__init__()
         self.graph = SudokuGraph()
@@ -12,12 +24,23 @@ class SudokuSolver(BaseSolver):
 
     def solve(self, input_data: dict, options: dict) -> Optional[List[List[int]]]:
         self.start_timer()
+        self.start_budget(options)
+        self.apply_trace_policy(options)
         grid = input_data['grid']
 
         if not self.validate_input(input_data):
             return None
 
         board = [row[:] for row in grid]
+        self.trace.snapshot_source = lambda: [row[:] for row in board]
+
+        if options.get('algorithm') == 'csp':
+            self.algorithm_used = "csp"
+            return self._solve_csp(board, options.get('return_steps', True))
+
+        if options.get('algorithm') == 'sat':
+            self.algorithm_used = "sat_cdcl"
+            return self._solve_sat(board, options.get('return_steps', True))
 
         if options.get('algorithm') == 'constraint_propagation':
             self.algorithm_used = "constraint_propagation"
@@ -25,9 +48,11 @@ class SudokuSolver(BaseSolver):
             if board and self._is_complete(board):
                 return board
 
-        solution = self._backtrack(board, options.get('return_steps', True))
+        solution = self._backtrack(board, options.get('return_steps', True),
+                                   options.get('resume'))
         return solution
 
+    @timed("validate")
     def validate_input(self, input_data: dict) -> bool:
         grid = input_data.get('grid', [])
 
@@ -108,41 +133,59 @@ class SudokuSolver(BaseSolver):
 
         return True
 
-    def _backtrack(self, board: List[List[int]], track_steps: bool = True) -> Optional[List[List[int]]]:
-        self.nodes_explored += 1
-
-        cell = self._find_empty_cell_mrv(board)
-        if not cell:
+    def _backtrack(self, board: List[List[int]], track_steps: bool = True,
+                   resume: Optional[Dict[str, Any]] = None) -> Optional[List[List[int]]]:
+        if self.run_search(SudokuProblem(self, board, track_steps), resume):
             return board
+        return None
 
-        row, col = cell
-        possible_values = self._get_possible_values(board, row, col)
-
-        if not possible_values:
-            self.backtrack_count += 1
-            if track_steps:
-                self.add_step("backtrack", (row, col), None,
-                              f"No valid values for cell ({row}, {col})")
+    def _solve_csp(self, board: List[List[int]], track_steps: bool = True) -> Optional[List[List[int]]]:
+        """Solve with the generic CSP engine: one variable per empty cell"""
+        cells = [i * 9 + j for i in range(9) for j in range(9) if board[i][j] == 0]
+        empty = set(cells)
+        domains = {cell: sorted(self._get_possible_values(board, cell // 9, cell % 9))
+                   for cell in cells}
+        constraints = [
+            {'variables': [cell, other], 'predicate': _different(cell, other)}
+            for cell in cells for other in self.graph.get_conflicts(cell)
+            if other in empty and cell < other
+        ]
+
+        def on_assign(cell, num):
+            self.add_step("place", divmod(cell, 9), num)
+
+        def on_unassign(cell, num):
+            self.add_step("remove", divmod(cell, 9), num)
+
+        search = CSPSearch(ConstraintGraph(cells, domains, constraints), self,
+                           on_assign=on_assign if track_steps else None,
+                           on_unassign=on_unassign if track_steps else None)
+        self.trace.snapshot_source = lambda: [
+            [search.assignment.get(i * 9 + j, board[i][j]) for j in range(9)] for i in range(9)
+        ]
+        solutions = search.run()
+        if not solutions:
             return None
 
-        for num in possible_values:
-            if track_steps:
-                self.add_step("place", (row, col), num,
-                              f"Trying {num} at cell ({row}, {col})")
-
-            board[row][col] = num
+        for cell, num in solutions[0].items():
+            board[cell // 9][cell % 9] = num
+        return board
 
-            result = self._backtrack(board, track_steps)
-            if result:
-                return result
-
-            board[row][col] = 0
-            if track_steps:
-                self.add_step("remove", (row, col), num,
-                              f"Removing {num} from cell ({row}, {col})")
+    def _solve_sat(self, board: List[List[int]], track_steps: bool = True) -> Optional[List[List[int]]]:
+        num_vars, clauses = encode_sudoku(board)
+        sat = SATSolver(num_vars, clauses, self.budget)
+        found = sat.solve()
+        self.record_sat_statistics(sat)
+        if not found:
+            return None
 
-        self.backtrack_count += 1
-        return None
+        solution = decode_sudoku(sat.model)
+        if track_steps:
+            for i in range(9):
+                for j in range(9):
+                    if board[i][j] == 0:
+                        self.add_step("sat_assign", (i, j), solution[i][j])
+        return solution
 
     def _is_complete(self, board: List[List[int]]) -> bool:
         for row in board:
@@ -150,6 +193,7 @@ class SudokuSolver(BaseSolver):
                 return False
         return True
 
+    @timed("propagate")
     def _constraint_propagation(self, board: List[List[int]]) -> Optional[List[List[int]]]:
         changed = True
         while changed:
@@ -163,6 +207,49 @@ class SudokuSolver(BaseSolver):
                         elif len(possible) == 1:
                             board[i][j] = possible.pop()
                             changed = True
-                            self.add_step("propagate", (i, j), board[i][j],
-                                          f"Only one possible value for ({i}, {j})")
-        return board
\ No newline at end of file
+                            self.propagations += 1
+                            self.add_step("propagate", (i, j), board[i][j])
+        return board
+
+
+def _different(a: int, b: int):
+    return lambda assignment: assignment[a] != assignment[b]
+
+
+class SudokuProblem(SearchProblem):
+    """Sudoku for ExplicitStackSearch; a choice is (row * 9 + col) * 10 + digit"""
+
+    def __init__(self, solver: SudokuSolver, board: List[List[int]], track_steps: bool):
+        self.solver = solver
+        self.board = board
+        self.track_steps = track_steps
+        self.givens = "".join(str(v) for row in board for v in row)
+
+    def key(self) -> str:
+        return f"sudoku:{self.givens}"
+
+    def is_goal(self) -> bool:
+        return all(0 not in row for row in self.board)
+
+    def candidates(self) -> List[int]:
+        row, col = self.solver._find_empty_cell_mrv(self.board)
+        possible_values = self.solver._get_possible_values(self.board, row, col)
+
+        if not possible_values and self.track_steps:
+            self.solver.add_step("backtrack", (row, col))
+        cell = row * 9 + col
+        return [cell * 10 + num for num in possible_values]
+
+    def apply(self, choice: int):
+        cell, num = divmod(choice, 10)
+        row, col = divmod(cell, 9)
+        if self.track_steps:
+            self.solver.add_step("place", (row, col), num)
+        self.board[row][col] = num
+
+    def undo(self, choice: int):
+        cell, num = divmod(choice, 10)
+        row, col = divmod(cell, 9)
+        self.board[row][col] = 0
+        if self.track_steps:
+            self.solver.add_step("remove", (row, col), num)
@@ -0,0 +1,215 @@
+from array import array
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from app.models.schemas import SolutionStep
+import sys
+
+NO_VALUE = -2 ** 31
+INT_MIN, INT_MAX = NO_VALUE + 1, 2 ** 31 - 1
+
+SNAPSHOT = "snapshot"
+SAMPLING_STRIDE = "stride"
+SAMPLING_HEAD = "head"
+# Entries (cells, queens, squares) held across all kept keyframes
+MAX_KEYFRAME_ITEMS = 2 ** 18
+
+
+def snapshot_size(snapshot: Any) -> int:
+    """Entries in a keyframe's state, e.g. the visited cells of a maze"""
+    return len(snapshot) if isinstance(snapshot, (list, tuple, dict, set)) else 1
+
+
+class TraceBuffer:
+    """Solution steps stored column by column in typed arrays.
+
+    Each step costs five array slots: its index among all steps offered,
+    an action code, row, col (-1 without a position) and an integer value.
+    Values that are not small ints, and the rare explicit descriptions,
+    live in sparse dicts keyed by position in the buffer. SolutionStep
+    models and their descriptions are only built when the trace is read,
+    from the per-action templates, which may use {row}, {col} and {value}.
+
+    The trace policy bounds what is kept:
+    - max_steps caps the buffer. With "stride" sampling only steps whose
+      index is a multiple of the stride are kept, and the stride doubles
+      (dropping every other kept step) whenever the buffer is full, so the
+      sample stays spread over the whole solve. "head" keeps the first
+      max_steps steps.
+    - keyframe_interval adds a "snapshot" step holding the full state from
+      snapshot_source every that many steps, so a client replaying the
+      sampled deltas can resynchronize. Keyframes thin out with the stride,
+      and the interval doubles whenever the kept snapshots would hold more
+      than max_keyframe_items entries between them. Every kept step,
+      keyframes included, counts towards max_steps.
+    """
+
+    def __init__(self, descriptions: Optional[Dict[str, str]] = None):
+        self.descriptions = descriptions or {}
+        self.action_names: List[str] = []
+        self._action_codes: Dict[str, int] = {}
+        self.max_steps: Optional[int] = None
+        self.sampling = SAMPLING_STRIDE
+        self.keyframe_interval: Optional[int] = None
+        # Returns the solver's full state for keyframes; set by the solver
+        self.snapshot_source: Optional[Callable[[], Any]] = None
+        self.max_keyframe_items = MAX_KEYFRAME_ITEMS
+        self.total = 0
+        self.stride = 1
+        self.clear()
+
+    def configure(self, max_steps: Optional[int] = None, sampling: str = SAMPLING_STRIDE,
+                  keyframe_interval: Optional[int] = None):
+        self.max_steps = max_steps
+        self.sampling = sampling
+        self.keyframe_interval = keyframe_interval
+
+    def __len__(self) -> int:
+        return len(self.actions)
+
+    def append(self, action: str, position: Optional[Tuple[int, int]] = None,
+               value: Any = None, description: str = ""):
+        index = self.total
+        self.total = index + 1
+
+        if (self.keyframe_interval and self.snapshot_source is not None and
+                index % (self.keyframe_interval * self.stride) == 0):
+            self._keyframe(index)
+
+        if index % self.stride:
+            return
+        # Making room can double the stride, so test the step again against the new one
+        if self.max_steps is not None and not (self._make_room() and index % self.stride == 0):
+            return
+        self._store(index, action, position, value, description)
+
+    def _keyframe(self, index: int):
+        """Store a snapshot of the solver's state as step index, if it still fits"""
+        if not self._make_room():
+            return
+        snapshot = self.snapshot_source()
+        size = snapshot_size(snapshot)
+        # Space keyframes out, dropping every other kept one, until this one fits
+        while (self.keyframe_items + size > self.max_keyframe_items and
+               any(self.indices[slot] for slot in self._keyframe_slots())):
+            self.keyframe_interval *= 2
+            self._thin()
+        # Making room or spacing keyframes out may have skipped this index
+        if (self.keyframe_items + size <= self.max_keyframe_items and
+                index % (self.keyframe_interval * self.stride) == 0):
+            self._store(index, SNAPSHOT, None, snapshot, "")
+            self.keyframe_items += size
+
+    def _make_room(self) -> bool:
+        """Free a slot for one more step; False if none can be freed"""
+        if self.max_steps is None:
+            return True
+        while len(self) >= self.max_steps:
+            # Step 0 is kept at any stride, so thinning cannot free its slots
+            if self.sampling == SAMPLING_HEAD or not any(self.indices):
+                return False
+            self.stride *= 2
+            self._thin()
+        return True
+
+    def _keyframe_slots(self) -> List[int]:
+        snapshot = self._action_codes.get(SNAPSHOT)
+        return [slot for slot, code in enumerate(self.actions) if code == snapshot]
+
+    def _thin(self):
+        """Keep only the steps the current stride would have sampled"""
+        keyframe_stride = (self.keyframe_interval or 1) * self.stride
+        snapshot = self._action_codes.get(SNAPSHOT)
+        keep = [slot for slot, index in enumerate(self.indices)
+                if index % (keyframe_stride if self.actions[slot] == snapshot else self.stride) == 0]
+
+        objects, notes = self.objects, self.notes
+        self.indices = array('I', (self.indices[slot] for slot in keep))
+        self.actions = array('B', (self.actions[slot] for slot in keep))
+        self.rows = array('i', (self.rows[slot] for slot in keep))
+        self.cols = array('i', (self.cols[slot] for slot in keep))
+        self.values = array('i', (self.values[slot] for slot in keep))
+        self.objects = {new: objects[old] for new, old in enumerate(keep) if old in objects}
+        self.notes = {new: notes[old] for new, old in enumerate(keep) if old in notes}
+        self.keyframe_items = sum(snapshot_size(self.objects.get(slot))
+                                  for slot in self._keyframe_slots())
+
+    def _store(self, index: int, action: str, position: Optional[Tuple[int, int]],
+               value: Any, description: str):
+        code = self._action_codes.get(action)
+        if code is None:
+            code = self._action_codes[action] = len(self.action_names)
+            self.action_names.append(action)
+
+        slot = len(self.actions)
+        self.indices.append(index)
+        self.actions.append(code)
+        if position is None:
+            self.rows.append(-1)
+            self.cols.append(-1)
+        else:
+            self.rows.append(position[0])
+            self.cols.append(position[1])
+
+        if value is None:
+            self.values.append(NO_VALUE)
+        elif type(value) is int and INT_MIN <= value <= INT_MAX:
+            self.values.append(value)
+        else:
+            self.values.append(NO_VALUE)
+            self.objects[slot] = value
+
+        if description:
+            self.notes[slot] = description
+
+    def clear(self):
+        """Drop the stored steps; action codes and the step count stay valid"""
+        self.indices = array('I')
+        self.actions = array('B')
+        self.rows = array('i')
+        self.cols = array('i')
+        self.values = array('i')
+        self.objects: Dict[int, Any] = {}
+        self.notes: Dict[int, str] = {}
+        self.keyframe_items = 0
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the stored steps"""
+        size = sum(column.itemsize * len(column)
+                   for column in (self.indices, self.actions, self.rows, self.cols, self.values))
+        size += sum(sys.getsizeof(value) for value in self.objects.values())
+        return size + sum(sys.getsizeof(note) for note in self.notes.values())
+
+    def value(self, slot: int) -> Any:
+        value = self.values[slot]
+        if value == NO_VALUE:
+            return self.objects.get(slot)
+        return value
+
+    def as_dict(self, slot: int) -> Dict[str, Any]:
+        action = self.action_names[self.actions[slot]]
+        row, col = self.rows[slot], self.cols[slot]
+        value = self.value(slot)
+        index = self.indices[slot]
+        description = self.notes.get(slot)
+        if description is None:
+            if action == SNAPSHOT:
+                description = f"Full state at step {index}"
+            else:
+                template = self.descriptions.get(action)
+                description = template.format(row=row, col=col, value=value) if template else ""
+
+        return {
+            "action": action,
+            "position": (row, col) if row >= 0 else None,
+            "value": value,
+            "description": description,
+            "index": index,
+        }
+
+    def step(self, slot: int) -> SolutionStep:
+        # Fields are already well formed, so skip validation
+        return SolutionStep.model_construct(**self.as_dict(slot))
+
+    def to_steps(self, start: int = 0, stop: Optional[int] = None) -> List[SolutionStep]:
+        stop = len(self) if stop is None else min(stop, len(self))
+        return [self.step(i) for i in range(start, stop)]
@@ -0,0 +1,131 @@
+from typing import Any, Dict, List, Optional
+from app.storage.sqlite import connect
+import json
+import os
+import tempfile
+import time
+import uuid
+
+JOB_DB_PATH = os.environ.get(
+    "GRAPHSOLVE_JOB_DB", os.path.join(tempfile.gettempdir(), "graphsolve_jobs.sqlite3"))
+JOB_TTL_SECONDS = 24 * 3600  # finished jobs are kept this long
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"  # a response is available, with or without a solution
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED = (DONE, FAILED, CANCELLED)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    puzzle_type TEXT NOT NULL,
+    request TEXT NOT NULL,
+    status TEXT NOT NULL,
+    created REAL NOT NULL,
+    started REAL,
+    finished REAL,
+    progress TEXT,
+    result TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_by_status ON jobs (status, created);
+"""
+
+
+class JobNotFound(KeyError):
+    pass
+
+
+class JobStore:
+    """Solve jobs and their results in SQLite, so the queue survives a restart"""
+
+    def __init__(self, path: str = JOB_DB_PATH, ttl: float = JOB_TTL_SECONDS):
+        self.path = path
+        self.ttl = ttl
+        with connect(self.path) as db:
+            db.executescript(_SCHEMA)
+
+    def submit(self, puzzle_type: str, request: Dict[str, Any]) -> str:
+        job_id = uuid.uuid4().hex
+        with connect(self.path) as db:
+            db.execute("DELETE FROM jobs WHERE finished < ?", (time.time() - self.ttl,))
+            db.execute("INSERT INTO jobs (id, puzzle_type, request, status, created) "
+                       "VALUES (?, ?, ?, ?, ?)",
+                       (job_id, puzzle_type, json.dumps(request), QUEUED, time.time()))
+        return job_id
+
+    def count(self, status: str) -> int:
+        with connect(self.path) as db:
+            return db.execute("SELECT COUNT(*) FROM jobs WHERE status = ?", (status,)).fetchone()[0]
+
+    def claim(self) -> Optional[Dict[str, Any]]:
+        """Mark the oldest queued job running and return it, or None"""
+        with connect(self.path) as db:
+            while True:
+                row = db.execute("SELECT id, puzzle_type, request FROM jobs WHERE status = ? "
+                                 "ORDER BY created LIMIT 1", (QUEUED,)).fetchone()
+                if row is None:
+                    return None
+                # Another process may have claimed it since the SELECT
+                if db.execute("UPDATE jobs SET status = ?, started = ? WHERE id = ? AND status = ?",
+                              (RUNNING, time.time(), row[0], QUEUED)).rowcount:
+                    return {"id": row[0], "puzzle_type": row[1], "request": json.loads(row[2])}
+
+    def requeue(self, job_id: str):
+        with connect(self.path) as db:
+            db.execute("UPDATE jobs SET status = ?, started = NULL WHERE id = ? AND status = ?",
+                       (QUEUED, job_id, RUNNING))
+
+    def requeue_running(self) -> int:
+        """Put back jobs left running by a previous process"""
+        with connect(self.path) as db:
+            return db.execute("UPDATE jobs SET status = ?, started = NULL WHERE status = ?",
+                              (QUEUED, RUNNING)).rowcount
+
+    def set_progress(self, job_id: str, progress: Dict[str, Any]):
+        with connect(self.path) as db:
+            db.execute("UPDATE jobs SET progress = ? WHERE id = ?", (json.dumps(progress), job_id))
+
+    def finish(self, job_id: str, status: str, result: Optional[Dict[str, Any]] = None,
+               error: Optional[str] = None) -> bool:
+        """Record the outcome unless the job already finished (e.g. was cancelled)"""
+        placeholders = ", ".join("?" * len(FINISHED))
+        with connect(self.path) as db:
+            return db.execute(
+                f"UPDATE jobs SET status = ?, finished = ?, result = ?, error = ? "
+                f"WHERE id = ? AND status NOT IN ({placeholders})",
+                (status, time.time(), None if result is None else json.dumps(result), error,
+                 job_id) + FINISHED).rowcount > 0
+
+    def get(self, job_id: str, with_result: bool = False) -> Dict[str, Any]:
+        columns = "id, puzzle_type, status, created, started, finished, progress, error"
+        with connect(self.path) as db:
+            row = db.execute(f"SELECT {columns}{', result' if with_result else ''} "
+                             "FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            raise JobNotFound(job_id)
+
+        job = dict(zip(("job_id", "puzzle_type", "status", "created", "started", "finished",
+                        "progress", "error"), row))
+        job["progress"] = json.loads(job["progress"]) if job["progress"] else None
+        if with_result:
+            job["result"] = json.loads(row[-1]) if row[-1] else None
+        return job
+
+    def recent(self, limit: int = 50) -> List[Dict[str, Any]]:
+        with connect(self.path) as db:
+            ids = [row[0] for row in db.execute("SELECT id FROM jobs ORDER BY created DESC LIMIT ?",
+                                                (limit,))]
+        return [self.get(job_id) for job_id in ids]
+
+
+_store: Optional[JobStore] = None
+
+
+def get_job_store() -> JobStore:
+    global _store
+    if _store is None:
+        _store = JobStore()
+    return _store
@@ -0,0 +1,18 @@
+from contextlib import contextmanager
+from typing import Iterator
+import sqlite3
+
+
+@contextmanager
+def connect(path: str) -> Iterator[sqlite3.Connection]:
+    """A short-lived connection wrapped in one transaction.
+
+    Opening one per call keeps the stores usable from any thread.
+    """
+    db = sqlite3.connect(path, timeout=10)
+    try:
+        db.execute("PRAGMA journal_mode=WAL")
+        with db:
+            yield db
+    finally:
+        db.close()
@@ -0,0 +1,155 @@
+from typing import Any, Dict, List, Optional
+from app.models.schemas import SolutionStep
+from app.solvers.trace import SNAPSHOT, TraceBuffer
+from app.storage.sqlite import connect
+import json
+import os
+import tempfile
+import time
+import uuid
+
+TRACE_DB_PATH = os.environ.get(
+    "GRAPHSOLVE_TRACE_DB", os.path.join(tempfile.gettempdir(), "graphsolve_traces.sqlite3"))
+TRACE_TTL_SECONDS = 3600
+CHUNK_STEPS = 4096  # steps per stored chunk; a window read loads only the chunks it spans
+
+_COLUMNS = ("indices", "actions", "rows", "cols", "values")
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS traces (
+    id TEXT PRIMARY KEY,
+    puzzle_type TEXT NOT NULL,
+    created REAL NOT NULL,
+    length INTEGER NOT NULL,
+    steps_total INTEGER NOT NULL,
+    action_names TEXT NOT NULL,
+    descriptions TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS trace_chunks (
+    trace_id TEXT NOT NULL,
+    chunk INTEGER NOT NULL,
+    indices BLOB NOT NULL,
+    actions BLOB NOT NULL,
+    rows BLOB NOT NULL,
+    cols BLOB NOT NULL,
+    "values" BLOB NOT NULL,
+    objects TEXT,
+    notes TEXT,
+    PRIMARY KEY (trace_id, chunk)
+);
+CREATE TABLE IF NOT EXISTS trace_keyframes (
+    trace_id TEXT NOT NULL,
+    step_index INTEGER NOT NULL,
+    slot INTEGER NOT NULL,
+    PRIMARY KEY (trace_id, step_index)
+);
+"""
+
+
+class TraceNotFound(KeyError):
+    pass
+
+
+class TraceStore:
+    """Finished step traces in SQLite, read back in windows.
+
+    A trace is split into chunks of CHUNK_STEPS steps; each chunk keeps
+    TraceBuffer's columns as raw array bytes, with the sparse objects and
+    notes as JSON. Keyframe ("snapshot") positions are indexed so a reader
+    can seek to the last full state before any step. Traces expire after
+    TRACE_TTL_SECONDS.
+    """
+
+    def __init__(self, path: str = TRACE_DB_PATH, ttl: float = TRACE_TTL_SECONDS):
+        self.path = path
+        self.ttl = ttl
+        with connect(self.path) as db:
+            db.executescript(_SCHEMA)
+
+    def save(self, puzzle_type: str, trace: TraceBuffer) -> str:
+        trace_id = uuid.uuid4().hex
+        snapshot = trace._action_codes.get(SNAPSHOT)
+        chunks = []
+        for chunk, start in enumerate(range(0, len(trace), CHUNK_STEPS)):
+            stop = min(start + CHUNK_STEPS, len(trace))
+            objects = {slot - start: value for slot, value in trace.objects.items()
+                       if start <= slot < stop}
+            notes = {slot - start: note for slot, note in trace.notes.items()
+                     if start <= slot < stop}
+            chunks.append((trace_id, chunk) +
+                          tuple(getattr(trace, name)[start:stop].tobytes() for name in _COLUMNS) +
+                          (json.dumps(objects, default=list) if objects else None,
+                           json.dumps(notes) if notes else None))
+        keyframes = [(trace_id, trace.indices[slot], slot)
+                     for slot in range(len(trace)) if trace.actions[slot] == snapshot]
+
+        expired = (time.time() - self.ttl,)
+        with connect(self.path) as db:
+            for table in ("trace_chunks", "trace_keyframes"):
+                db.execute(f"DELETE FROM {table} WHERE trace_id IN "
+                           "(SELECT id FROM traces WHERE created < ?)", expired)
+            db.execute("DELETE FROM traces WHERE created < ?", expired)
+            db.execute("INSERT INTO traces VALUES (?, ?, ?, ?, ?, ?, ?)",
+                       (trace_id, puzzle_type, time.time(), len(trace), trace.total,
+                        json.dumps(trace.action_names), json.dumps(trace.descriptions)))
+            db.executemany('INSERT INTO trace_chunks VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)', chunks)
+            db.executemany("INSERT INTO trace_keyframes VALUES (?, ?, ?)", keyframes)
+        return trace_id
+
+    def info(self, trace_id: str) -> Dict[str, Any]:
+        with connect(self.path) as db:
+            row = db.execute("SELECT puzzle_type, length, steps_total FROM traces WHERE id = ?",
+                             (trace_id,)).fetchone()
+            if row is None:
+                raise TraceNotFound(trace_id)
+            keyframes = db.execute("SELECT COUNT(*) FROM trace_keyframes WHERE trace_id = ?",
+                                   (trace_id,)).fetchone()[0]
+        return {"trace_id": trace_id, "puzzle_type": row[0], "length": row[1],
+                "steps_total": row[2], "keyframes": keyframes}
+
+    def keyframe_before(self, trace_id: str, step_index: int) -> int:
+        """Slot of the last keyframe at or before step_index, or 0 without one"""
+        with connect(self.path) as db:
+            row = db.execute("SELECT slot FROM trace_keyframes WHERE trace_id = ? AND step_index <= ? "
+                             "ORDER BY step_index DESC LIMIT 1", (trace_id, step_index)).fetchone()
+        return row[0] if row else 0
+
+    def read(self, trace_id: str, offset: int = 0, limit: int = 1000) -> List[SolutionStep]:
+        """Steps in slots [offset, offset + limit)"""
+        with connect(self.path) as db:
+            meta = db.execute("SELECT length, action_names, descriptions FROM traces WHERE id = ?",
+                              (trace_id,)).fetchone()
+            if meta is None:
+                raise TraceNotFound(trace_id)
+            length, action_names, descriptions = meta
+            stop = min(offset + limit, length)
+            if offset >= stop:
+                return []
+            rows = db.execute('SELECT chunk, indices, actions, rows, cols, "values", objects, notes '
+                              "FROM trace_chunks WHERE trace_id = ? AND chunk BETWEEN ? AND ? "
+                              "ORDER BY chunk",
+                              (trace_id, offset // CHUNK_STEPS, (stop - 1) // CHUNK_STEPS)).fetchall()
+
+        window = TraceBuffer(json.loads(descriptions))
+        window.action_names = json.loads(action_names)
+        base = rows[0][0] * CHUNK_STEPS
+        for chunk, *columns, objects, notes in rows:
+            start = chunk * CHUNK_STEPS - base
+            for name, data in zip(_COLUMNS, columns):
+                getattr(window, name).frombytes(data)
+            if objects:
+                window.objects.update((start + int(slot), value)
+                                      for slot, value in json.loads(objects).items())
+            if notes:
+                window.notes.update((start + int(slot), note)
+                                    for slot, note in json.loads(notes).items())
+        return window.to_steps(offset - base, stop - base)
+
+
+_store: Optional[TraceStore] = None
+
+
+def get_trace_store() -> TraceStore:
+    global _store
+    if _store is None:
+        _store = TraceStore()
+    return _store
@@ -1,31 +1,84 @@
 import time
+from contextlib import contextmanager
+from contextvars import ContextVar
 from functools import wraps
-from typing import Any, Callable
+from typing import Any, Callable, Dict, Iterator, List, Optional
 import asyncio
 
 
-def timer(func: Callable) -> Callable:
-    @wraps(func)
-    def wrapper(*args, **kwargs):
-        start = time.time()
-        result = func(*args, **kwargs)
-        end = time.time()
-        print(f"{func.__name__} took {(end - start) * 1000:.2f}ms")
-        return result
+class SpanRecorder:
+    """Timed spans of one solve, aggregated by name.
 
-    return wrapper
+    Self time is a span's total minus the spans nested inside it, so a
+    "search" span around a whole solve does not count its "validate" twice.
+    """
 
+    def __init__(self):
+        self.spans: Dict[str, List[float]] = {}  # name -> [count, total, self] in seconds
+        self.open: List[List[float]] = []  # per open span, time spent in nested spans
 
-def async_timer(func: Callable) -> Callable:
-    @wraps(func)
-    async def wrapper(*args, **kwargs):
-        start = time.time()
-        result = await func(*args, **kwargs)
-        end = time.time()
-        print(f"{func.__name__} took {(end - start) * 1000:.2f}ms")
-        return result
+    def summary(self) -> List[Dict[str, Any]]:
+        return [{"name": name, "count": int(count), "total_ms": total * 1000,
+                 "self_ms": own * 1000}
+                for name, (count, total, own) in self.spans.items()]
 
-    return wrapper
+
+_recorder: ContextVar[Optional[SpanRecorder]] = ContextVar("span_recorder", default=None)
+
+
+@contextmanager
+def recording() -> Iterator[SpanRecorder]:
+    """Collect the spans entered in this context"""
+    recorder = SpanRecorder()
+    token = _recorder.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _recorder.reset(token)
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """Time a block into the current recorder; a no-op when nothing is recording"""
+    recorder = _recorder.get()
+    if recorder is None:
+        yield
+        return
+
+    nested = [0.0]
+    recorder.open.append(nested)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        recorder.open.pop()
+        if recorder.open:
+            recorder.open[-1][0] += elapsed
+        entry = recorder.spans.setdefault(name, [0, 0.0, 0.0])
+        entry[0] += 1
+        entry[1] += elapsed
+        entry[2] += elapsed - nested[0]
+
+
+def timed(name: Optional[str] = None) -> Callable[[Callable], Callable]:
+    """Decorator recording each call (sync or async) as a span, named after the function by default"""
+    def decorator(func: Callable) -> Callable:
+        span_name = name or func.__name__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name):
+                return func(*args, **kwargs)
+
+        @wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            with span(span_name):
+                return await func(*args, **kwargs)
+
+        return async_wrapper if asyncio.iscoroutinefunction(func) else wrapper
+
+    return decorator
 
 
 def timeout(seconds: int):
@@ -0,0 +1,146 @@
+from collections import Counter
+from contextlib import contextmanager
+from types import CodeType
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from app.models.schemas import ProfileFunction, ProfileReport
+import cProfile
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+
+PROFILE_INTERVAL = float(os.environ.get("GRAPHSOLVE_PROFILE_INTERVAL", 0.001))  # seconds between samples
+PROFILE_TOP = int(os.environ.get("GRAPHSOLVE_PROFILE_TOP", 30))  # functions reported
+
+# Paths in reports are relative to the backend directory
+_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _location(filename: str, line: int, name: str) -> str:
+    if filename.startswith(_ROOT):
+        filename = os.path.relpath(filename, _ROOT)
+    return f"{name} ({filename}:{line})" if line else name
+
+
+class StackSampler:
+    """Samples one thread's Python stack from a background thread.
+
+    Only frames entered below the root code object are kept, so the
+    report starts at the profiled call rather than at the worker loop.
+    """
+
+    def __init__(self, thread_id: int, root: CodeType, interval: float = PROFILE_INTERVAL):
+        self.thread_id = thread_id
+        self.root = root
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        self.thread.join()
+
+    def _run(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None and frame.f_code is not self.root:
+                stack.append(frame.f_code)
+                frame = frame.f_back
+            if frame is None or not stack:
+                continue  # not inside the profiled call
+            stack.reverse()
+            self.stacks[tuple(stack)] += 1
+            self.samples += 1
+
+    def collapsed(self) -> str:
+        labels: Dict[CodeType, str] = {}
+
+        def label(code: CodeType) -> str:
+            if code not in labels:
+                labels[code] = _location(code.co_filename, code.co_firstlineno, code.co_name)
+            return labels[code]
+
+        return "\n".join(f"{';'.join(map(label, stack))} {count}"
+                         for stack, count in self.stacks.most_common())
+
+    def functions(self, duration_ms: float) -> List[ProfileFunction]:
+        """Self and total time per function, scaled from sample shares"""
+        own: Counter = Counter()
+        total: Counter = Counter()
+        for stack, count in self.stacks.items():
+            own[stack[-1]] += count
+            for code in set(stack):
+                total[code] += count
+        scale = duration_ms / self.samples if self.samples else 0.0
+        return [ProfileFunction(function=_location(code.co_filename, code.co_firstlineno, code.co_name),
+                                self_ms=count * scale, total_ms=total[code] * scale)
+                for code, count in own.most_common(PROFILE_TOP)]
+
+
+def _deterministic_functions(profiler: cProfile.Profile) -> List[ProfileFunction]:
+    stats = pstats.Stats(profiler).stats
+    rows = sorted(stats.items(), key=lambda item: item[1][2], reverse=True)[:PROFILE_TOP]
+    return [ProfileFunction(function=_location(filename, line, name), calls=calls,
+                            self_ms=own * 1000, total_ms=cumulative * 1000)
+            for (filename, line, name), (_, calls, own, cumulative, _) in rows]
+
+
+def profile_call(fn: Callable[[], Any], mode: str = "sampling") -> Tuple[Any, ProfileReport]:
+    """Run fn under a profiler; returns its result and the report.
+
+    "sampling" reads the stack every PROFILE_INTERVAL seconds and costs
+    little. "deterministic" also runs cProfile, which counts every call
+    exactly but slows Python-heavy solves several times over. Both modes
+    report collapsed stacks from the sampler.
+    """
+    sampler = StackSampler(threading.get_ident(), profile_call.__code__)
+    profiler: Optional[cProfile.Profile] = cProfile.Profile() if mode == "deterministic" else None
+    # The sampler only runs when the solving thread releases the GIL
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(min(switch_interval, PROFILE_INTERVAL))
+    sampler.start()
+    started = time.perf_counter()
+    try:
+        if profiler is not None:
+            profiler.enable()
+        try:
+            result = fn()
+        finally:
+            if profiler is not None:
+                profiler.disable()
+    finally:
+        duration_ms = (time.perf_counter() - started) * 1000
+        sampler.stop()
+        sys.setswitchinterval(switch_interval)
+
+    functions = (_deterministic_functions(profiler) if profiler is not None
+                 else sampler.functions(duration_ms))
+    return result, ProfileReport(mode=mode, duration_ms=duration_ms, samples=sampler.samples,
+                                 functions=functions, collapsed=sampler.collapsed())
+
+
+@contextmanager
+def peak_memory() -> Iterator[List[int]]:
+    """Peak bytes allocated above the starting level inside the block, via
+    tracemalloc; yields a one-item list that is filled in on exit."""
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    else:
+        tracemalloc.reset_peak()
+    baseline = tracemalloc.get_traced_memory()[0]
+    peak = [0]
+    try:
+        yield peak
+    finally:
+        peak[0] = max(0, tracemalloc.get_traced_memory()[1] - baseline)
+        if started:
+            tracemalloc.stop()
@@ -0,0 +1,10 @@
+"""Reproducible solver benchmarks.
+
+    python -m benchmarks                     # quick tier, compared with baseline.json
+    python -m benchmarks --tier full         # adds large mazes and exhaustive searches
+    python -m benchmarks --filter sudoku/    # a subset of the cases
+    python -m benchmarks --update-baseline   # record the current numbers
+
+Run from the backend directory. The exit status is 1 when a case regresses
+beyond the limits in tolerances.json.
+"""
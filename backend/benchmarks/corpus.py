@@ -0,0 +1,160 @@
+from typing import Any, Callable, Dict, List, Optional
+import random
+
+QUICK = "quick"
+FULL = "full"  # adds the slow cases: large mazes and exhaustive searches
+
+# 17-clue puzzles from Gordon Royle's collection, and the well-known "hardest"
+# puzzles, which defeat simple propagation
+SUDOKU_17_CLUE = {
+    "royle17_1": "000000010400000000020000000000050407008000300001090000300400200050100000000806000",
+    "royle17_2": "000000010400000000020000000000050604008000300001090000300400200050100000000807000",
+    "royle17_3": "000000012000035000000600070700000300000400800100000000000120000080000040050000600",
+    "royle17_4": "000000012003600000000007000410020000000500300700000600280000040000300500000000000",
+    "royle17_5": "000000012008030000000000040120500000000004700060000000507000300000620000000100000",
+}
+SUDOKU_HARDEST = {
+    "inkala_2012": "800000000003600000070090200050007000000045700000100030001000068008500010090000400",
+    "ai_escargot": "100007090030020008009600500005300900010080002600004000300000010040000007007000300",
+    "golden_nugget": "000000039000001005003050800008090006070002000100400000009080050020000600400700000",
+    "easter_monster": "100000002090400050006000700050903000000070000000850040700000600030009080002000001",
+    "platinum_blonde": "000000012000000003002300400001800005060070800000009000008500000900040500470006000",
+}
+SUDOKU_ALGORITHMS = ["backtracking", "constraint_propagation", "csp", "sat"]
+# Plain search takes seconds per run on the 17-clue set
+SUDOKU_SLOW = {("17_clue", "backtracking"), ("17_clue", "constraint_propagation")}
+
+NQUEENS_SIZES = range(4, 13)
+# Presets that still allow a solution at every size they are used with
+NQUEENS_PRESETS = {"corner": [(0, 1)], "pair": [(0, 2), (1, 5)]}
+NQUEENS_ALGORITHMS = ["backtracking", "csp", "sat"]
+
+# Capped at 1000x1000 rather than 2000x2000: one BFS solve of a 2000x2000 maze
+# takes about two minutes and peaks near 300 MiB, so with the warm-up, the
+# timed runs and the slower tracemalloc run a single case would take a quarter
+# of an hour, and A* under tracemalloc risks the 300 s solve timeout
+MAZE_SIZES = {QUICK: [10, 50, 100, 200], FULL: [500, 1000]}
+MAZE_ALGORITHMS = ["bfs", "dfs", "astar"]
+# DFS keeps a copy of the path per stack entry: 500x500 already peaks near 600 MiB
+MAZE_DFS_MAX_SIZE = 500
+MAZE_SEED = 20240601
+
+KNIGHT_SIZES = range(5, 9)
+KNIGHT_ALGORITHMS = ["warnsdorff", "backtracking"]
+# Starts without an open tour (half the 5x5 and 7x7 squares) are searched
+# exhaustively by backtracking; the node cap keeps them comparable
+KNIGHT_BACKTRACK_NODES = 20000
+
+
+class Case:
+    """One benchmark: a solver and algorithm over one or more fixed inputs.
+
+    A run solves every input once; the inputs are built on first use so
+    that listing or filtering the corpus stays cheap.
+    """
+
+    def __init__(self, name: str, puzzle_type: str, inputs: Callable[[], List[Dict[str, Any]]],
+                 options: Dict[str, Any], tier: str = QUICK):
+        self.name = name
+        self.puzzle_type = puzzle_type
+        self.options = dict(options, return_steps=options.get("return_steps", False))
+        self.tier = tier
+        self._make_inputs = inputs
+        self._inputs: Optional[List[Dict[str, Any]]] = None
+
+    @property
+    def inputs(self) -> List[Dict[str, Any]]:
+        if self._inputs is None:
+            self._inputs = self._make_inputs()
+        return self._inputs
+
+
+def sudoku_grid(puzzle: str) -> List[List[int]]:
+    return [[int(puzzle[row * 9 + col]) for col in range(9)] for row in range(9)]
+
+
+def generate_maze(rows: int, cols: int, seed: int, loops: float = 0.05) -> List[List[int]]:
+    """A reproducible maze: an iterative randomized depth-first carve over the
+    cells at even coordinates, then a fraction of walls knocked out to add
+    loops. The app's generator is unseeded and quadratic in the grid size."""
+    rng = random.Random(seed)
+    maze = [[1] * cols for _ in range(rows)]
+    maze[0][0] = 0
+    stack = [(0, 0)]
+    while stack:
+        row, col = stack[-1]
+        options = [(row + dr, col + dc, row + dr // 2, col + dc // 2)
+                   for dr, dc in ((0, 2), (2, 0), (0, -2), (-2, 0))
+                   if 0 <= row + dr < rows and 0 <= col + dc < cols and maze[row + dr][col + dc]]
+        if not options:
+            stack.pop()
+            continue
+        next_row, next_col, wall_row, wall_col = rng.choice(options)
+        maze[wall_row][wall_col] = 0
+        maze[next_row][next_col] = 0
+        stack.append((next_row, next_col))
+
+    for _ in range(int(rows * cols * loops)):
+        maze[rng.randrange(rows)][rng.randrange(cols)] = 0
+    return maze
+
+
+def maze_input(size: int) -> Dict[str, Any]:
+    # The far corner cell the carve is guaranteed to reach
+    end = (size - 1) // 2 * 2
+    return {"grid": generate_maze(size, size, MAZE_SEED + size), "start": (0, 0), "end": (end, end)}
+
+
+def build_corpus() -> List[Case]:
+    cases = []
+    for puzzles, label in ((SUDOKU_17_CLUE, "17_clue"), (SUDOKU_HARDEST, "hardest")):
+        grids = [sudoku_grid(puzzle) for puzzle in puzzles.values()]
+        for algorithm in SUDOKU_ALGORITHMS:
+            cases.append(Case(f"sudoku/{label}/{algorithm}", "sudoku",
+                              lambda grids=grids: [{"grid": [row[:] for row in grid]} for grid in grids],
+                              {"algorithm": algorithm},
+                              FULL if (label, algorithm) in SUDOKU_SLOW else QUICK))
+
+    for algorithm in NQUEENS_ALGORITHMS:
+        for n in NQUEENS_SIZES:
+            cases.append(Case(f"nqueens/{n}/{algorithm}", "nqueens",
+                              lambda n=n: [{"n": n}], {"algorithm": algorithm}))
+        for name, queens in NQUEENS_PRESETS.items():
+            cases.append(Case(f"nqueens/8_{name}/{algorithm}", "nqueens",
+                              lambda queens=queens: [{"n": 8, "preset_queens": queens}],
+                              {"algorithm": algorithm}))
+    for n in (6, 8):
+        cases.append(Case(f"nqueens/{n}_all/backtracking", "nqueens", lambda n=n: [{"n": n}],
+                          {"algorithm": "backtracking", "max_solutions": 100}))
+    cases.append(Case("nqueens/8_all_steps/backtracking", "nqueens", lambda: [{"n": 8}],
+                      {"algorithm": "backtracking", "max_solutions": 100, "return_steps": True}))
+
+    for tier, sizes in MAZE_SIZES.items():
+        for size in sizes:
+            for algorithm in MAZE_ALGORITHMS:
+                if algorithm == "dfs" and size > MAZE_DFS_MAX_SIZE:
+                    continue
+                cases.append(Case(f"maze/{size}x{size}/{algorithm}", "maze",
+                                  lambda size=size: [maze_input(size)],
+                                  {"algorithm": algorithm, "timeout": 300}, tier))
+    cases.append(Case("maze/100x100_steps/astar", "maze", lambda: [maze_input(100)],
+                      {"algorithm": "astar", "return_steps": True}))
+
+    for algorithm in KNIGHT_ALGORITHMS:
+        for n in KNIGHT_SIZES:
+            options: Dict[str, Any] = {"algorithm": algorithm}
+            tier = QUICK
+            if algorithm == "backtracking":
+                options["max_nodes"] = KNIGHT_BACKTRACK_NODES
+                tier = FULL if n % 2 else QUICK
+            cases.append(Case(f"knight/{n}x{n}_all_starts/{algorithm}", "knight",
+                              lambda n=n: [{"n": n, "start": (row, col)}
+                                           for row in range(n) for col in range(n)],
+                              options, tier))
+    return cases
+
+
+def select(tier: str = QUICK, pattern: Optional[str] = None) -> List[Case]:
+    """The cases in a tier (full includes quick), optionally those whose name contains pattern"""
+    return [case for case in build_corpus()
+            if (tier == FULL or case.tier == QUICK) and (pattern is None or pattern in case.name)]
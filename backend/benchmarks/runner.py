@@ -0,0 +1,229 @@
+from typing import Any, Dict, List, Optional, Tuple
+from app.api.endpoints import solve_request
+from app.models.schemas import PuzzleRequest
+from app.utils.profiling import peak_memory
+from benchmarks.corpus import FULL, QUICK, Case, select
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BASELINE_PATH = os.path.join(HERE, "baseline.json")
+TOLERANCES_PATH = os.path.join(HERE, "tolerances.json")
+DEFAULT_REPEAT = 5
+
+
+def _requests(case: Case) -> List[PuzzleRequest]:
+    return [PuzzleRequest.model_validate({"puzzle_type": case.puzzle_type, "input": data,
+                                          "options": case.options})
+            for data in case.inputs]
+
+
+def _run(case: Case, requests: List[PuzzleRequest]) -> Tuple[float, int, int]:
+    """Solve every input once, as a solver worker would; (ms, nodes, solved)"""
+    nodes = solved = 0
+    started = time.perf_counter()
+    for request in requests:
+        response = solve_request(case.puzzle_type, request)
+        nodes += response.statistics.nodes_explored if response.statistics else 0
+        solved += response.success
+    return (time.perf_counter() - started) * 1000, nodes, solved
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile"""
+    ordered = sorted(values)
+    return ordered[max(0, min(len(ordered) - 1, round(fraction * len(ordered) + 0.5) - 1))]
+
+
+def calibrate(rounds: int = 5) -> float:
+    """Best-of time (ms) of a fixed pure-Python workload. Baseline times are
+    scaled by its ratio so a slower or busier machine does not read as a
+    regression."""
+    best = float("inf")
+    for _ in range(rounds):
+        started = time.perf_counter()
+        seen: Dict[int, int] = {}
+        for i in range(200000):
+            seen[i % 1024] = seen.get(i % 1024, 0) + i
+        best = min(best, (time.perf_counter() - started) * 1000)
+    return best
+
+
+def _timed_run(case: Case, requests: List[PuzzleRequest]) -> float:
+    """One run with the collector off, as timeit does, so that garbage left
+    by earlier cases does not land in this case's timings"""
+    gc.collect()
+    gc.disable()
+    try:
+        return _run(case, requests)[0]
+    finally:
+        gc.enable()
+
+
+def measure(case: Case, repeat: int = DEFAULT_REPEAT) -> Dict[str, Any]:
+    """Median and p95 over repeat timed runs after a warm-up, plus the peak
+    allocation of one more run under tracemalloc (kept out of the timings)"""
+    requests = _requests(case)
+    _, nodes, solved = _run(case, requests)
+    times = [_timed_run(case, requests) for _ in range(max(1, repeat))]
+    with peak_memory() as peak:
+        _run(case, requests)
+    return {
+        "median_ms": statistics.median(times),
+        "p95_ms": _percentile(times, 0.95),
+        "min_ms": min(times),
+        "runs": len(times),
+        "nodes": nodes,
+        "solved": solved,
+        "inputs": len(requests),
+        "peak_memory_bytes": peak[0],
+    }
+
+
+def _tolerance(tolerances: Dict[str, Any], name: str) -> Dict[str, float]:
+    """The defaults, overridden by every case pattern contained in name"""
+    merged = dict(tolerances.get("default", {}))
+    for pattern, overrides in tolerances.get("cases", {}).items():
+        if pattern in name:
+            merged.update(overrides)
+    return merged
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]],
+            tolerances: Dict[str, Any], scale: float = 1.0) -> Tuple[List[str], List[str]]:
+    """Regressions beyond tolerance, and informational notes (big wins).
+
+    Times and memory may grow by a relative tolerance, and changes below an
+    absolute floor are ignored as noise. Node counts are deterministic, so
+    their tolerance is usually zero. Fewer solved inputs always regress.
+    Baseline times are multiplied by scale, the calibration ratio. A case
+    missing from the baseline regresses too, or the gate could never fail
+    on it; record it with --update-baseline.
+    """
+    regressions, notes = [], []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            regressions.append(f"{name}: not in the baseline")
+            continue
+        tolerance = _tolerance(tolerances, name)
+
+        if result["solved"] < base["solved"]:
+            regressions.append(f"{name}: solved {result['solved']} of {result['inputs']}, "
+                               f"baseline {base['solved']}")
+        checks = (("median_ms", "time", "min_delta_ms"), ("p95_ms", "p95", "min_delta_ms"),
+                  ("nodes", "nodes", None), ("peak_memory_bytes", "memory", "min_delta_bytes"))
+        for key, limit, floor in checks:
+            old, new = base[key], result[key]
+            if key.endswith("_ms"):
+                old *= scale
+            allowed = old * (1 + tolerance.get(limit, 0.0))
+            if new > allowed and (floor is None or new - old > tolerance.get(floor, 0)):
+                regressions.append(f"{name}: {key} {new:.6g} vs baseline {old:.6g} "
+                                   f"(+{(new / old - 1) * 100 if old else float('inf'):.0f}%, "
+                                   f"tolerance {tolerance.get(limit, 0.0) * 100:.0f}%)")
+            elif key == "median_ms" and old and new < old / 2:
+                notes.append(f"{name}: median {new:.3g} ms, baseline {old:.3g} ms")
+    return regressions, notes
+
+
+def _load(path: str) -> Dict[str, Any]:
+    with open(path) as f:
+        return json.load(f)
+
+
+def _save(path: str, data: Dict[str, Any]):
+    with open(path, "w") as f:
+        json.dump(data, f, indent=1, sort_keys=True)
+        f.write("\n")
+
+
+def run(tier: str = QUICK, pattern: Optional[str] = None, repeat: int = DEFAULT_REPEAT,
+        verbose: bool = True) -> Dict[str, Any]:
+    calibration_ms = calibrate()
+    cases = {}
+    for case in select(tier, pattern):
+        result = measure(case, repeat)
+        cases[case.name] = result
+        if verbose:
+            print(f"{case.name:45s} median {result['median_ms']:10.2f} ms  p95 {result['p95_ms']:10.2f} ms  "
+                  f"nodes {result['nodes']:>10}  peak {result['peak_memory_bytes'] / 2 ** 20:8.2f} MiB  "
+                  f"solved {result['solved']}/{result['inputs']}", file=sys.stderr)
+    return {
+        "meta": {
+            "tier": tier,
+            "repeat": repeat,
+            "calibration_ms": calibration_ms,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        },
+        "cases": cases,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Run the solver benchmark corpus and compare it with the stored baseline.")
+    parser.add_argument("--tier", choices=[QUICK, FULL], default=QUICK)
+    parser.add_argument("--filter", dest="pattern", help="only cases whose name contains this")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="timed runs per case")
+    parser.add_argument("--output", help="write the results JSON here")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--tolerances", default=TOLERANCES_PATH)
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="merge these results into the baseline instead of comparing")
+    parser.add_argument("--list", action="store_true", help="list the selected cases and exit")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for case in select(args.tier, args.pattern):
+            print(f"{case.name} [{case.tier}]")
+        return 0
+
+    results = run(args.tier, args.pattern, args.repeat)
+    if args.output:
+        _save(args.output, results)
+
+    if args.update_baseline:
+        baseline = _load(args.baseline) if os.path.exists(args.baseline) else {"cases": {}}
+        baseline["meta"] = results["meta"]
+        baseline["cases"].update(results["cases"])
+        _save(args.baseline, baseline)
+        print(f"Updated {len(results['cases'])} cases in {args.baseline}", file=sys.stderr)
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --update-baseline first", file=sys.stderr)
+        return 0
+    baseline = _load(args.baseline)
+    scale = results["meta"]["calibration_ms"] / baseline["meta"]["calibration_ms"]
+    print(f"Calibration {results['meta']['calibration_ms']:.2f} ms, baseline "
+          f"{baseline['meta']['calibration_ms']:.2f} ms: times scaled by {scale:.2f}", file=sys.stderr)
+    tolerances = _load(args.tolerances)
+    regressions, notes = compare(results["cases"], baseline["cases"], tolerances, scale)
+    if regressions:
+        # A single noisy measurement should not fail the gate: re-measure the
+        # flagged cases and keep whichever run was faster
+        flagged = {regression.split(":")[0] for regression in regressions}
+        for case in select(args.tier, args.pattern):
+            if case.name in flagged and case.name in baseline["cases"]:
+                retry = measure(case, args.repeat)
+                if retry["median_ms"] < results["cases"][case.name]["median_ms"]:
+                    results["cases"][case.name] = retry
+        regressions, notes = compare(results["cases"], baseline["cases"], tolerances, scale)
+        if args.output:
+            _save(args.output, results)
+    for note in notes:
+        print(f"note: {note}", file=sys.stderr)
+    for regression in regressions:
+        print(f"REGRESSION: {regression}", file=sys.stderr)
+    print(f"{len(results['cases'])} cases, {len(regressions)} regressions", file=sys.stderr)
+    return 1 if regressions else 0
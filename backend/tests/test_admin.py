@@ -0,0 +1,38 @@
+from fastapi.testclient import TestClient
+from starlette.requests import Request
+from app.main import app
+from app.api import admin
+from app.api.admin import is_admin
+
+import pytest
+
+
+def request_with(token: bytes) -> Request:
+    return Request({"type": "http", "headers": [(b"x-admin-token", token)]})
+
+
+@pytest.mark.parametrize("token, allowed", [
+    (b"secret", True), (b"wrong", False), ("s\xe9cret".encode("latin-1"), False),
+    ("\xe9".encode("latin-1"), False),
+])
+def test_admin_token(monkeypatch, token, allowed):
+    monkeypatch.setattr(admin, "ADMIN_TOKEN", "secret")
+    assert is_admin(request_with(token)) is allowed
+
+
+def test_no_token_configured_refuses_everyone(monkeypatch):
+    monkeypatch.setattr(admin, "ADMIN_TOKEN", None)
+    assert not is_admin(request_with(b"secret"))
+    assert not is_admin(None)
+
+
+def test_non_ascii_configured_token(monkeypatch):
+    monkeypatch.setattr(admin, "ADMIN_TOKEN", "s\xe9cret")
+    assert is_admin(request_with("s\xe9cret".encode()))
+    assert not is_admin(request_with("s\xe9cret".encode("latin-1")))
+
+
+def test_non_ascii_header_is_refused_not_an_error(monkeypatch):
+    monkeypatch.setattr(admin, "ADMIN_TOKEN", "secret")
+    response = TestClient(app).get("/api/jobs", headers={"X-Admin-Token": "\xe9".encode("latin-1")})
+    assert response.status_code == 403
@@ -0,0 +1,41 @@
+from benchmarks.corpus import FULL, QUICK, generate_maze, select
+from benchmarks.runner import compare
+
+RESULT = {"median_ms": 10.0, "p95_ms": 12.0, "nodes": 100, "peak_memory_bytes": 1000,
+          "solved": 1, "inputs": 1}
+TOLERANCES = {"default": {"time": 0.5, "p95": 0.5, "nodes": 0.0, "memory": 0.1,
+                          "min_delta_ms": 1.0, "min_delta_bytes": 0}}
+
+
+def test_within_tolerance_passes():
+    regressions, _ = compare({"case": dict(RESULT, median_ms=14.0)}, {"case": RESULT}, TOLERANCES)
+    assert regressions == []
+
+
+def test_slower_or_fewer_solved_regresses():
+    result = dict(RESULT, median_ms=30.0, nodes=101, solved=0)
+    regressions, _ = compare({"case": result}, {"case": RESULT}, TOLERANCES)
+    assert len(regressions) == 3
+
+
+def test_times_scale_with_the_calibration():
+    regressions, _ = compare({"case": dict(RESULT, median_ms=30.0, p95_ms=36.0)},
+                             {"case": RESULT}, TOLERANCES, scale=3.0)
+    assert regressions == []
+
+
+def test_case_missing_from_the_baseline_regresses():
+    regressions, _ = compare({"case": RESULT}, {}, TOLERANCES)
+    assert regressions == ["case: not in the baseline"]
+
+
+def test_full_tier_includes_quick():
+    quick = {case.name for case in select(QUICK)}
+    full = {case.name for case in select(FULL)}
+    assert quick < full
+    assert all(case.tier == QUICK for case in select(QUICK))
+
+
+def test_generated_mazes_are_reproducible():
+    assert generate_maze(21, 21, 7) == generate_maze(21, 21, 7)
+    assert generate_maze(21, 21, 7)[0][0] == 0
@@ -0,0 +1,197 @@
+from typing import List, Optional, Tuple
+from app.solvers.canonical import (
+    CANONICALIZERS, canonical_knight, canonical_maze, canonical_nqueens, canonical_sudoku,
+    dihedral, dihedral_inverse
+)
+import random
+
+import pytest
+
+PUZZLE = [
+    [5, 3, 0, 0, 7, 0, 0, 0, 0],
+    [6, 0, 0, 1, 9, 5, 0, 0, 0],
+    [0, 9, 8, 0, 0, 0, 0, 6, 0],
+    [8, 0, 0, 0, 6, 0, 0, 0, 3],
+    [4, 0, 0, 8, 0, 3, 0, 0, 1],
+    [7, 0, 0, 0, 2, 0, 0, 0, 6],
+    [0, 6, 0, 0, 0, 0, 2, 8, 0],
+    [0, 0, 0, 4, 1, 9, 0, 0, 5],
+    [0, 0, 0, 0, 8, 0, 0, 7, 9],
+]
+SOLUTION = [[int(v) for v in row] for row in (
+    "534678912", "672195348", "198342567", "859761423", "426853791",
+    "713924856", "961537284", "287419635", "345286179",
+)]
+
+
+def random_transform(rng: random.Random):
+    """A random symmetry, band and stack order and renaming of digits"""
+    return (rng.randrange(8), rng.sample(range(3), 3), rng.sample(range(3), 3),
+            [0] + rng.sample(range(1, 10), 9))
+
+
+def apply_transform(grid: List[List[int]], transform) -> List[List[int]]:
+    k, bands, stacks, digits = transform
+    moved = [[0] * 9 for _ in range(9)]
+    for r in range(9):
+        for c in range(9):
+            row, col = dihedral(k, 9, r, c)
+            moved[bands[row // 3] * 3 + row % 3][stacks[col // 3] * 3 + col % 3] = digits[grid[r][c]]
+    return moved
+
+
+def valid_sudoku(puzzle: List[List[int]], solution: List[List[int]]) -> bool:
+    digits = set(range(1, 10))
+    return (all(not puzzle[r][c] or puzzle[r][c] == solution[r][c] for r in range(9) for c in range(9))
+            and all(set(solution[i]) == digits for i in range(9))
+            and all({solution[r][i] for r in range(9)} == digits for i in range(9))
+            and all({solution[br + r][bc + c] for r in range(3) for c in range(3)} == digits
+                    for br in range(0, 9, 3) for bc in range(0, 9, 3)))
+
+
+@pytest.mark.parametrize("k", range(8))
+def test_dihedral_inverse(k):
+    for r in range(5):
+        for c in range(5):
+            assert dihedral_inverse(k, 5, *dihedral(k, 5, r, c)) == (r, c)
+    assert len({dihedral(k, 5, r, c) for r in range(5) for c in range(5)}) == 25
+
+
+def test_sudoku_round_trip():
+    canonical = canonical_sudoku({'grid': PUZZLE})
+    assert canonical.restore(canonical.reduce(SOLUTION)) == SOLUTION
+    assert valid_sudoku([[0] * 9] * 9, canonical.reduce(SOLUTION))
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_sudoku_class_members_share_key_and_solutions(seed):
+    rng = random.Random(seed)
+    transform = random_transform(rng)
+    puzzle = apply_transform(PUZZLE, transform)
+    solution = apply_transform(SOLUTION, transform)
+    assert valid_sudoku(puzzle, solution)
+
+    original, member = canonical_sudoku({'grid': PUZZLE}), canonical_sudoku({'grid': puzzle})
+    assert member.key == original.key
+    assert member.reduce(solution) == original.reduce(SOLUTION)
+    # A solution cached for one member solves every other
+    assert member.restore(original.reduce(SOLUTION)) == solution
+    assert original.restore(member.reduce(solution)) == SOLUTION
+
+
+def test_sudoku_with_unused_digits():
+    # Two givens: seven digits get labels from the unused pool
+    solution = apply_transform(SOLUTION, (0, [0, 1, 2], [0, 1, 2],
+                                          [0, 7, 2, 1, 3, 4, 5, 6, 8, 9]))
+    grid = [[solution[r][c] if (r, c) in ((0, 0), (4, 4)) else 0 for c in range(9)] for r in range(9)]
+    canonical = canonical_sudoku({'grid': grid})
+    assert canonical.restore(canonical.reduce(solution)) == solution
+
+
+def test_different_sudokus_have_different_keys():
+    other = [row[:] for row in PUZZLE]
+    other[0][2] = 4
+    assert canonical_sudoku({'grid': other}).key != canonical_sudoku({'grid': PUZZLE}).key
+
+
+@pytest.mark.parametrize("grid", [[[0] * 9] * 8, [[10] + [0] * 8] + [[0] * 9] * 8])
+def test_sudoku_rejects_malformed_grids(grid):
+    with pytest.raises(ValueError):
+        canonical_sudoku({'grid': grid})
+
+
+def queens_solutions(n: int, preset: List[Tuple[int, int]]) -> List[List[Tuple[int, int]]]:
+    fixed = dict(preset)
+    solutions = []
+
+    def place(row: int, queens: List[Tuple[int, int]]):
+        if row == n:
+            solutions.append(sorted(queens))
+            return
+        for col in ([fixed[row]] if row in fixed else range(n)):
+            if all(c != col and abs(c - col) != row - r for r, c in queens):
+                place(row + 1, queens + [(row, col)])
+
+    place(0, [])
+    return solutions
+
+
+@pytest.mark.parametrize("k", range(8))
+def test_nqueens_class_members_share_key_and_solutions(k):
+    n, preset = 8, [(0, 2), (3, 1)]
+    moved = [dihedral(k, n, r, c) for r, c in preset]
+    original = canonical_nqueens({'n': n, 'preset_queens': preset})
+    member = canonical_nqueens({'n': n, 'preset_queens': moved})
+    assert member.key == original.key
+
+    solutions = queens_solutions(n, preset)
+    assert solutions
+    expected = sorted(sorted(dihedral(k, n, r, c) for r, c in queens) for queens in solutions)
+    assert sorted(member.restore(original.reduce(queens)) for queens in solutions) == expected
+    # Lists of solutions map element-wise
+    assert original.restore(original.reduce(solutions)) == solutions
+
+
+def knight_tour(n: int, start: Tuple[int, int]) -> Optional[List[Tuple[int, int]]]:
+    moves = [(1, 2), (2, 1), (2, -1), (1, -2), (-1, -2), (-2, -1), (-2, 1), (-1, 2)]
+    tour = [start]
+    visited = {start}
+
+    def onward(square):
+        return [(square[0] + dr, square[1] + dc) for dr, dc in moves
+                if 0 <= square[0] + dr < n and 0 <= square[1] + dc < n
+                and (square[0] + dr, square[1] + dc) not in visited]
+
+    def extend() -> bool:
+        if len(tour) == n * n:
+            return True
+        for square in sorted(onward(tour[-1]), key=lambda s: len(onward(s))):
+            visited.add(square)
+            tour.append(square)
+            if extend():
+                return True
+            visited.discard(tour.pop())
+        return False
+
+    return tour if extend() else None
+
+
+@pytest.mark.parametrize("k", range(8))
+def test_knight_class_members_share_key_and_tours(k):
+    # Open 5x5 tours only start on squares of the corners' colour
+    n, start = 5, (0, 2)
+    tour = knight_tour(n, start)
+    assert tour is not None
+    moved_start = dihedral(k, n, *start)
+    original = canonical_knight({'n': n, 'start': list(start)})
+    member = canonical_knight({'n': n, 'start': list(moved_start)})
+    assert member.key == original.key
+
+    # Any symmetry fixing the start may separate the two, so check it is a tour
+    restored = member.restore(original.reduce(tour))
+    assert restored[0] == moved_start
+    assert len(set(restored)) == n * n
+    assert all(sorted((abs(a[0] - b[0]), abs(a[1] - b[1]))) == [1, 2]
+               for a, b in zip(restored, restored[1:]))
+    # Constructive tours come as flat squares
+    flat = [r * n + c for r, c in tour]
+    assert original.restore(original.reduce(flat)) == flat
+
+
+def test_knight_open_and_closed_tours_differ():
+    open_tour = canonical_knight({'n': 6, 'start': [0, 0]})
+    closed_tour = canonical_knight({'n': 6, 'start': [0, 0], 'closed_tour': True})
+    assert open_tour.key != closed_tour.key
+
+
+def test_mazes_only_match_exactly():
+    maze = {'grid': [[0, 1], [0, 0]], 'start': [0, 0], 'end': [1, 1]}
+    mirrored = {'grid': [[0, 0], [1, 0]], 'start': [0, 0], 'end': [1, 1]}
+    assert canonical_maze(maze).key == canonical_maze(dict(maze)).key
+    assert canonical_maze(mirrored).key != canonical_maze(maze).key
+    path = [[0, 0], [1, 0], [1, 1]]
+    assert canonical_maze(maze).restore(canonical_maze(maze).reduce(path)) == path
+
+
+def test_every_puzzle_type_has_a_canonicalizer():
+    assert set(CANONICALIZERS) == {"sudoku", "nqueens", "maze", "knight"}
@@ -0,0 +1,146 @@
+from typing import Any, Dict, List
+from app.graph.structures import ConstraintGraph
+from app.solvers.csp import CSPSearch
+import itertools
+import random
+
+import pytest
+
+
+def not_equal(a, b) -> Dict[str, Any]:
+    return {'variables': [a, b], 'predicate': lambda x: x[a] != x[b]}
+
+
+def random_csp(rng: random.Random, num_vars: int, domain_size: int, density: float) -> ConstraintGraph:
+    """Binary constraints, each forbidding a random set of value pairs"""
+    variables = list(range(num_vars))
+    domains = {var: list(range(domain_size)) for var in variables}
+    constraints = []
+    for a, b in itertools.combinations(variables, 2):
+        if rng.random() < density:
+            forbidden = {(x, y) for x in range(domain_size) for y in range(domain_size)
+                         if rng.random() < 0.3}
+            constraints.append({'variables': [a, b],
+                                'predicate': lambda s, a=a, b=b, f=forbidden: (s[a], s[b]) not in f})
+    return ConstraintGraph(variables, domains, constraints)
+
+
+def brute_force(variables: List, domains: Dict[Any, List], constraints: List[Dict]) -> List[Dict]:
+    solutions = []
+    for values in itertools.product(*(domains[var] for var in variables)):
+        assignment = dict(zip(variables, values))
+        if all(c['predicate'](assignment) for c in constraints):
+            solutions.append(assignment)
+    return solutions
+
+
+def key(solution: Dict) -> tuple:
+    return tuple(sorted(solution.items()))
+
+
+@pytest.mark.parametrize("seed", range(30))
+@pytest.mark.parametrize("lcv", [True, False])
+def test_random_csp_finds_every_solution(seed, lcv):
+    rng = random.Random(seed)
+    csp = random_csp(rng, rng.randint(3, 7), rng.randint(2, 4), 0.6)
+    expected = brute_force(csp.variables, csp.domains, csp.constraints)
+
+    solutions = CSPSearch(csp, lcv=lcv).run(max_solutions=10 ** 6)
+    assert sorted(map(key, solutions)) == sorted(map(key, expected))
+
+
+@pytest.mark.parametrize("seed", range(30))
+def test_random_csp_first_solution(seed):
+    rng = random.Random(500 + seed)
+    csp = random_csp(rng, rng.randint(4, 8), 3, 0.7)
+    expected = brute_force(csp.variables, csp.domains, csp.constraints)
+
+    solutions = CSPSearch(csp).run()
+    if expected:
+        assert len(solutions) == 1
+        assert key(solutions[0]) in set(map(key, expected))
+    else:
+        assert solutions == []
+
+
+def test_search_restores_domains():
+    rng = random.Random(11)
+    csp = random_csp(rng, 6, 3, 0.6)
+    CSPSearch(csp).run(max_solutions=10 ** 6)
+    # Everything pruned during the search is back on undo; only AC-3's root prunes remain
+    root = ConstraintGraph(csp.variables, {var: [0, 1, 2] for var in csp.variables}, csp.constraints)
+    root.ac3()
+    assert csp.domains == root.domains
+
+
+def test_graph_colouring():
+    # Petersen graph: 3-colourable, not 2-colourable
+    outer = [(i, (i + 1) % 5) for i in range(5)]
+    spokes = [(i, i + 5) for i in range(5)]
+    inner = [(5 + i, 5 + (i + 2) % 5) for i in range(5)]
+    edges = outer + spokes + inner
+    variables = list(range(10))
+
+    two = ConstraintGraph(variables, {v: [0, 1] for v in variables}, [not_equal(a, b) for a, b in edges])
+    assert CSPSearch(two).run() == []
+
+    three = ConstraintGraph(variables, {v: [0, 1, 2] for v in variables},
+                            [not_equal(a, b) for a, b in edges])
+    solution = CSPSearch(three).run()[0]
+    assert all(solution[a] != solution[b] for a, b in edges)
+
+
+@pytest.mark.parametrize("n, expected", [(4, 2), (6, 4), (8, 92)])
+def test_nqueens_solution_count(n, expected):
+    variables = list(range(n))
+    constraints = [{'variables': [a, b],
+                    'predicate': lambda s, a=a, b=b: s[a] != s[b] and abs(s[a] - s[b]) != b - a}
+                   for a, b in itertools.combinations(variables, 2)]
+    csp = ConstraintGraph(variables, {v: list(range(n)) for v in variables}, constraints)
+    assert len(CSPSearch(csp).run(max_solutions=1000)) == expected
+
+
+def test_unary_and_ternary_constraints():
+    variables = ['a', 'b', 'c']
+    domains = {var: [1, 2, 3, 4] for var in variables}
+    constraints = [
+        {'variables': ['a'], 'predicate': lambda s: s['a'] % 2 == 0},
+        {'variables': ['a', 'b', 'c'], 'predicate': lambda s: s['a'] + s['b'] + s['c'] == 7},
+        not_equal('b', 'c'),
+    ]
+    expected = brute_force(variables, domains, constraints)
+    csp = ConstraintGraph(variables, domains, constraints)
+    solutions = CSPSearch(csp).run(max_solutions=100)
+    assert sorted(map(key, solutions)) == sorted(map(key, expected))
+
+
+@pytest.mark.parametrize("first", [1, 4])
+def test_backjump_blames_the_whole_scope_of_a_wipeout(first):
+    # With A = 1 no pair of the others sums to 6; the jump must reach A, not end the search
+    variables = ['A', 'Z1', 'Z2']
+    domains = {'A': [first, 5 - first], 'Z1': [0, 1, 2], 'Z2': [0, 1, 2]}
+    constraints = [{'variables': variables, 'predicate': lambda s: s['A'] + s['Z1'] + s['Z2'] == 7}]
+    csp = ConstraintGraph(variables, domains, constraints)
+    solutions = CSPSearch(csp, lcv=False).run(max_solutions=10)
+    assert sorted(map(key, solutions)) == sorted(map(key, brute_force(variables, domains, constraints)))
+
+
+@pytest.mark.parametrize("seed", range(30))
+def test_random_ternary_csp_finds_every_solution(seed):
+    rng = random.Random(2000 + seed)
+    variables = list(range(rng.randint(3, 6)))
+    domains = {var: list(range(rng.randint(2, 4))) for var in variables}
+    constraints = []
+    for scope in itertools.combinations(variables, 3):
+        if rng.random() < 0.5:
+            allowed = set(rng.sample(range(10), 4))
+            constraints.append({'variables': list(scope),
+                                'predicate': lambda s, scope=scope, allowed=allowed:
+                                    sum(s[v] for v in scope) in allowed})
+    for a, b in itertools.combinations(variables, 2):
+        if rng.random() < 0.3:
+            constraints.append(not_equal(a, b))
+    expected = brute_force(variables, domains, constraints)
+
+    solutions = CSPSearch(ConstraintGraph(variables, domains, constraints)).run(max_solutions=10 ** 6)
+    assert sorted(map(key, solutions)) == sorted(map(key, expected))
@@ -0,0 +1,76 @@
+from app.api import endpoints
+from app.api.cache import ResultCache
+from app.api.endpoints import run_solve
+from app.models.schemas import PuzzleRequest
+import asyncio
+
+import pytest
+
+
+class InlineExecutor:
+    """Runs solves in the test process and counts them"""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def run(self, fn, *args, deadline: float, on_progress=None, on_event=None):
+        self.calls += 1
+        return fn(*args), 0.0
+
+
+@pytest.fixture
+def executor(monkeypatch):
+    executor = InlineExecutor()
+    monkeypatch.setattr(endpoints, "get_executor", lambda: executor)
+    monkeypatch.setattr(endpoints, "get_result_cache", lambda cache=ResultCache(): cache)
+    return executor
+
+
+def solve(puzzle_type: str, data, **options):
+    request = PuzzleRequest.model_validate({"puzzle_type": puzzle_type, "input": data,
+                                            "options": options})
+    return asyncio.run(run_solve(puzzle_type, request))
+
+
+def test_default_options_are_served_from_the_cache(executor):
+    # As the frontend sends it: steps included
+    first = solve("nqueens", {"n": 6}, return_steps=True)
+    second = solve("nqueens", {"n": 6}, return_steps=True)
+    assert executor.calls == 1
+    assert second.statistics.cache_hit
+    assert second.solution == first.solution
+    assert [s.model_dump() for s in second.steps] == [s.model_dump() for s in first.steps]
+    assert second.steps
+
+
+def test_steps_are_matched_to_the_exact_input_and_trace_policy(executor):
+    solve("nqueens", {"n": 6})
+    solve("nqueens", {"n": 6}, trace={"max_steps": 10})
+    assert executor.calls == 2
+    # Without steps, a symmetric input shares the canonical entry
+    solve("knight", {"n": 5, "start": [0, 0]}, return_steps=False, algorithm="warnsdorff")
+    moved = solve("knight", {"n": 5, "start": [4, 4]}, return_steps=False, algorithm="warnsdorff")
+    assert executor.calls == 3
+    assert moved.statistics.cache_hit and tuple(moved.solution[0]) == (4, 4)
+
+
+@pytest.mark.parametrize("puzzle_type, data", [
+    ("nqueens", {"n": 8}),
+    ("maze", {"grid": [[0, 0], [0, 0]], "start": [0, 0], "end": [1, 1]}),
+])
+def test_detailed_statistics_only_on_request(executor, puzzle_type, data):
+    plain = solve(puzzle_type, data)
+    assert plain.statistics.details is None
+
+    detailed = solve(puzzle_type, data, detailed_stats=True)
+    details = detailed.statistics.details
+    assert not detailed.statistics.cache_hit
+    assert details.peak_memory_bytes > 0 and details.trace_bytes > 0
+    assert details.max_depth > 0 or details.peak_frontier > 0
+    assert set(details.model_dump()) == {"candidate_evaluations", "propagations", "max_depth",
+                                         "peak_frontier", "peak_memory_bytes", "trace_bytes"}
+
+
+def test_spans_name_what_they_time(executor):
+    response = solve("nqueens", {"n": 6})
+    assert {timing.name for timing in response.statistics.spans} >= {"search", "build_response"}
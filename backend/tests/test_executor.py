@@ -0,0 +1,184 @@
+from fastapi.testclient import TestClient
+from app.main import app
+from app.api import endpoints, executor as executor_module
+from app.api.executor import (
+    ExecutorSaturated, ExecutorUnavailable, SolveExecutor, SolveTimeout, report_progress
+)
+import asyncio
+import os
+import time
+
+import pytest
+
+# Solves run in spawned workers, so these are module level to be picklable
+
+
+def pid() -> int:
+    return os.getpid()
+
+
+def nap(seconds: float) -> int:
+    report_progress(lambda: {"nodes_explored": 7})
+    time.sleep(seconds)
+    return os.getpid()
+
+
+def fail():
+    raise ValueError("bad input")
+
+
+def crash(*args):
+    os._exit(1)
+
+
+@pytest.fixture(autouse=True)
+def no_grace(monkeypatch):
+    monkeypatch.setattr(executor_module, "DEADLINE_GRACE", 0.0)
+
+
+def run_with(scenario, workers: int = 1, queue_depth: int = 0):
+    async def main():
+        pool = SolveExecutor(workers=workers, queue_depth=queue_depth, memory_limit_mb=0)
+        await pool.start()
+        try:
+            await scenario(pool)
+        finally:
+            pool.shutdown()
+    asyncio.run(main())
+
+
+def test_results_and_errors_come_back_and_the_worker_is_reused():
+    async def scenario(pool):
+        first, queue_wait_ms = await pool.run(pid)
+        assert queue_wait_ms >= 0
+        with pytest.raises(ValueError, match="bad input"):
+            await pool.run(fail)
+        assert (await pool.run(pid))[0] == first
+        assert pool.in_flight == 0 and pool.restarts == 0
+
+    run_with(scenario)
+
+
+def test_overrunning_worker_is_killed_with_its_last_progress():
+    async def scenario(pool):
+        first, _ = await pool.run(pid)
+        started = time.monotonic()
+        with pytest.raises(SolveTimeout) as e:
+            await pool.run(nap, 30, deadline=1.2)
+        assert time.monotonic() - started < 10
+        assert e.value.progress == {"nodes_explored": 7}
+        assert pool.restarts == 1 and pool.in_flight == 0
+        replacement, _ = await pool.run(pid)
+        assert replacement != first
+
+    run_with(scenario)
+
+
+def test_worker_dying_mid_solve_is_replaced():
+    async def scenario(pool):
+        with pytest.raises(ExecutorUnavailable):
+            await pool.run(crash)
+        assert pool.restarts == 1 and pool.in_flight == 0
+        assert (await pool.run(pid))[0] > 0
+
+    run_with(scenario)
+
+
+def test_cancelled_running_solve_replaces_its_worker():
+    async def scenario(pool):
+        first, _ = await pool.run(pid)
+        running = asyncio.ensure_future(pool.run(nap, 30))
+        await asyncio.sleep(0.5)
+        running.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await running
+        assert pool.restarts == 1 and pool.in_flight == 0
+        assert (await pool.run(pid))[0] != first
+
+    run_with(scenario)
+
+
+def test_cancelled_waiting_solve_leaves_the_worker_to_the_next():
+    async def scenario(pool):
+        running = asyncio.ensure_future(pool.run(nap, 1))
+        await asyncio.sleep(0.1)
+        waiting = asyncio.ensure_future(pool.run(pid))
+        await asyncio.sleep(0.1)
+        assert pool.in_flight == 2 and len(pool.waiters) == 1
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        assert pool.in_flight == 1
+        worker_pid, _ = await running
+        assert pool.restarts == 0 and len(pool.idle) == 1
+        assert (await pool.run(pid))[0] == worker_pid
+
+    run_with(scenario, queue_depth=1)
+
+
+def test_queue_depth_bounds_admission():
+    async def scenario(pool):
+        solves = [asyncio.ensure_future(pool.run(nap, 0.5)) for _ in range(2)]
+        await asyncio.sleep(0.1)
+        assert pool.saturated
+        with pytest.raises(ExecutorSaturated):
+            await pool.run(pid)
+        assert pool.in_flight == 2
+        await asyncio.gather(*solves)
+        assert not pool.saturated and pool.in_flight == 0
+
+    run_with(scenario, queue_depth=1)
+
+
+def test_released_worker_goes_to_the_oldest_waiter():
+    async def scenario(pool):
+        first = asyncio.ensure_future(pool.run(nap, 0.5))
+        await asyncio.sleep(0.1)
+        second = asyncio.ensure_future(pool.run(pid))
+        third = asyncio.ensure_future(pool.run(pid))
+        results = await asyncio.gather(first, second, third)
+        pids = {result[0] for result in results}
+        assert len(pids) == 1 and pool.spawned == 1
+        # The waiters queued behind the first solve
+        assert results[1][1] > 100 and results[2][1] >= results[1][1]
+        assert pool.in_flight == 0 and not pool.waiters
+
+    run_with(scenario, queue_depth=2)
+
+
+def test_in_flight_is_released_after_errors():
+    async def scenario(pool):
+        for fn in (fail, crash, fail):
+            with pytest.raises((ValueError, ExecutorUnavailable)):
+                await pool.run(fn)
+            assert pool.in_flight == 0
+        pool.shutdown()
+        with pytest.raises(ExecutorUnavailable):
+            await pool.run(pid)
+        assert pool.in_flight == 0
+
+    run_with(scenario)
+
+
+REQUEST = {"puzzle_type": "nqueens", "input": {"n": 5}, "options": {"return_steps": False}}
+
+
+def test_saturated_pool_answers_429(monkeypatch):
+    pool = SolveExecutor(workers=1, queue_depth=0)
+    pool.in_flight = 1
+    monkeypatch.setattr(endpoints, "get_executor", lambda: pool)
+    response = TestClient(app).post("/api/nqueens/solve", json=REQUEST)
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "1"
+
+
+def test_dead_worker_answers_503(monkeypatch):
+    pool = SolveExecutor(workers=1, queue_depth=0, memory_limit_mb=0)
+    monkeypatch.setattr(endpoints, "get_executor", lambda: pool)
+    monkeypatch.setattr(endpoints, "solve_request", crash)
+    try:
+        response = TestClient(app).post("/api/nqueens/solve", json=REQUEST)
+    finally:
+        pool.shutdown()
+    assert response.status_code == 503
+    assert pool.restarts == 1
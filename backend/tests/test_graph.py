@@ -0,0 +1,199 @@
+from app.graph import traversal
+from app.graph.structures import ConstraintGraph, CSRGraph, Graph
+from app.graph.traversal import Traversal
+import random
+
+import pytest
+
+
+def grid_graph(size: int) -> Graph:
+    graph = Graph()
+    for r in range(size):
+        for c in range(size):
+            if c + 1 < size:
+                graph.add_edge((r, c), (r, c + 1))
+            if r + 1 < size:
+                graph.add_edge((r, c), (r + 1, c))
+    return graph
+
+
+def test_bfs_to_target_is_a_shortest_path():
+    path = grid_graph(4).bfs((0, 0), (3, 3))
+    assert path[0] == (0, 0) and path[-1] == (3, 3)
+    assert len(path) == 7
+
+
+def test_dfs_to_target_follows_edges():
+    graph = grid_graph(4)
+    path = graph.dfs((0, 0), (3, 3))
+    assert path[0] == (0, 0) and path[-1] == (3, 3)
+    assert all(any(n == b for n, _ in graph.get_neighbors(a)) for a, b in zip(path, path[1:]))
+
+
+def test_unreachable_target():
+    graph = grid_graph(2)
+    graph.add_vertex("island")
+    assert graph.bfs((0, 0), "island") is None
+    assert graph.dfs((0, 0), "island") is None
+
+
+def test_without_target_the_traversal_reaches_everything_lazily():
+    graph = grid_graph(30)
+    for search in (graph.bfs((0, 0)), graph.dfs((0, 0))):
+        assert isinstance(search, Traversal)
+        assert all(search.reached(v) for v in graph.vertices)
+        # Paths are only rebuilt on request
+        path = search.path_to((29, 29))
+        assert path[0] == (0, 0) and path[-1] == (29, 29)
+    assert graph.bfs((0, 0)).dist[(29, 29)] == 58
+
+
+def random_weighted_graph(seed: int, size: int = 30, directed: bool = False) -> Graph:
+    rng = random.Random(seed)
+    graph = Graph(directed=directed)
+    for v in range(size):
+        graph.add_vertex(v)
+    for _ in range(size * 3):
+        graph.add_edge(rng.randrange(size), rng.randrange(size), rng.randint(1, 5))
+    return graph
+
+
+def unit_expansion(graph: Graph) -> Graph:
+    """Each edge of integer weight w as a chain of w unit edges, so BFS distances are costs"""
+    expanded = Graph(directed=True)
+    for v in graph.vertices:
+        expanded.add_vertex(v)
+    for u in graph.vertices:
+        for i, (v, weight) in enumerate(graph.get_neighbors(u)):
+            chain = [u] + [(u, i, step) for step in range(int(weight) - 1)] + [v]
+            for a, b in zip(chain, chain[1:]):
+                expanded.add_edge(a, b)
+    return expanded
+
+
+def path_cost(graph, path) -> float:
+    return sum(min(w for n, w in graph.get_neighbors(a) if n == b) for a, b in zip(path, path[1:]))
+
+
+@pytest.mark.parametrize("seed", range(4))
+@pytest.mark.parametrize("directed", [False, True])
+def test_dijkstra_and_bidirectional_match_bfs_costs(seed, directed):
+    graph = random_weighted_graph(seed, directed=directed)
+    costs = unit_expansion(graph).bfs(0).dist
+    shortest = traversal.dijkstra(graph, 0).run()
+    for goal in graph.vertices:
+        if goal not in costs:
+            assert not shortest.reached(goal)
+            assert graph.dijkstra(0, goal) is None
+            assert graph.bidirectional_search(0, goal) is None
+            continue
+        assert shortest.dist[goal] == costs[goal]
+        for path in (graph.dijkstra(0, goal), graph.bidirectional_search(0, goal)):
+            assert path[0] == 0 and path[-1] == goal
+            assert path_cost(graph, path) == costs[goal]
+        assert traversal.bidirectional(graph, 0, goal).run().length == costs[goal]
+
+
+def test_unweighted_dijkstra_and_bidirectional_paths_are_as_short_as_bfs():
+    graph = grid_graph(8)
+    graph.add_vertex("island")
+    for goal in [(7, 7), (3, 5), (0, 0)]:
+        hops = len(graph.bfs((0, 0), goal))
+        assert len(graph.dijkstra((0, 0), goal)) == hops
+        assert len(graph.bidirectional_search((0, 0), goal)) == hops
+    assert graph.bidirectional_search((0, 0), "island") is None
+
+
+def test_csr_traversals_without_target_are_lazy_too():
+    graph = grid_graph(20)
+    csr, labels = graph.to_csr()
+    index = {v: i for i, v in enumerate(labels)}
+    start = index[(0, 0)]
+    for method in ("bfs", "dfs"):
+        search = getattr(csr, method)(start)
+        assert isinstance(search, Traversal)
+        assert all(search.reached(i) for i in range(csr.num_vertices))
+        path = [labels[i] for i in search.path_to(index[(19, 19)])]
+        assert path[0] == (0, 0) and path[-1] == (19, 19)
+        assert search.dist[index[(19, 19)]] == len(path) - 1
+    expected = graph.bfs((0, 0)).dist
+    assert {labels[i]: d for i, d in csr.bfs(start).dist.items()} == expected
+
+
+EDGES = [(0, 1), (0, 2, 2.5), (1, 2), (2, 3), (3, 0, 4.0), (4, 4)]
+
+
+@pytest.mark.parametrize("directed", [False, True])
+def test_csr_from_edges_matches_graph(directed):
+    graph = Graph(directed=directed)
+    for v in range(6):
+        graph.add_vertex(v)
+    for u, v, *weight in EDGES:
+        graph.add_edge(u, v, *weight)
+    csr = CSRGraph.from_edges(6, EDGES, directed=directed)
+
+    assert csr.num_vertices == 6
+    assert csr.num_edges == len(EDGES)
+    for v in range(6):
+        assert sorted(csr.get_neighbors(v)) == sorted(graph.get_neighbors(v))
+        assert sorted(csr.neighbors(v)) == sorted(n for n, _ in graph.get_neighbors(v))
+        assert csr.degree(v) == len(graph.get_neighbors(v))
+    assert csr.degree(5) == 0
+
+
+def test_csr_without_weights_reports_unit_weights():
+    csr = CSRGraph.from_edges(3, [(0, 1), (1, 2)])
+    assert csr.weights is None
+    assert sorted(csr.get_neighbors(1)) == [(0, 1.0), (2, 1.0)]
+
+
+def test_csr_rejects_edges_outside_the_vertex_range():
+    with pytest.raises(ValueError):
+        CSRGraph.from_edges(3, [(0, 3)])
+
+
+def test_csr_from_graph_searches_like_the_graph():
+    graph = grid_graph(6)
+    graph.add_vertex("island")
+    csr, labels = graph.to_csr()
+    index = {v: i for i, v in enumerate(labels)}
+    for v in graph.vertices:
+        assert (sorted(labels[n] for n in csr.neighbors(index[v])) ==
+                sorted(n for n, _ in graph.get_neighbors(v)))
+
+    start, goal = index[(0, 0)], index[(5, 3)]
+    assert len(csr.bfs(start, goal)) == len(graph.bfs((0, 0), (5, 3)))
+    path = [labels[i] for i in csr.dfs(start, goal)]
+    assert path[0] == (0, 0) and path[-1] == (5, 3)
+    assert all(any(n == b for n, _ in graph.get_neighbors(a)) for a, b in zip(path, path[1:]))
+    assert csr.bfs(start, index["island"]) is None
+    assert csr.dfs(start, index["island"]) is None
+    assert ({labels[i] for i in csr.dfs(start).pred} == set(graph.dfs((0, 0)).pred) ==
+            graph.vertices - {"island"})
+
+
+def test_csr_from_grid_links_open_cells():
+    grid = [[0, 0, 1],
+            [1, 0, 0],
+            [0, 0, 0]]
+    csr = CSRGraph.from_grid(grid)
+    assert list(csr.neighbors(0)) == [1]
+    assert list(csr.neighbors(4)) == [5, 7, 1]
+    assert csr.degree(2) == 0
+    assert len(csr.bfs(0, 8)) == 5
+    assert list(CSRGraph.from_grid(grid, diagonal=True).neighbors(4)) == [5, 7, 1, 8, 6, 0]
+
+
+def test_ac3_requeues_other_constraints_on_the_same_pair():
+    # Revising Y through "Y < 2" drops Y = 2, which X = 2 relied on through "X == Y"
+    equal = {'variables': ['X', 'Y'], 'predicate': lambda s: s['X'] == s['Y']}
+    below = {'variables': ['X', 'Y'], 'predicate': lambda s: s['Y'] < 2}
+    csp = ConstraintGraph(['X', 'Y'], {'X': [0, 1, 2], 'Y': [0, 1, 2]}, [equal, below])
+    assert csp.ac3()
+    assert csp.domains == {'X': [0, 1], 'Y': [0, 1]}
+
+
+def test_ac3_detects_a_wipeout():
+    csp = ConstraintGraph(['X', 'Y'], {'X': [0, 1], 'Y': [0, 1]},
+                          [{'variables': ['X', 'Y'], 'predicate': lambda s: s['X'] + s['Y'] == 3}])
+    assert not csp.ac3()
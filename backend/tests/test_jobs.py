@@ -0,0 +1,289 @@
+from typing import Any, Dict
+from fastapi.testclient import TestClient
+from app.main import app
+from app.api import admin, jobs
+from app.api.executor import ExecutorSaturated
+from app.api.jobs import JobRunner
+from app.storage.jobs import (
+    CANCELLED, DONE, FAILED, FINISHED, QUEUED, RUNNING, JobNotFound, JobStore
+)
+import asyncio
+import time
+
+import pytest
+
+REQUEST = {"puzzle_type": "nqueens", "input": {"n": 6}, "options": {"return_steps": False}}
+
+
+@pytest.fixture
+def store(tmp_path):
+    return JobStore(str(tmp_path / "jobs.sqlite3"))
+
+
+def submit(store: JobStore) -> str:
+    return store.submit(REQUEST["puzzle_type"], REQUEST)
+
+
+def test_submit_and_claim_oldest_first(store):
+    first, second = submit(store), submit(store)
+    assert store.count(QUEUED) == 2
+
+    claimed = store.claim()
+    assert claimed == {"id": first, "puzzle_type": "nqueens", "request": REQUEST}
+    assert store.get(first)["status"] == RUNNING
+    assert store.get(first)["started"] is not None
+    assert store.claim()["id"] == second
+    assert store.claim() is None
+
+
+def test_finish_records_the_outcome_once(store):
+    job_id = submit(store)
+    store.claim()
+    store.set_progress(job_id, {"nodes_explored": 10})
+    assert store.get(job_id)["progress"] == {"nodes_explored": 10}
+
+    assert store.finish(job_id, DONE, result={"success": True})
+    job = store.get(job_id, with_result=True)
+    assert job["status"] == DONE and job["result"] == {"success": True}
+    assert job["finished"] is not None
+
+    # A finished job is never overwritten, e.g. by a late result after a cancel
+    assert not store.finish(job_id, FAILED, error="late")
+    assert store.get(job_id)["status"] == DONE
+
+
+def test_cancelled_job_is_not_requeued_or_finished(store):
+    job_id = submit(store)
+    store.claim()
+    assert store.finish(job_id, CANCELLED)
+    store.requeue(job_id)
+    assert not store.finish(job_id, DONE, result={})
+    assert store.get(job_id)["status"] == CANCELLED
+    assert store.claim() is None
+
+
+def test_queued_job_can_be_cancelled(store):
+    job_id = submit(store)
+    assert store.finish(job_id, CANCELLED)
+    assert store.claim() is None
+
+
+def test_requeue_only_moves_running_jobs(store):
+    job_id = submit(store)
+    store.claim()
+    store.requeue(job_id)
+    job = store.get(job_id)
+    assert job["status"] == QUEUED and job["started"] is None
+
+    other = submit(store)
+    store.claim()
+    store.claim()
+    assert store.requeue_running() == 2
+    assert store.count(QUEUED) == 2
+    assert store.get(other)["status"] == QUEUED
+
+
+def test_expired_jobs_are_dropped(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"), ttl=0)
+    old = submit(store)
+    store.finish(old, FAILED, error="boom")
+    time.sleep(0.01)
+    submit(store)
+    with pytest.raises(JobNotFound):
+        store.get(old)
+
+
+def test_recent_lists_newest_first(store):
+    ids = [submit(store) for _ in range(3)]
+    assert [job["job_id"] for job in store.recent(2)] == ids[:0:-1]
+
+
+def test_listing_jobs_is_admin_only(store, monkeypatch):
+    monkeypatch.setattr(admin, "ADMIN_TOKEN", "secret")
+    monkeypatch.setattr(jobs, "get_job_store", lambda: store)
+    job_id = submit(store)
+    client = TestClient(app)
+    assert client.get("/api/jobs").status_code == 403
+    assert client.get("/api/jobs", headers={"X-Admin-Token": "wrong"}).status_code == 403
+    response = client.get("/api/jobs", headers={"X-Admin-Token": "secret"})
+    assert [job["job_id"] for job in response.json()] == [job_id]
+
+
+class FakeExecutor:
+    """Runs solves inline on the event loop, or as the test directs"""
+
+    def __init__(self):
+        self.saturated = False
+        self.behaviour = None
+        self.release = asyncio.Event()
+
+    async def run(self, fn, *args, deadline: float, on_progress=None):
+        if self.behaviour == "block":
+            await self.release.wait()
+        elif self.behaviour is not None:
+            raise self.behaviour
+        return fn(*args), 0.0
+
+
+@pytest.fixture
+def runner_env(store, monkeypatch):
+    executor = FakeExecutor()
+    monkeypatch.setattr(jobs, "get_job_store", lambda: store)
+    monkeypatch.setattr(jobs, "get_executor", lambda: executor)
+    monkeypatch.setattr(jobs, "JOB_POLL_INTERVAL", 0.01)
+    return store, executor
+
+
+async def wait_for(store: JobStore, job_id: str, *statuses: str) -> Dict[str, Any]:
+    for _ in range(500):
+        job = store.get(job_id, with_result=True)
+        if job["status"] in statuses:
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"job stayed {job['status']}")
+
+
+async def started(runner: JobRunner, job_id: str):
+    """Wait until the dispatcher has handed the job to a task"""
+    for _ in range(500):
+        if job_id in runner.running:
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("job never started")
+
+
+def test_runner_solves_queued_jobs(runner_env):
+    store, _ = runner_env
+
+    async def scenario():
+        job_id = submit(store)
+        runner = JobRunner(concurrency=1)
+        await runner.start()
+        try:
+            job = await wait_for(store, job_id, *FINISHED)
+        finally:
+            await runner.stop()
+        assert job["status"] == DONE
+        assert job["result"]["success"] is True
+        assert runner.running == {}
+
+    asyncio.run(scenario())
+
+
+def test_runner_records_failures(runner_env):
+    store, executor = runner_env
+    executor.behaviour = RuntimeError("worker exploded")
+
+    async def scenario():
+        job_id = submit(store)
+        runner = JobRunner(concurrency=1)
+        await runner.start()
+        try:
+            job = await wait_for(store, job_id, *FINISHED)
+        finally:
+            await runner.stop()
+        assert job["status"] == FAILED and job["error"] == "worker exploded"
+
+    asyncio.run(scenario())
+
+
+def test_runner_leaves_jobs_queued_while_the_pool_is_saturated(runner_env):
+    store, executor = runner_env
+
+    async def scenario():
+        job_id = submit(store)
+        runner = JobRunner(concurrency=1)
+        executor.saturated = True
+        await runner.start()
+        try:
+            await asyncio.sleep(0.05)
+            assert store.get(job_id)["status"] == QUEUED
+
+            # Saturated between the check and the run: back to the queue
+            executor.saturated = False
+            executor.behaviour = ExecutorSaturated("busy")
+            await asyncio.sleep(0.05)
+            assert store.get(job_id)["status"] in (QUEUED, RUNNING)
+
+            executor.behaviour = None
+            assert (await wait_for(store, job_id, *FINISHED))["status"] == DONE
+        finally:
+            await runner.stop()
+
+    asyncio.run(scenario())
+
+
+def test_runner_stops_cancelled_jobs(runner_env):
+    store, executor = runner_env
+    executor.behaviour = "block"
+
+    async def scenario():
+        job_id = submit(store)
+        runner = JobRunner(concurrency=1)
+        await runner.start()
+        try:
+            await started(runner, job_id)
+            assert store.get(job_id)["status"] == RUNNING
+            store.finish(job_id, CANCELLED)
+            runner.notify()
+            for _ in range(100):
+                if job_id not in runner.running:
+                    break
+                await asyncio.sleep(0.01)
+            assert job_id not in runner.running
+            assert store.get(job_id)["status"] == CANCELLED
+        finally:
+            await runner.stop()
+
+    asyncio.run(scenario())
+
+
+def test_shutdown_requeues_running_jobs_and_restart_resumes_them(runner_env):
+    store, executor = runner_env
+    executor.behaviour = "block"
+
+    async def scenario():
+        job_id = submit(store)
+        runner = JobRunner(concurrency=1)
+        await runner.start()
+        await started(runner, job_id)
+        await runner.stop()
+        assert store.get(job_id)["status"] == QUEUED
+
+        # A crash leaves it running; the next start puts it back
+        store.claim()
+        executor.behaviour = None
+        runner = JobRunner(concurrency=1)
+        await runner.start()
+        try:
+            assert (await wait_for(store, job_id, *FINISHED))["status"] == DONE
+        finally:
+            await runner.stop()
+
+    asyncio.run(scenario())
+
+
+def test_dispatcher_survives_store_errors(runner_env, monkeypatch):
+    store, _ = runner_env
+    claim = store.claim
+    failures = []
+
+    def flaky_claim():
+        if not failures:
+            failures.append(1)
+            raise RuntimeError("database is locked")
+        return claim()
+
+    monkeypatch.setattr(store, "claim", flaky_claim)
+
+    async def scenario():
+        job_id = submit(store)
+        runner = JobRunner(concurrency=1)
+        await runner.start()
+        try:
+            assert (await wait_for(store, job_id, *FINISHED))["status"] == DONE
+        finally:
+            await runner.stop()
+        assert failures == [1]
+
+    asyncio.run(scenario())
@@ -0,0 +1,52 @@
+from fastapi.testclient import TestClient
+from app.main import app
+from app.solvers.knight import (
+    MAX_BACKTRACK_SIZE, MAX_CONSTRUCTIVE_SIZE, MAX_WARNSDORFF_SIZE, KnightSolver
+)
+
+import pytest
+
+
+def is_tour(path, n: int) -> bool:
+    return (len(path) == n * n and len(set(map(tuple, path))) == n * n and
+            all(sorted((abs(a[0] - b[0]), abs(a[1] - b[1]))) == [1, 2]
+                for a, b in zip(path, path[1:])))
+
+
+@pytest.mark.parametrize("algorithm, limit", [
+    ("backtracking", MAX_BACKTRACK_SIZE), (None, MAX_BACKTRACK_SIZE),
+    ("warnsdorff", MAX_WARNSDORFF_SIZE), ("constructive", MAX_CONSTRUCTIVE_SIZE),
+])
+def test_max_board_size(algorithm, limit):
+    assert KnightSolver.max_board_size(algorithm) == limit
+
+
+@pytest.mark.parametrize("n", [8, 31])
+def test_warnsdorff_finds_open_tours(n):
+    path = KnightSolver().solve({"n": n, "start": (0, 0)},
+                                {"algorithm": "warnsdorff", "return_steps": False})
+    assert is_tour(path, n)
+
+
+def test_constructive_tour_step_uses_its_template():
+    solver = KnightSolver()
+    path = solver.solve({"n": 12, "start": (0, 0)}, {"algorithm": "constructive"})
+    assert len(path) == 144
+    step = solver.steps[-1]
+    assert step.action == "assembled"
+    assert step.description == "Closed tour assembled for 12x12 board"
+
+
+@pytest.mark.parametrize("algorithm, n", [
+    ("backtracking", MAX_BACKTRACK_SIZE + 1), ("warnsdorff", MAX_WARNSDORFF_SIZE + 1),
+    ("constructive", MAX_CONSTRUCTIVE_SIZE + 2),
+])
+def test_oversized_boards_are_rejected_before_solving(algorithm, n):
+    # No lifespan: a request that got as far as the solver pool would fail differently
+    client = TestClient(app)
+    request = {"puzzle_type": "knight", "input": {"n": n, "start": [0, 0]},
+               "options": {"algorithm": algorithm}}
+    for path in ("/api/knight/solve", "/api/knight/solve/stream", "/api/jobs"):
+        response = client.post(path, json=request)
+        assert response.status_code == 422
+        assert f"limit for {algorithm}" in response.json()["detail"]
@@ -0,0 +1,25 @@
+from app.solvers.maze import MazeSolver
+
+GRID = [[0, 0, 0],
+        [1, 1, 0],
+        [0, 0, 0]]
+
+
+def test_astar_explore_steps_carry_the_heuristic():
+    solver = MazeSolver()
+    path = solver.solve({"grid": GRID, "start": (0, 0), "end": (2, 0)}, {"algorithm": "astar"})
+    assert path[0] == (0, 0) and path[-1] == (2, 0)
+    explored = [step for step in solver.steps if step.action == "explore"]
+    assert explored[0].value == 2
+    assert explored[0].description == "Exploring position (0, 0)"
+    assert {step.action for step in solver.steps} <= set(MazeSolver.step_descriptions)
+
+
+def test_other_searches_keep_the_plain_template():
+    for algorithm in ("bfs", "dfs"):
+        solver = MazeSolver()
+        solver.solve({"grid": GRID, "start": (0, 0), "end": (2, 0)}, {"algorithm": algorithm})
+        first = solver.steps[0]
+        assert first.action == "explore"
+        assert first.description == "Exploring position (0, 0)"
+    assert MazeSolver.step_descriptions["explore"] == "Exploring position ({row}, {col})"
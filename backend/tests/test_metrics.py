@@ -0,0 +1,78 @@
+from typing import Dict
+from fastapi.testclient import TestClient
+from app.main import app
+from app.api import endpoints, metrics
+from app.api.cache import ResultCache
+from app.api.metrics import CONTENT_TYPE, Counter, Histogram
+from app.storage.jobs import JobStore
+
+import pytest
+
+
+class Inline:
+    async def run(self, fn, *args, deadline: float, **callbacks):
+        return fn(*args), 0.25
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(endpoints, "get_executor", Inline)
+    monkeypatch.setattr(endpoints, "get_result_cache", lambda cache=ResultCache(): cache)
+    monkeypatch.setattr(metrics, "get_job_store", lambda: JobStore(str(tmp_path / "jobs.sqlite3")))
+    return TestClient(app)
+
+
+def scrape(client: TestClient) -> Dict[str, float]:
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == CONTENT_TYPE
+    samples = {}
+    for line in response.text.splitlines():
+        if line and not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            samples[name] = float(value)
+    return samples
+
+
+def test_scrape_after_a_solve(client):
+    solved = 'graphsolve_solves_total{puzzle_type="nqueens",algorithm="csp",outcome="solved"}'
+    count = 'graphsolve_solve_duration_seconds_count{puzzle_type="nqueens",algorithm="csp"}'
+    infinite = 'graphsolve_nodes_explored_bucket{puzzle_type="nqueens",algorithm="csp",le="+Inf"}'
+    queue = 'graphsolve_queue_wait_seconds_bucket{puzzle_type="nqueens",le="0.25"}'
+    route = 'graphsolve_http_requests_total{method="POST",route="/api/nqueens/solve",status="200"}'
+    lookups = 'graphsolve_cache_lookups_total{puzzle_type="nqueens",result="hit"}'
+    before = scrape(client)
+
+    request = {"puzzle_type": "nqueens", "input": {"n": 7}, "options": {"algorithm": "csp"}}
+    for _ in range(2):
+        assert client.post("/api/nqueens/solve", json=request).status_code == 200
+    after = scrape(client)
+
+    # The second request was a cache hit, which is not a solve
+    assert after[solved] - before.get(solved, 0) == 1
+    assert after[count] - before.get(count, 0) == 1
+    assert after[infinite] - before.get(infinite, 0) == 1
+    assert after[queue] - before.get(queue, 0) == 1
+    assert after[route] - before.get(route, 0) == 2
+    assert after[lookups] - before.get(lookups, 0) == 1
+    assert 'graphsolve_pool_workers{state="workers"}' in after
+    assert after['graphsolve_jobs{status="queued"}'] == 0
+
+
+def test_exposition_format():
+    histogram = Histogram("h_seconds", "Help", (0.1, 1.0), ("kind",))
+    histogram.observe(0.05, "a")
+    histogram.observe(0.5, "a")
+    histogram.observe(5, "a")
+    assert histogram.render() == [
+        "# HELP h_seconds Help",
+        "# TYPE h_seconds histogram",
+        'h_seconds_bucket{kind="a",le="0.1"} 1',
+        'h_seconds_bucket{kind="a",le="1.0"} 2',
+        'h_seconds_bucket{kind="a",le="+Inf"} 3',
+        'h_seconds_sum{kind="a"} 5.55',
+        'h_seconds_count{kind="a"} 3',
+    ]
+    counter = Counter("c_total", "Help", ("path",))
+    counter.inc('say "hi"\n')
+    assert counter.render()[-1] == 'c_total{path="say \\"hi\\"\\n"} 1'
@@ -0,0 +1,219 @@
+from typing import List
+from app.solvers import sat
+from app.solvers.base import SolveBudget
+from app.solvers.sat import (
+    SATSolver, decode_nqueens, decode_sudoku, encode_nqueens, encode_sudoku, luby
+)
+from app.solvers.sudoku import SudokuSolver
+import itertools
+import random
+
+import pytest
+
+
+def random_cnf(rng: random.Random, num_vars: int, num_clauses: int, width: int = 3) -> List[List[int]]:
+    clauses = []
+    for _ in range(num_clauses):
+        variables = rng.sample(range(1, num_vars + 1), min(width, num_vars))
+        clauses.append([v if rng.random() < 0.5 else -v for v in variables])
+    return clauses
+
+
+def satisfies(model: List[bool], clauses: List[List[int]]) -> bool:
+    return all(any(model[abs(lit)] == (lit > 0) for lit in clause) for clause in clauses)
+
+
+def brute_force_models(num_vars: int, clauses: List[List[int]]) -> int:
+    count = 0
+    for bits in itertools.product((False, True), repeat=num_vars):
+        if satisfies([False] + list(bits), clauses):
+            count += 1
+    return count
+
+
+def count_models(num_vars: int, clauses: List[List[int]]) -> int:
+    """Enumerate with blocking clauses, checking each model on the way"""
+    solver = SATSolver(num_vars, clauses)
+    count = 0
+    while solver.solve():
+        assert satisfies(solver.model, clauses)
+        count += 1
+        solver.add_clause([-v if solver.model[v] else v for v in range(1, num_vars + 1)])
+    return count
+
+
+def test_luby_sequence():
+    assert [luby(i) for i in range(15)] == [1, 1, 2, 1, 1, 2, 4, 1, 1, 2, 1, 1, 2, 4, 8]
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_random_3cnf_matches_brute_force(seed):
+    rng = random.Random(seed)
+    num_vars = rng.randint(3, 10)
+    # Around the 4.26 clauses per variable threshold, so both outcomes occur
+    clauses = random_cnf(rng, num_vars, rng.randint(2 * num_vars, 6 * num_vars))
+    expected = brute_force_models(num_vars, clauses)
+
+    solver = SATSolver(num_vars, clauses)
+    result = solver.solve()
+    assert result is (expected > 0)
+    if result:
+        assert satisfies(solver.model, clauses)
+
+
+@pytest.mark.parametrize("seed", range(15))
+def test_model_enumeration_matches_brute_force(seed):
+    rng = random.Random(1000 + seed)
+    num_vars = rng.randint(4, 9)
+    clauses = random_cnf(rng, num_vars, rng.randint(num_vars, 4 * num_vars))
+    assert count_models(num_vars, clauses) == brute_force_models(num_vars, clauses)
+
+
+def test_restarts_and_clause_deletion(monkeypatch):
+    monkeypatch.setattr(sat, "RESTART_BASE", 1)
+    monkeypatch.setattr(sat, "REDUCE_BASE", 5)
+    rng = random.Random(7)
+    for _ in range(20):
+        clauses = random_cnf(rng, 12, 51)
+        solver = SATSolver(12, clauses)
+        result = solver.solve()
+        assert result is (brute_force_models(12, clauses) > 0)
+        if result:
+            assert satisfies(solver.model, clauses)
+
+
+def test_all_sign_patterns_are_unsatisfiable():
+    clauses = [[s1 * 1, s2 * 2, s3 * 3] for s1, s2, s3 in itertools.product((1, -1), repeat=3)]
+    assert SATSolver(3, clauses).solve() is False
+
+
+def test_empty_clause_is_unsatisfiable():
+    solver = SATSolver(2, [[1, 2]])
+    assert solver.add_clause([]) is False
+    assert solver.solve() is False
+
+
+def test_conflicting_units_are_unsatisfiable():
+    solver = SATSolver(1, [[1]])
+    assert solver.add_clause([-1]) is False
+    assert solver.solve() is False
+
+
+def test_tautologies_are_ignored():
+    solver = SATSolver(2, [[1, -1], [2, -2]])
+    assert solver.solve() is True
+
+
+@pytest.mark.parametrize("holes", [2, 3, 4])
+def test_pigeonhole_is_unsatisfiable(holes):
+    pigeons = holes + 1
+
+    def var(p: int, h: int) -> int:
+        return p * holes + h + 1
+
+    clauses = [[var(p, h) for h in range(holes)] for p in range(pigeons)]
+    for h in range(holes):
+        for p1 in range(pigeons):
+            for p2 in range(p1 + 1, pigeons):
+                clauses.append([-var(p1, h), -var(p2, h)])
+    solver = SATSolver(pigeons * holes, clauses)
+    assert solver.solve() is False
+    assert solver.statistics()["conflicts"] > 0
+
+
+def test_budget_stops_the_search():
+    rng = random.Random(3)
+    clauses = random_cnf(rng, 60, 256)
+    solver = SATSolver(60, clauses, budget=SolveBudget(max_nodes=1))
+    assert solver.solve() is None
+
+
+SUDOKU = [
+    [5, 3, 0, 0, 7, 0, 0, 0, 0],
+    [6, 0, 0, 1, 9, 5, 0, 0, 0],
+    [0, 9, 8, 0, 0, 0, 0, 6, 0],
+    [8, 0, 0, 0, 6, 0, 0, 0, 3],
+    [4, 0, 0, 8, 0, 3, 0, 0, 1],
+    [7, 0, 0, 0, 2, 0, 0, 0, 6],
+    [0, 6, 0, 0, 0, 0, 2, 8, 0],
+    [0, 0, 0, 4, 1, 9, 0, 0, 5],
+    [0, 0, 0, 0, 8, 0, 0, 7, 9],
+]
+
+
+def test_sudoku_encoding_solves_the_grid():
+    num_vars, clauses = encode_sudoku(SUDOKU)
+    solver = SATSolver(num_vars, clauses)
+    assert solver.solve() is True
+    board = decode_sudoku(solver.model)
+
+    for r in range(9):
+        for c in range(9):
+            if SUDOKU[r][c]:
+                assert board[r][c] == SUDOKU[r][c]
+    digits = set(range(1, 10))
+    for i in range(9):
+        assert set(board[i]) == digits
+        assert {board[r][i] for r in range(9)} == digits
+        br, bc = 3 * (i // 3), 3 * (i % 3)
+        assert {board[br + r][bc + c] for r in range(3) for c in range(3)} == digits
+
+
+def test_sudoku_encoding_detects_conflicting_givens():
+    grid = [row[:] for row in SUDOKU]
+    # A second 5 in the top-left box
+    grid[1][1] = 5
+    num_vars, clauses = encode_sudoku(grid)
+    assert SATSolver(num_vars, clauses).solve() is False
+
+
+def test_sudoku_sat_steps_use_their_template():
+    solver = SudokuSolver()
+    board = solver.solve({"grid": SUDOKU}, {"algorithm": "sat"})
+    steps = solver.steps
+    assert len(steps) == sum(row.count(0) for row in SUDOKU)
+    assert {step.action for step in steps} == {"sat_assign"}
+    step = steps[0]
+    row, col = step.position
+    assert step.value == board[row][col]
+    assert step.description == f"SAT model sets ({row}, {col}) to {step.value}"
+    # Rendered from the template, not stored per step
+    assert solver.trace.notes == {}
+
+
+def _valid_queens(queens, n: int) -> bool:
+    rows = {r for r, _ in queens}
+    cols = {c for _, c in queens}
+    diagonals = {r - c for r, c in queens}
+    anti = {r + c for r, c in queens}
+    return len(queens) == n and len(rows) == len(cols) == len(diagonals) == len(anti) == n
+
+
+@pytest.mark.parametrize("n, expected", [(4, 2), (5, 10), (6, 4), (8, 92)])
+def test_nqueens_encoding_counts_every_solution(n, expected):
+    num_vars, clauses = encode_nqueens(n)
+    solver = SATSolver(num_vars, clauses)
+    solutions = set()
+    while solver.solve():
+        queens = decode_nqueens(solver.model, n)
+        assert _valid_queens(queens, n)
+        solutions.add(tuple(sorted(queens)))
+        solver.add_clause([-(r * n + c + 1) for r, c in queens])
+    assert len(solutions) == expected
+
+
+def test_nqueens_encoding_honours_presets():
+    num_vars, clauses = encode_nqueens(8, [(0, 0)])
+    solver = SATSolver(num_vars, clauses)
+    assert solver.solve() is True
+    queens = decode_nqueens(solver.model, 8)
+    assert (0, 0) in queens and _valid_queens(queens, 8)
+
+    num_vars, clauses = encode_nqueens(8, [(0, 0), (1, 1)])
+    assert SATSolver(num_vars, clauses).solve() is False
+
+
+@pytest.mark.parametrize("n", [2, 3])
+def test_nqueens_encoding_unsatisfiable_sizes(n):
+    num_vars, clauses = encode_nqueens(n)
+    assert SATSolver(num_vars, clauses).solve() is False
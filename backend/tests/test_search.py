@@ -0,0 +1,155 @@
+from typing import Any, Dict, List
+from app.solvers.nqueens import NQueensSolver
+from app.solvers.search import EXHAUSTED, PAUSED, SOLVED, ExplicitStackSearch, SearchProblem
+import json
+
+import pytest
+
+
+class Permutations(SearchProblem):
+    """Every permutation of range(n), collected in order"""
+
+    def __init__(self, n: int):
+        self.n = n
+        self.prefix: List[int] = []
+        self.found: List[List[int]] = []
+
+    def key(self) -> str:
+        return f"permutations:{self.n}"
+
+    def is_goal(self) -> bool:
+        return len(self.prefix) == self.n
+
+    def on_solution(self) -> bool:
+        self.found.append(list(self.prefix))
+        return False
+
+    def candidates(self) -> List[int]:
+        return [i for i in range(self.n) if i not in self.prefix]
+
+    def apply(self, choice: int):
+        self.prefix.append(choice)
+
+    def undo(self, choice: int):
+        assert self.prefix.pop() == choice
+
+    def save(self) -> Dict[str, Any]:
+        return {"found": self.found}
+
+    def load(self, state: Dict[str, Any]):
+        self.found = state.get("found", [])
+
+
+def pause_every(nodes: int):
+    count = [0]
+
+    def should_stop() -> bool:
+        count[0] += 1
+        return count[0] % nodes == 0
+
+    return should_stop
+
+
+def test_run_without_pausing_visits_every_leaf():
+    problem = Permutations(4)
+    assert ExplicitStackSearch(problem).run() == EXHAUSTED
+    assert len(problem.found) == 24
+    assert problem.prefix == []
+
+
+@pytest.mark.parametrize("every", [2, 7, 50])
+def test_resume_from_checkpoint_matches_uninterrupted_run(every):
+    expected = Permutations(5)
+    ExplicitStackSearch(expected).run()
+
+    checkpoint = None
+    pauses = 0
+    while True:
+        problem = Permutations(5)
+        engine = ExplicitStackSearch(problem)
+        if checkpoint is not None:
+            engine.restore(checkpoint)
+        status = engine.run(pause_every(every))
+        if status != PAUSED:
+            break
+        pauses += 1
+        # Checkpoints travel through JSON between requests
+        checkpoint = json.loads(json.dumps(engine.checkpoint()))
+
+    assert status == EXHAUSTED
+    assert pauses > 0
+    assert problem.found == expected.found
+
+
+def test_restored_state_matches_the_branch():
+    problem = Permutations(4)
+    engine = ExplicitStackSearch(problem)
+    assert engine.run(pause_every(6)) == PAUSED
+    checkpoint = engine.checkpoint()
+
+    resumed = Permutations(4)
+    ExplicitStackSearch(resumed).restore(checkpoint)
+    assert resumed.prefix == problem.prefix == checkpoint["choices"]
+    assert resumed.found == problem.found
+
+
+def test_solved_stops_at_the_first_goal():
+    class First(Permutations):
+        def on_solution(self) -> bool:
+            super().on_solution()
+            return True
+
+    problem = First(3)
+    assert ExplicitStackSearch(problem).run() == SOLVED
+    assert problem.found == [[0, 1, 2]]
+
+
+def _paused_checkpoint() -> Dict[str, Any]:
+    engine = ExplicitStackSearch(Permutations(4))
+    engine.run(pause_every(5))
+    return json.loads(json.dumps(engine.checkpoint()))
+
+
+@pytest.mark.parametrize("tamper", [
+    lambda c: c.update(version=0),
+    lambda c: c.update(key="permutations:5"),
+    lambda c: c["pending"].pop(),
+    lambda c: c["choices"].__setitem__(0, 9),
+    lambda c: c["choices"].__setitem__(1, c["choices"][0]),
+    lambda c: c["pending"][0].append(9),
+])
+def test_restore_rejects_tampered_checkpoints(tamper):
+    checkpoint = _paused_checkpoint()
+    tamper(checkpoint)
+    with pytest.raises(ValueError):
+        ExplicitStackSearch(Permutations(4)).restore(checkpoint)
+
+
+def test_nqueens_resumes_across_requests():
+    options = {"max_solutions": 100, "return_steps": False}
+    expected = NQueensSolver()
+    expected.solve({"n": 8}, dict(options))
+    assert len(expected.all_solutions) == 92
+
+    resume = None
+    requests = 0
+    while True:
+        solver = NQueensSolver()
+        solver.solve({"n": 8}, dict(options, max_nodes=300, resume=resume))
+        requests += 1
+        if solver.checkpoint is None:
+            break
+        resume = json.loads(json.dumps(solver.checkpoint))
+
+    assert requests > 1
+    assert solver.all_solutions == expected.all_solutions
+
+
+def test_nqueens_rejects_a_checkpoint_for_another_board():
+    solver = NQueensSolver()
+    solver.solve({"n": 8}, {"max_solutions": 100, "return_steps": False, "max_nodes": 50})
+    assert solver.checkpoint is not None
+
+    with pytest.raises(ValueError):
+        NQueensSolver().solve({"n": 9}, {"max_solutions": 100, "return_steps": False,
+                                         "resume": solver.checkpoint})
@@ -0,0 +1,98 @@
+from typing import Any, Dict, List
+from fastapi.testclient import TestClient
+from app.main import app
+from app.api import endpoints
+from app.api.cache import ResultCache
+from app.api.endpoints import solve_request
+from app.api.serialization import (
+    NO_VALUE, PACKED_MAGIC, PACKED_MEDIA_TYPE, json_response, pack_response
+)
+from app.models.schemas import PuzzleRequest
+import json
+import struct
+
+import pytest
+
+SUDOKU = [[5, 3, 0, 0, 7, 0, 0, 0, 0], [6, 0, 0, 1, 9, 5, 0, 0, 0], [0, 9, 8, 0, 0, 0, 0, 6, 0],
+          [8, 0, 0, 0, 6, 0, 0, 0, 3], [4, 0, 0, 8, 0, 3, 0, 0, 1], [7, 0, 0, 0, 2, 0, 0, 0, 6],
+          [0, 6, 0, 0, 0, 0, 2, 8, 0], [0, 0, 0, 4, 1, 9, 0, 0, 5], [0, 0, 0, 0, 8, 0, 0, 7, 9]]
+MAZE = {"grid": [[0, 0, 0], [1, 1, 0], [0, 0, 0]], "start": [0, 0], "end": [2, 0]}
+
+
+def unpack(data: bytes) -> Dict[str, Any]:
+    """Decode the packed layout back to the JSON response"""
+    assert data[:4] == PACKED_MAGIC
+    (length,) = struct.unpack_from("<I", data, 4)
+    header = json.loads(data[8:8 + length])
+    body = data[8 + length:]
+    ints = list(struct.unpack(f"<{len(body) // 4}i", body))
+
+    def pairs(offset: int, count: int) -> List[List[int]]:
+        return [ints[offset + 2 * i:offset + 2 * i + 2] for i in range(count)]
+
+    solution = header.get("solution")
+    if isinstance(solution, dict) and "$packed" in solution:
+        kind, offset = solution["$packed"], solution["offset"]
+        if kind == "ints":
+            header["solution"] = ints[offset:offset + solution["length"]]
+        elif kind == "pairs":
+            header["solution"] = pairs(offset, solution["length"])
+        elif kind == "grid":
+            cols = solution["cols"]
+            header["solution"] = [ints[offset + r * cols:offset + (r + 1) * cols]
+                                  for r in range(solution["rows"])]
+        else:
+            lengths = ints[offset:offset + solution["length"]]
+            start, header["solution"] = offset + len(lengths), []
+            for count in lengths:
+                header["solution"].append(pairs(start, count))
+                start += 2 * count
+
+    steps = header.get("steps")
+    if isinstance(steps, dict):
+        count, offset = steps["length"], steps["offset"]
+        columns = [ints[offset + c * count:offset + (c + 1) * count] for c in range(6)]
+        header["steps"] = [{
+            "action": steps["actions"][columns[0][i]],
+            "position": [columns[1][i], columns[2][i]] if columns[1][i] >= 0 else None,
+            "value": (steps["values"].get(str(i)) if columns[3][i] == NO_VALUE else columns[3][i]),
+            "index": columns[4][i] if columns[4][i] >= 0 else None,
+            "description": steps["descriptions"][columns[5][i]],
+        } for i in range(count)]
+    return header
+
+
+@pytest.mark.parametrize("puzzle_type, data, options", [
+    ("sudoku", {"grid": SUDOKU}, {"algorithm": "backtracking"}),
+    ("nqueens", {"n": 6}, {"max_solutions": 4}),
+    ("maze", MAZE, {"algorithm": "astar", "trace": {"keyframe_interval": 2}}),
+    ("knight", {"n": 6, "start": [0, 0]}, {"algorithm": "warnsdorff"}),
+    ("knight", {"n": 12, "start": [0, 0]}, {"algorithm": "constructive"}),
+])
+def test_packed_bytes_decode_to_the_json_response(puzzle_type, data, options):
+    request = PuzzleRequest.model_validate({"puzzle_type": puzzle_type, "input": data,
+                                            "options": options})
+    response = solve_request(puzzle_type, request)
+    assert response.success
+    as_json = json.loads(json_response(response).body)
+    # The non-revalidating path matches what FastAPI's encoder would produce
+    assert as_json == response.model_dump(mode="json")
+    assert unpack(pack_response(response.model_dump(mode="json"))) == as_json
+
+
+def test_accept_header_selects_the_packed_format(monkeypatch):
+    class Inline:
+        async def run(self, fn, *args, deadline: float, **callbacks):
+            return fn(*args), 0.0
+
+    monkeypatch.setattr(endpoints, "get_executor", Inline)
+    monkeypatch.setattr(endpoints, "get_result_cache", lambda: ResultCache(max_entries=0))
+    client = TestClient(app)
+    request = {"puzzle_type": "maze", "input": MAZE, "options": {}}
+    packed = client.post("/api/maze/solve", json=request, headers={"Accept": PACKED_MEDIA_TYPE})
+    assert packed.headers["content-type"] == PACKED_MEDIA_TYPE
+    plain = client.post("/api/maze/solve", json=request)
+    assert plain.headers["content-type"] == "application/json"
+    decoded, expected = unpack(packed.content), plain.json()
+    assert decoded.pop("statistics").keys() == expected.pop("statistics").keys()
+    assert decoded == expected
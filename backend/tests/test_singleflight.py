@@ -0,0 +1,128 @@
+from app.api import singleflight
+from app.api.singleflight import ClientDisconnected, SingleFlight
+import asyncio
+
+import pytest
+
+
+class Work:
+    """A call that counts its runs and finishes when released"""
+
+    def __init__(self, result="done"):
+        self.result = result
+        self.started = 0
+        self.cancelled = False
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        self.started += 1
+        try:
+            await self.release.wait()
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return self.result
+
+
+def test_concurrent_callers_share_one_call():
+    async def scenario():
+        flights, work = SingleFlight(), Work()
+        callers = [asyncio.ensure_future(flights.do("k", work)) for _ in range(3)]
+        await asyncio.sleep(0)
+        work.release.set()
+        assert await asyncio.gather(*callers) == ["done"] * 3
+        assert work.started == 1
+        assert flights.coalesced == 2
+        assert flights.calls == {}
+
+    asyncio.run(scenario())
+
+
+def test_different_keys_run_separately():
+    async def scenario():
+        flights, first, second = SingleFlight(), Work(1), Work(2)
+        callers = [asyncio.ensure_future(flights.do("a", first)),
+                   asyncio.ensure_future(flights.do("b", second))]
+        await asyncio.sleep(0)
+        first.release.set()
+        second.release.set()
+        assert await asyncio.gather(*callers) == [1, 2]
+        assert flights.coalesced == 0
+
+    asyncio.run(scenario())
+
+
+def test_errors_reach_every_caller():
+    async def scenario():
+        flights = SingleFlight()
+
+        async def fail():
+            await asyncio.sleep(0)
+            raise ValueError("bad input")
+
+        results = await asyncio.gather(flights.do("k", fail), flights.do("k", fail),
+                                       return_exceptions=True)
+        assert [type(r) for r in results] == [ValueError, ValueError]
+        assert flights.calls == {}
+
+    asyncio.run(scenario())
+
+
+def test_call_survives_while_any_caller_waits():
+    async def scenario():
+        flights, work = SingleFlight(), Work()
+        leaving = asyncio.ensure_future(flights.do("k", work))
+        staying = asyncio.ensure_future(flights.do("k", work))
+        await asyncio.sleep(0)
+
+        leaving.cancel()
+        await asyncio.sleep(0)
+        assert not work.cancelled
+        work.release.set()
+        assert await staying == "done"
+        assert leaving.cancelled()
+
+    asyncio.run(scenario())
+
+
+def test_last_caller_leaving_cancels_the_call():
+    async def scenario():
+        flights, work = SingleFlight(), Work()
+        callers = [asyncio.ensure_future(flights.do("k", work)) for _ in range(2)]
+        await asyncio.sleep(0)
+        for caller in callers:
+            caller.cancel()
+        await asyncio.gather(*callers, return_exceptions=True)
+        await asyncio.sleep(0)
+        assert work.cancelled
+        assert flights.calls == {}
+
+        # The next caller starts afresh instead of joining the cancelled call
+        fresh = Work("again")
+        fresh.release.set()
+        assert await flights.do("k", fresh) == "again"
+
+    asyncio.run(scenario())
+
+
+def test_disconnected_client_stops_waiting(monkeypatch):
+    monkeypatch.setattr(singleflight, "DISCONNECT_POLL_INTERVAL", 0.01)
+
+    async def scenario():
+        flights, work = SingleFlight(), Work()
+        gone = False
+
+        async def disconnected() -> bool:
+            return gone
+
+        waiting = asyncio.ensure_future(flights.do("k", work, disconnected))
+        await asyncio.sleep(0.03)
+        assert not waiting.done()
+        gone = True
+        with pytest.raises(ClientDisconnected):
+            await waiting
+        await asyncio.sleep(0)
+        assert work.cancelled
+        assert flights.calls == {}
+
+    asyncio.run(scenario())
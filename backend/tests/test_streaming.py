@@ -0,0 +1,153 @@
+from typing import Any, Dict, List, Tuple
+from fastapi.testclient import TestClient
+from app.main import app
+from app.api import streaming
+from app.api.executor import SolveExecutor
+from app.api.streaming import StepRelay, StepStream
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+NQUEENS = {"puzzle_type": "nqueens", "input": {"n": 6}, "options": {}}
+
+
+def maze(size: int) -> Dict[str, Any]:
+    grid = [[0] * size for _ in range(size)]
+    return {"puzzle_type": "maze", "input": {"grid": grid, "start": [0, 0], "end": [size - 1, size - 1]},
+            "options": {"algorithm": "bfs", "trace": {"max_steps": None}}}
+
+
+def sse_events(lines) -> List[Tuple[str, Any]]:
+    events, event = [], None
+    for line in lines:
+        if line.startswith("event: "):
+            event = line[len("event: "):]
+        elif line.startswith("data: "):
+            events.append((event, json.loads(line[len("data: "):])))
+    return events
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    pool = SolveExecutor(workers=1, queue_depth=0, memory_limit_mb=0)
+    monkeypatch.setattr(streaming, "get_executor", lambda: pool)
+    yield pool
+    pool.shutdown()
+
+
+def test_step_stream_sends_contiguous_batches(monkeypatch):
+    sent = []
+    monkeypatch.setattr(streaming, "emit", sent.append)
+    stream = StepStream({"visit": "Visiting ({row}, {col})"}, batch_size=3)
+    for i in range(10):
+        stream.append("visit", (i, 0))
+    stream.flush()
+    assert [batch["offset"] for batch in sent] == [0, 3, 6, 9]
+    steps = [step for batch in sent for step in batch["steps"]]
+    assert [step["index"] for step in steps] == list(range(10))
+    assert steps[4]["description"] == "Visiting (4, 0)"
+    assert len(stream) == 0
+
+
+def test_step_stream_caps_the_steps_sent(monkeypatch):
+    sent = []
+    monkeypatch.setattr(streaming, "emit", sent.append)
+    stream = StepStream({}, batch_size=3)
+    stream.configure(max_steps=5)
+    for i in range(50):
+        stream.append("visit", (i, 0))
+    stream.flush()
+    assert [step["index"] for batch in sent for step in batch["steps"]] == [0, 1, 2, 3, 4]
+
+
+def test_relay_blocks_delivery_until_the_client_reads_or_leaves():
+    async def scenario():
+        relay = StepRelay(asyncio.get_running_loop(), max_pending=1)
+        delivered = []
+
+        def deliver(batch):
+            relay.deliver(batch)
+            delivered.append(batch)
+
+        first = threading.Thread(target=deliver, args=("a",))
+        first.start()
+        first.join(1)
+        second = threading.Thread(target=deliver, args=("b",))
+        second.start()
+        await asyncio.sleep(0.3)
+        # The second batch waits for room
+        assert delivered == ["a"] and second.is_alive()
+
+        assert await relay.get() == ("steps", "a")
+        await asyncio.to_thread(second.join, 1)
+        assert delivered == ["a", "b"]
+
+        # A closed relay stops blocking and drops what it is given
+        third = threading.Thread(target=deliver, args=("c",))
+        third.start()
+        await asyncio.sleep(0.2)
+        assert third.is_alive()
+        relay.close()
+        await asyncio.to_thread(third.join, 1)
+        assert not third.is_alive()
+        assert await relay.get() == ("steps", "b")
+        assert relay.queue.empty()
+
+    asyncio.run(scenario())
+
+
+def test_sse_streams_steps_then_the_result(pool):
+    with TestClient(app).stream("POST", "/api/nqueens/solve/stream", json=NQUEENS) as response:
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = sse_events(response.iter_lines())
+
+    batches = [data for event, data in events if event == "steps"]
+    offset = 0
+    for batch in batches:
+        assert batch["offset"] == offset
+        offset += len(batch["steps"])
+    assert offset > 0
+    event, result = events[-1]
+    assert event == "result" and result["success"]
+    assert len(result["solution"]) == 6 and result["steps"] == []
+
+
+def test_websocket_streams_like_sse(pool):
+    with TestClient(app).websocket_connect("/api/nqueens/solve/ws") as ws:
+        ws.send_json(NQUEENS)
+        messages = []
+        while not messages or messages[-1]["event"] == "steps":
+            messages.append(ws.receive_json())
+    assert messages[0]["event"] == "steps" and messages[0]["data"]["offset"] == 0
+    assert messages[-1]["event"] == "result" and messages[-1]["data"]["success"]
+
+
+def test_websocket_rejects_bad_requests():
+    client = TestClient(app)
+    with client.websocket_connect("/api/nqueens/solve/ws") as ws:
+        ws.send_json({"puzzle_type": "nqueens"})
+        assert ws.receive_json()["event"] == "error"
+        assert ws.receive()["code"] == 4400
+
+
+def test_saturated_pool_refuses_a_stream(pool):
+    pool.in_flight = 1
+    response = TestClient(app).post("/api/nqueens/solve/stream", json=NQUEENS)
+    assert response.status_code == 429
+
+
+def test_client_leaving_stops_the_solve(pool):
+    with TestClient(app).websocket_connect("/api/maze/solve/ws") as ws:
+        ws.send_json(maze(300))
+        assert ws.receive_json()["event"] == "steps"
+    # The backlog of unread batches has paused the worker; leaving kills it
+    for _ in range(100):
+        if pool.restarts:
+            break
+        time.sleep(0.1)
+    assert pool.restarts == 1
+    assert pool.in_flight == 0
@@ -0,0 +1,65 @@
+from app.solvers.trace import SNAPSHOT, TraceBuffer
+
+import pytest
+
+
+def filled(steps: int, **policy) -> TraceBuffer:
+    trace = TraceBuffer({"visit": "Visiting ({row}, {col})"})
+    trace.configure(**policy)
+    seen = []
+    trace.snapshot_source = lambda: list(seen)
+    for i in range(steps):
+        seen.append(i)
+        trace.append("visit", (i, 0))
+    return trace
+
+
+def test_stride_sampling_spreads_over_the_whole_solve():
+    trace = filled(1000, max_steps=10)
+    indices = list(trace.indices)
+    assert len(trace) <= 10
+    assert all(index % trace.stride == 0 for index in indices)
+    assert indices[0] == 0 and indices[-1] >= 1000 - trace.stride
+
+
+def test_head_sampling_keeps_the_first_steps():
+    trace = filled(100, max_steps=5, sampling="head")
+    assert list(trace.indices) == [0, 1, 2, 3, 4]
+    assert trace.to_steps()[1].description == "Visiting (1, 0)"
+
+
+@pytest.mark.parametrize("max_steps", [1, 2, 3, 10])
+@pytest.mark.parametrize("keyframe_interval", [1, 3])
+def test_max_steps_is_a_hard_cap_with_keyframes(max_steps, keyframe_interval):
+    trace = filled(500, max_steps=max_steps, keyframe_interval=keyframe_interval)
+    assert len(trace) <= max_steps
+    assert trace.action_names[trace.actions[0]] == SNAPSHOT
+
+
+def test_keyframes_stay_within_their_item_budget():
+    trace = TraceBuffer()
+    trace.configure(max_steps=None, keyframe_interval=1)
+    trace.max_keyframe_items = 1000
+    seen = []
+    trace.snapshot_source = lambda: list(seen)
+    for i in range(300):
+        seen.append(i)
+        trace.append("visit", (i, 0))
+
+    keyframes = [trace.objects[slot] for slot in trace._keyframe_slots()]
+    assert sum(map(len, keyframes)) == trace.keyframe_items <= 1000
+    assert len(keyframes) > 2
+    assert trace.keyframe_interval > 1
+    # Every non-keyframe step is still kept
+    assert len(trace) - len(keyframes) == 300
+
+
+def test_a_keyframe_larger_than_the_budget_is_skipped():
+    trace = TraceBuffer()
+    trace.configure(keyframe_interval=1)
+    trace.max_keyframe_items = 5
+    trace.snapshot_source = lambda: list(range(10))
+    for i in range(10):
+        trace.append("visit", (i, 0))
+    assert trace.action_names == ["visit"]
+    assert len(trace) == 10 and trace.keyframe_items == 0
@@ -0,0 +1,85 @@
+from fastapi.testclient import TestClient
+from app.main import app
+from app.api import endpoints, traces as traces_api
+from app.api.endpoints import solve_request
+from app.models.schemas import PuzzleRequest
+from app.solvers.trace import TraceBuffer
+from app.storage import traces
+from app.storage.traces import TraceNotFound, TraceStore
+import time
+
+import pytest
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    # Small chunks so windows span several of them
+    monkeypatch.setattr(traces, "CHUNK_STEPS", 4)
+    store = TraceStore(str(tmp_path / "traces.sqlite3"))
+    monkeypatch.setattr(endpoints, "get_trace_store", lambda: store)
+    monkeypatch.setattr(traces_api, "get_trace_store", lambda: store)
+    return store
+
+
+def sample_trace() -> TraceBuffer:
+    trace = TraceBuffer({"visit": "Visiting ({row}, {col}) at {value}"})
+    trace.configure(keyframe_interval=5)
+    trace.snapshot_source = lambda: [[trace.total, 0]]
+    for i in range(18):
+        value = {"big": i} if i % 7 == 0 else 2 ** 40 if i == 9 else i
+        trace.append("visit", (i, i % 3), value, "explicit" if i == 11 else "")
+    return trace
+
+
+def dumped(steps):
+    return [step.model_dump() for step in steps]
+
+
+def test_windows_read_back_what_was_stored(store):
+    trace = sample_trace()
+    trace_id = store.save("maze", trace)
+    assert store.info(trace_id) == {"trace_id": trace_id, "puzzle_type": "maze",
+                                    "length": len(trace), "steps_total": 18, "keyframes": 4}
+    assert dumped(store.read(trace_id, 0, 100)) == dumped(trace.to_steps())
+    for offset, limit in [(0, 1), (3, 2), (5, 9), (len(trace) - 2, 10)]:
+        assert (dumped(store.read(trace_id, offset, limit)) ==
+                dumped(trace.to_steps(offset, offset + limit)))
+    assert store.read(trace_id, len(trace), 5) == []
+
+
+def test_seek_finds_the_last_keyframe(store):
+    trace = sample_trace()
+    trace_id = store.save("maze", trace)
+    slot = store.keyframe_before(trace_id, 12)
+    step = store.read(trace_id, slot, 1)[0]
+    assert step.action == "snapshot" and step.index == 10
+    assert store.keyframe_before(trace_id, 0) == 0
+
+
+def test_unsolved_searches_are_stored_too(store):
+    grid = [[0, 1, 0],
+            [0, 1, 0],
+            [0, 1, 0]]
+    request = PuzzleRequest.model_validate({
+        "puzzle_type": "maze", "input": {"grid": grid, "start": [0, 0], "end": [0, 2]},
+        "options": {"algorithm": "bfs", "store_trace": True}})
+    response = solve_request("maze", request)
+    assert not response.success and response.trace_id
+
+    client = TestClient(app)
+    info = client.get(f"/api/traces/{response.trace_id}").json()
+    assert info["length"] == info["steps_total"] > 0
+    window = client.get(f"/api/traces/{response.trace_id}/steps", params={"offset": 1, "limit": 2}).json()
+    assert window["offset"] == 1 and len(window["steps"]) == 2
+    assert client.get("/api/traces/missing/steps").status_code == 404
+
+
+def test_expired_traces_are_dropped(tmp_path):
+    store = TraceStore(str(tmp_path / "traces.sqlite3"), ttl=0)
+    old = store.save("maze", sample_trace())
+    time.sleep(0.01)
+    store.save("maze", sample_trace())
+    with pytest.raises(TraceNotFound):
+        store.info(old)
+    with pytest.raises(TraceNotFound):
+        store.read(old)
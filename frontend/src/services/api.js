@@ -1,4 +1,5 @@
 import axios from 'axios'
+import { PACKED_MEDIA_TYPE, decodePacked } from './packed'
 
 const API_BASE_URL = '/api'
 
@@ -47,6 +48,90 @@ export const puzzleAPI = {
     })
   },
 
+  knightDistance(queries, n = null) {
+    return api.post('/knight/distance', { n, queries })
+  },
+
+  // Streams a solve over Server-Sent Events. onSteps receives each batch of
+  // steps as it arrives; resolves with the final response (without steps).
+  // Abort the signal to stop the solve on the server.
+  async solveStream(puzzleType, input, options = {}, onSteps = () => {}, signal = undefined) {
+    const response = await fetch(`${API_BASE_URL}/${puzzleType}/solve/stream`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ puzzle_type: puzzleType, input, options }),
+      signal
+    })
+    if (!response.ok) {
+      throw new Error(`Stream request failed with status ${response.status}`)
+    }
+
+    const reader = response.body.getReader()
+    const decoder = new TextDecoder()
+    let buffer = ''
+    while (true) {
+      const { done, value } = await reader.read()
+      if (done) break
+      buffer += decoder.decode(value, { stream: true })
+
+      let boundary
+      while ((boundary = buffer.indexOf('\n\n')) >= 0) {
+        const message = buffer.slice(0, boundary)
+        buffer = buffer.slice(boundary + 2)
+        const event = message.match(/^event: (.*)$/m)?.[1]
+        const data = JSON.parse(message.match(/^data: (.*)$/m)?.[1] ?? 'null')
+        if (event === 'steps') onSteps(data.steps, data.offset)
+        else if (event === 'result') return data
+        else if (event === 'error') throw new Error(data.detail)
+      }
+    }
+    throw new Error('Stream ended without a result')
+  },
+
+  // Same response as the solve methods above, in the packed binary format:
+  // several times smaller for long step lists and cheaper to parse.
+  async solvePacked(puzzleType, input, options = {}, signal = undefined) {
+    const response = await fetch(`${API_BASE_URL}/${puzzleType}/solve`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json', Accept: PACKED_MEDIA_TYPE },
+      body: JSON.stringify({ puzzle_type: puzzleType, input, options }),
+      signal
+    })
+    if (!response.ok) {
+      throw new Error(`Solve request failed with status ${response.status}`)
+    }
+    return decodePacked(await response.arrayBuffer())
+  },
+
+  // Solves with options.store_trace return a trace_id instead of inline
+  // steps; read them back in windows. Pass seek (a step index) to start at
+  // the last keyframe before it.
+  getTrace(traceId) {
+    return api.get(`/traces/${traceId}`)
+  },
+
+  getTraceSteps(traceId, { offset = 0, limit = 1000, seek } = {}) {
+    return api.get(`/traces/${traceId}/steps`, { params: { offset, limit, seek } })
+  },
+
+  // Long solves run as jobs: submit, then poll getJob (its progress holds
+  // the solver's latest statistics) and fetch the result once it is done.
+  submitJob(puzzleType, input, options = {}) {
+    return api.post('/jobs', { puzzle_type: puzzleType, input, options })
+  },
+
+  getJob(jobId) {
+    return api.get(`/jobs/${jobId}`)
+  },
+
+  getJobResult(jobId) {
+    return api.get(`/jobs/${jobId}/result`)
+  },
+
+  cancelJob(jobId) {
+    return api.post(`/jobs/${jobId}/cancel`)
+  },
+
   getPresets(puzzleType) {
     return api.get(`/puzzles/presets/${puzzleType}`)
   },
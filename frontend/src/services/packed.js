@@ -0,0 +1,82 @@
+// Decoder for application/x-graphsolve-packed responses: "GSP1", a
+// little-endian uint32 header length, a JSON header padded to 4 bytes, then
+// one little-endian Int32Array. Header entries with a "$packed" kind point
+// into that array; decodePacked turns them back into the JSON shapes.
+
+export const PACKED_MEDIA_TYPE = 'application/x-graphsolve-packed'
+
+const MAGIC = 'GSP1'
+const NO_VALUE = -2147483648
+
+function pairs(ints, offset, length) {
+  const result = new Array(length)
+  for (let i = 0; i < length; i++) {
+    result[i] = [ints[offset + 2 * i], ints[offset + 2 * i + 1]]
+  }
+  return result
+}
+
+function decodeSolution(packed, ints) {
+  if (packed === null || typeof packed !== 'object' || !packed.$packed) return packed
+  const { offset } = packed
+  switch (packed.$packed) {
+    case 'ints':
+      return Array.from(ints.subarray(offset, offset + packed.length))
+    case 'pairs':
+      return pairs(ints, offset, packed.length)
+    case 'grid': {
+      const grid = new Array(packed.rows)
+      for (let r = 0; r < packed.rows; r++) {
+        const start = offset + r * packed.cols
+        grid[r] = Array.from(ints.subarray(start, start + packed.cols))
+      }
+      return grid
+    }
+    case 'pair_lists': {
+      const lists = new Array(packed.length)
+      let position = offset + packed.length
+      for (let i = 0; i < packed.length; i++) {
+        const length = ints[offset + i]
+        lists[i] = pairs(ints, position, length)
+        position += 2 * length
+      }
+      return lists
+    }
+    default:
+      throw new Error(`Unknown packed solution kind: ${packed.$packed}`)
+  }
+}
+
+function decodeSteps(packed, ints) {
+  const { offset, length, actions, descriptions, values } = packed
+  const column = c => ints.subarray(offset + c * length, offset + (c + 1) * length)
+  const [action, row, col, value, index, description] = [0, 1, 2, 3, 4, 5].map(column)
+
+  const steps = new Array(length)
+  for (let i = 0; i < length; i++) {
+    steps[i] = {
+      action: actions[action[i]],
+      position: row[i] === -1 ? null : [row[i], col[i]],
+      value: value[i] === NO_VALUE ? (values[i] ?? null) : value[i],
+      description: descriptions[description[i]] || null,
+      index: index[i] === -1 ? null : index[i]
+    }
+  }
+  return steps
+}
+
+export function decodePacked(buffer) {
+  const bytes = new Uint8Array(buffer)
+  if (new TextDecoder().decode(bytes.subarray(0, 4)) !== MAGIC) {
+    throw new Error('Not a packed graphsolve response')
+  }
+  const headerLength = new DataView(buffer).getUint32(4, true)
+  const data = JSON.parse(new TextDecoder().decode(bytes.subarray(8, 8 + headerLength)))
+
+  // The body starts 4-byte aligned; Int32Array reads host byte order, which
+  // is little-endian on every platform browsers run on
+  const ints = new Int32Array(buffer, 8 + headerLength)
+  if ('solution' in data) data.solution = decodeSolution(data.solution, ints)
+  if (data.steps && data.steps.$packed === 'steps') data.steps = decodeSteps(data.steps, ints)
+  return data
+}